@@ -12,6 +12,7 @@ load_dotenv()
 # Import extensions and models
 from .extensions import db, migrate, login_manager, bcrypt
 from .models import User # User model is imported here to be accessible for user_loader
+from .json_provider import FastJSONProvider
 
 
 # The create_app function now accepts a config_object argument.
@@ -19,6 +20,8 @@ from .models import User # User model is imported here to be accessible for user
 # when creating the app instance, making your application more flexible for different environments.
 def create_app(config_object='config.DevelopmentConfig'): # ADDED config_object argument
     app = Flask(__name__)
+    # jsonify() encodes datetimes natively (ISO 8601) and uses orjson when it is installed
+    app.json = FastJSONProvider(app)
     # Load configurations from the specified config object (e.g., config.DevelopmentConfig from config.py)
     app.config.from_object(config_object) # USING config_object here
 
@@ -27,6 +30,44 @@ def create_app(config_object='config.DevelopmentConfig'): # ADDED config_object
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     login_manager.init_app(app)
+    # Bounded pool running bcrypt (hash/check) off the request threads
+    from .passwords import password_hasher
+    password_hasher.init_app(app)
+    # In-memory per-instructor/student interval index used by the booking conflict checks
+    from .interval_index import booking_index
+    booking_index.init_app(app)
+    # Per-instructor/student write locks and the overlap guard triggers behind them
+    from .booking_locks import booking_locks
+    booking_locks.init_app(app)
+    # In-process fan-out of booking events behind GET /api/bookings/stream
+    from .booking_events import booking_events
+    booking_events.init_app(app)
+    # Identity cache behind the Flask-Login user loader
+    from .user_cache import user_cache
+    user_cache.init_app(app)
+    # Opt-in signed access tokens (Authorization: Bearer), read by the request loader below
+    from .access_tokens import access_tokens
+    access_tokens.init_app(app)
+    # Cached results of the workload / utilization reports
+    from .report_cache import report_cache
+    report_cache.init_app(app)
+    # Search index (FTS5 / pg_trgm) DDL hooks for the name filters and the typeahead endpoint
+    from . import search
+    # Per-table change counters behind the ETags of the list endpoints
+    from . import table_versions
+    # Triggers filling the booking change log behind GET /api/bookings/changes, and its 'flask prune-booking-changes' job
+    from .change_log import prune_booking_changes_command
+    app.cli.add_command(prune_booking_changes_command)
+    # Triggers maintaining the per-day booking summary, and its 'flask rebuild-booking-summary' command
+    from .booking_summary import rebuild_booking_summary_command
+    app.cli.add_command(rebuild_booking_summary_command)
+    # Archive of old completed/cancelled bookings and its 'flask archive-bookings' job
+    from .archive import archive_bookings_command
+    app.cli.add_command(archive_bookings_command)
+    # Automatic pending/confirmed -> completed transitions: background thread and 'flask complete-past-bookings'
+    from .booking_status import booking_status_worker, complete_past_bookings_command
+    booking_status_worker.init_app(app)
+    app.cli.add_command(complete_past_bookings_command)
 
     # Configure CORS - allows your React frontend to make requests
     # Adjust origins as needed for production (e.g., your frontend domain)
@@ -41,7 +82,14 @@ def create_app(config_object='config.DevelopmentConfig'): # ADDED config_object
         # user_loader function tells Flask-Login how to reload a user object from a user ID stored in the session.
         # when a user successfully logs in , Flask-Login stores their unique ID in the session cookie.
     def load_user(user_id):
-        return User.query.get(user_id) 
+        # Cached detached snapshot (id, email, names, role), invalidated whenever the user row changes (app/user_cache.py)
+        return user_cache.load(user_id)
+
+    @login_manager.request_loader
+        # Requests without a session cookie may carry an access token instead (ACCESS_TOKENS_ENABLED)
+        # The user comes from the signed claims (id, role), no database round trip
+    def load_user_from_request(request):
+        return access_tokens.load_user(request)
         # This function tells Flask-Login how to load a user from the database given their ID.
         # Pass it as a string from session to load_user
     
@@ -77,6 +125,13 @@ def create_app(config_object='config.DevelopmentConfig'): # ADDED config_object
         # Catches 404s for non-existent URLs or resources
         return jsonify(message=getattr(error, 'description', 'Not Found: The requested URL or resource was not found on the server.')), 404
 
+    @app.errorhandler(503)
+    def service_unavailable_error(error):
+        # e.g. PasswordHasherBusy / BookingStreamsBusy: the password hashing pool / the stream slots are full,
+        # keep its Retry-After for the client
+        headers = {'Retry-After': str(error.retry_after)} if getattr(error, 'retry_after', None) else {}
+        return jsonify(message=getattr(error, 'description', 'Service Unavailable: The server is temporarily overloaded, retry later.')), 503, headers
+
     @app.errorhandler(500)
     def internal_server_error(error):
         # Ensures a database rollback on any internal server error that propagates up
@@ -100,6 +155,14 @@ def create_app(config_object='config.DevelopmentConfig'): # ADDED config_object
     from routes.users import users_bp
     from routes.training_elements import training_elements_bp
     from routes.bookings import bookings_bp
+    from routes.series import series_bp
+    from routes.availability import availability_bp
+    from routes.scheduler import scheduler_bp
+    from routes.search import search_bp
+    from routes.reports import reports_bp
+    from routes.calendar_feed import calendar_feed_bp
+    from routes.imports import imports_bp, import_bookings_command, import_training_elements_command
+    from routes.exports import exports_bp, export_bookings_command
 
     # Register Blueprints for your API routes with URL prefixes.
     # Using url_prefix is a best practice for organizing API endpoints and preventing conflicts.
@@ -109,6 +172,20 @@ def create_app(config_object='config.DevelopmentConfig'): # ADDED config_object
     app.register_blueprint(users_bp, url_prefix='/api/users', strict_slashes=False)
     app.register_blueprint(training_elements_bp, url_prefix='/api/training_elements', strict_slashes=False)
     app.register_blueprint(bookings_bp, url_prefix='/api/bookings', strict_slashes=False) 
+    app.register_blueprint(series_bp, url_prefix='/api/bookings/series', strict_slashes=False)
+    app.register_blueprint(availability_bp, url_prefix='/api/availability', strict_slashes=False)
+    app.register_blueprint(scheduler_bp, url_prefix='/api/scheduler', strict_slashes=False)
+    app.register_blueprint(search_bp, url_prefix='/api/search', strict_slashes=False)
+    app.register_blueprint(reports_bp, url_prefix='/api/reports', strict_slashes=False)
+    app.register_blueprint(calendar_feed_bp, url_prefix='/api/calendar', strict_slashes=False)
+    app.register_blueprint(imports_bp, url_prefix='/api/imports', strict_slashes=False)
+    app.register_blueprint(exports_bp, url_prefix='/api/exports', strict_slashes=False)
+
+    # CSV import commands: flask import-bookings / flask import-training-elements
+    app.cli.add_command(import_bookings_command)
+    app.cli.add_command(import_training_elements_command)
+    # Booking export command: flask export-bookings
+    app.cli.add_command(export_bookings_command)
     
     # Basic root route for testing server status
     @app.route('/')
@@ -0,0 +1,167 @@
+# Finalproject/app/access_tokens.py
+import threading
+import time
+
+from flask import current_app
+from flask_login import UserMixin
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+
+from .extensions import db
+from .models import User
+from .user_cache import user_cache
+
+# Opt-in stateless access tokens (ACCESS_TOKENS_ENABLED), for clients such as kiosks that call the API often.
+#
+# POST /api/auth/token exchanges email + password for a short-lived signed token (itsdangerous, SECRET_KEY with
+# its own salt) carrying {uid, role, v}: v is users.token_version when the token was issued.  Requests send it as
+# 'Authorization: Bearer <token>'; Flask-Login's request loader (app/__init__.py) turns the claims into a TokenUser,
+# so login_required / roles_required are answered from the signature and the claims alone, no database round trip.
+#
+# Revocation bumps users.token_version: logout with a token, a password change, and any role change (the role
+# claim would be stale).  A token is accepted while its v is not older than the user's version, checked against
+# an in-memory map {user id: token_version} holding only users whose version ever moved:
+#   - writes committed by this process update the map at once (mapper events, applied on commit),
+#   - writes made by other worker processes are picked up by reloading the map every
+#     ACCESS_TOKEN_REVOCATION_REFRESH_SECONDS (one query on users, not one per request),
+#   - tokens expire after ACCESS_TOKEN_TTL_SECONDS whatever happens, which bounds everything else
+#     (e.g. a user deleted by another process).
+
+
+class TokenUser(UserMixin):
+    # current_user of a request authenticated with an access token: id and role come from the claims,
+    # any other attribute (email, names, ...) is read from the user cache (app/user_cache.py) on first use
+    def __init__(self, claims):
+        self.id = claims['uid']
+        self.role = claims['role']
+        self.token_version = claims['v']
+
+    def get_id(self):
+        return str(self.id)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        snapshot = user_cache.load(self.id)
+        if snapshot is None:
+            raise AttributeError(name)
+        return getattr(snapshot, name)
+
+
+class AccessTokens:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}   # user_id -> token_version, only users whose version is above 0
+        self._deleted = {}    # user_id -> deleted at (monotonic), kept for one token lifetime
+        self._refreshed_at = None
+        self.enabled = False
+        self.ttl_seconds = 900
+        self.refresh_seconds = 30
+
+    def init_app(self, app):
+        self.enabled = app.config.get('ACCESS_TOKENS_ENABLED', False)
+        self.ttl_seconds = app.config.get('ACCESS_TOKEN_TTL_SECONDS', 900)
+        self.refresh_seconds = app.config.get('ACCESS_TOKEN_REVOCATION_REFRESH_SECONDS', 30)
+        if not getattr(self, '_listening', False):
+            event.listen(User, 'before_update', self._on_before_update)
+            event.listen(User, 'after_update', self._on_after_update)
+            event.listen(User, 'after_delete', self._on_delete)
+            event.listen(db.session, 'after_commit', self._on_commit)
+            event.listen(db.session, 'after_soft_rollback', self._on_rollback)
+            self._listening = True
+        app.extensions['access_tokens'] = self
+
+    @staticmethod
+    def serializer():
+        return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='access-token')
+
+    # --- Tokens ---
+    def issue(self, user):
+        return self.serializer().dumps({'uid': user.id, 'role': user.role, 'v': user.token_version})
+
+    def load_user(self, request):
+        # Request loader: TokenUser for a valid 'Authorization: Bearer' token, None otherwise (anonymous)
+        if not self.enabled:
+            return None
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return None
+        try:
+            claims = self.serializer().loads(token.strip(), max_age=self.ttl_seconds)
+        except BadSignature: # also SignatureExpired
+            return None
+        if not isinstance(claims, dict) or not all(isinstance(claims.get(key), int) for key in ('uid', 'v')):
+            return None
+        if self.is_revoked(claims['uid'], claims['v']):
+            return None
+        return TokenUser(claims)
+
+    @staticmethod
+    def is_token_user(user):
+        return isinstance(getattr(user, '_get_current_object', lambda: user)(), TokenUser)
+
+    # --- Revocation ---
+    @staticmethod
+    def revoke_user(user):
+        # Every access token issued so far to 'user' (a User row) stops working once the caller commits
+        user.token_version = (user.token_version or 0) + 1
+
+    def is_revoked(self, user_id, version):
+        self._refresh_if_stale()
+        with self._lock:
+            return user_id in self._deleted or version < self._versions.get(user_id, 0)
+
+    def _refresh_if_stale(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+                return
+            # Claimed by this thread, the others keep using the current map meanwhile
+            self._refreshed_at = now
+        rows = db.session.query(User.id, User.token_version).filter(User.token_version > 0).all()
+        with self._lock:
+            # Versions only grow: keep the highest of what was read and what this process applied meanwhile
+            versions = dict(rows)
+            for user_id, version in self._versions.items():
+                if version > versions.get(user_id, 0):
+                    versions[user_id] = version
+            self._versions = versions
+            self._deleted = {user_id: at for user_id, at in self._deleted.items() if now - at < self.ttl_seconds}
+
+    def _apply(self, changes):
+        with self._lock:
+            for user_id, version in changes:
+                if version is None:
+                    self._deleted[user_id] = time.monotonic()
+                elif version > self._versions.get(user_id, 0):
+                    self._versions[user_id] = version
+
+    # --- SQLAlchemy event handlers ---
+    @staticmethod
+    def _pending(session):
+        return session.info.setdefault('access_token_changes', [])
+
+    def _on_before_update(self, mapper, connection, user):
+        # A token carries the role it was issued with: a role change revokes the user's tokens
+        state = inspect(user)
+        if state.attrs.role.history.has_changes() and not state.attrs.token_version.history.has_changes():
+            self.revoke_user(user)
+
+    def _on_after_update(self, mapper, connection, user):
+        if inspect(user).attrs.token_version.history.has_changes():
+            self._pending(object_session(user)).append((user.id, user.token_version))
+
+    def _on_delete(self, mapper, connection, user):
+        self._pending(object_session(user)).append((user.id, None))
+
+    def _on_commit(self, session):
+        changes = session.info.pop('access_token_changes', None)
+        if changes:
+            self._apply(changes)
+
+    def _on_rollback(self, session, previous_transaction):
+        session.info.pop('access_token_changes', None)
+
+
+access_tokens = AccessTokens()
@@ -0,0 +1,98 @@
+# Finalproject/app/archive.py
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .extensions import db
+from .interval_index import booking_index
+from .models import ArchivedBooking, Booking
+
+# Archive of old bookings (bookings_archive, ArchivedBooking).
+#
+# Completed and cancelled bookings that ended more than ARCHIVE_RETENTION_DAYS ago can never conflict again,
+# yet they made up most of 'bookings' and every conflict check, list page and index rebuild walked past them.
+# 'flask archive-bookings' moves them, ARCHIVE_BATCH_SIZE rows per transaction (INSERT ... SELECT then DELETE),
+# so the hot table stays proportional to the active schedule:
+#   - each batch commits on its own, an interrupted run loses nothing and the next run simply carries on
+#     (rows already moved no longer match), no checkpoint to keep,
+#   - readers that take a date range (list, export, calendar, reports) add the archive only when the range
+#     starts before archive_horizon(), the end of the newest archived booking,
+#   - the per-day summary keeps counting archived bookings (triggers on bookings_archive, app/booking_summary.py),
+#   - delta sync (GET /api/bookings/changes) reports archived bookings as deleted, like the active schedule they left.
+
+ARCHIVABLE_STATUSES = ('completed', 'cancelled')
+
+# Columns copied from bookings, in order
+ARCHIVED_COLUMNS = [
+    'id', 'training_element_id', 'instructor_id', 'student_id', 'start_time', 'end_time', 'status',
+    'created_by_user_id', 'created_at', 'updated_at', 'notes', 'series_id',
+]
+
+
+def archive_horizon():
+    # End of the newest archived booking (None while the archive is empty), one lookup on ix_bookings_archive_end_time.
+    # Nothing archived ends after it, so a range starting at or after it never needs the archive.
+    return db.session.query(db.func.max(ArchivedBooking.end_time)).scalar()
+
+
+def reaches_archive(range_start):
+    # range_start: naive UTC lower bound of the requested dates, None when unbounded
+    horizon = archive_horizon()
+    if horizon is None:
+        return False
+    return range_start is None or range_start.replace(tzinfo=None) < horizon
+
+
+def archive_bookings(cutoff, batch_size, max_batches=None, on_batch=None):
+    """
+    Move completed/cancelled bookings that ended before 'cutoff' into bookings_archive, one transaction per batch.
+    on_batch(status, moved) is called after each committed batch. Returns the number of bookings moved.
+    """
+    moved = 0
+    batches = 0
+    for status in ARCHIVABLE_STATUSES:
+        while max_batches is None or batches < max_batches:
+            # (status, start_time, id) index: oldest first; moved rows drop out of the predicate, so every batch
+            # takes the next ones without any offset or saved position
+            rows = db.session.query(Booking.id, Booking.instructor_id, Booking.student_id).filter(
+                Booking.status == status,
+                Booking.start_time < cutoff,
+                Booking.end_time < cutoff
+            ).order_by(Booking.start_time, Booking.id).limit(batch_size).all()
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            columns = [getattr(Booking, name) for name in ARCHIVED_COLUMNS]
+            db.session.execute(db.insert(ArchivedBooking).from_select(
+                ARCHIVED_COLUMNS + ['archived_at'],
+                db.select(*columns, db.func.now()).where(Booking.id.in_(ids))
+            ))
+            db.session.execute(db.delete(Booking).where(Booking.id.in_(ids)).execution_options(synchronize_session=False))
+            db.session.commit()
+            # Bulk statements skip the ORM events the interval index listens to
+            for row in rows:
+                booking_index.invalidate('instructor', row.instructor_id)
+                booking_index.invalidate('student', row.student_id)
+            moved += len(ids)
+            batches += 1
+            if on_batch:
+                on_batch(status, len(ids))
+    return moved
+
+
+@click.command('archive-bookings')
+@click.option('--older-than-days', type=int, default=None, help="Retention horizon in days (default ARCHIVE_RETENTION_DAYS).")
+@click.option('--batch-size', type=int, default=None, help="Bookings moved per transaction (default ARCHIVE_BATCH_SIZE).")
+@click.option('--max-batches', type=int, default=None, help="Stop after this many batches, the next run carries on.")
+@with_appcontext
+def archive_bookings_command(older_than_days, batch_size, max_batches):
+    """Move old completed/cancelled bookings into bookings_archive."""
+    days = older_than_days if older_than_days is not None else current_app.config.get('ARCHIVE_RETENTION_DAYS', 365)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    moved = archive_bookings(
+        cutoff, batch_size or current_app.config.get('ARCHIVE_BATCH_SIZE', 1000), max_batches,
+        on_batch=lambda status, count: click.echo(f"  {count} {status} bookings archived")
+    )
+    click.echo(f"{moved} bookings ended before {cutoff:%Y-%m-%d %H:%M} archived")
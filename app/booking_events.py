@@ -0,0 +1,90 @@
+# Finalproject/app/booking_events.py
+import threading
+from collections import deque, namedtuple
+
+from werkzeug.exceptions import ServiceUnavailable
+
+# In-process fan-out of booking events for the Server-Sent Events stream (GET /api/bookings/stream)
+#
+# Publishers append to ONE shared, bounded ring buffer and wake every waiting subscriber with a single notify_all.
+# A subscriber is just its last seen sequence number: there is no queue per connection to fill and no
+# thread doing the fan-out, so publishing costs the same with 1 or 1000 idle subscribers.
+# A subscriber that falls behind by more than the buffer size is told to resync (reload the list),
+# the same way a reconnect with a Last-Event-ID older than the buffer is.
+# Events only cover this process: with several worker processes each one streams its own writes,
+# clients that must see everything combine the stream with GET /api/bookings/changes.
+#
+# An open stream holds its worker thread (sync/threaded WSGI workers) until it closes, up to
+# BOOKING_STREAM_MAX_SECONDS.  At most BOOKING_STREAM_MAX_CLIENTS streams run at once per process, the next one
+# is refused with a 503 + Retry-After (the client reconnects later), so streams can never take every thread
+# and leave the rest of the API, down to GET /ping, waiting.  Keep it below the worker's thread count
+# (gunicorn --threads), or serve the app from a greenlet worker (gunicorn -k gevent, which also patches
+# the Condition below) where a stream costs a greenlet, and raise it.
+
+BookingEvent = namedtuple('BookingEvent', ['seq', 'event_type', 'booking'])
+
+
+class BookingStreamsBusy(ServiceUnavailable):
+    description = "Too many live booking streams open, please retry in a moment."
+
+
+class BookingEventBroker:
+    def __init__(self, max_events=1000):
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=max_events)
+        self._seq = 0
+        self._streams = threading.BoundedSemaphore(20)  # open streams
+        self.retry_after = 5
+
+    def init_app(self, app):
+        with self._condition:
+            self._events = deque(self._events, maxlen=app.config.get('BOOKING_EVENTS_BUFFER', 1000))
+        self._streams = threading.BoundedSemaphore(app.config.get('BOOKING_STREAM_MAX_CLIENTS', 20))
+        self.retry_after = app.config.get('BOOKING_STREAM_RETRY_AFTER_SECONDS', 5)
+        app.extensions['booking_events'] = self
+
+    def open_stream(self):
+        """
+        Take a stream slot, raise BookingStreamsBusy (503) when all are in use.
+        Returns the function releasing it, to be called once when the stream closes.
+        """
+        streams = self._streams
+        if not streams.acquire(blocking=False):
+            raise BookingStreamsBusy(retry_after=self.retry_after)
+        return streams.release
+
+    @property
+    def last_seq(self):
+        with self._condition:
+            return self._seq
+
+    def publish(self, event_type, booking):
+        # event_type: 'created' / 'updated' / 'deleted', booking: the serialized booking (see serialize_booking)
+        # Call it after the commit, subscribers must never see a write that is later rolled back
+        with self._condition:
+            self._seq += 1
+            self._events.append(BookingEvent(self._seq, event_type, booking))
+            self._condition.notify_all()
+
+    def wait_for_events(self, after_seq, timeout):
+        """
+        Block until there are events newer than 'after_seq' or 'timeout' seconds passed.
+        Returns (events, lost): events in order, lost=True when some events after 'after_seq' already left the buffer.
+        """
+        with self._condition:
+            if after_seq > self._seq:
+                # Sequence from before a restart of this process
+                return [], True
+            if after_seq == self._seq:
+                self._condition.wait(timeout)
+            newer = []
+            for booking_event in reversed(self._events):
+                if booking_event.seq <= after_seq:
+                    break
+                newer.append(booking_event)
+            newer.reverse()
+            lost = bool(newer) and newer[0].seq != after_seq + 1
+            return newer, lost
+
+
+booking_events = BookingEventBroker()
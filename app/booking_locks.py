@@ -0,0 +1,120 @@
+# Finalproject/app/booking_locks.py
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.exc import IntegrityError
+
+from .extensions import db
+from .models import Booking
+
+# Double-booking protection under concurrent writers.
+#
+# The conflict check of a write is "read, then insert/update", so two requests booking the same instructor at the
+# same time could both see a free slot.  Writers therefore hold a lock per person (instructor / student) from the
+# check until the commit, and only writers sharing a person ever wait for each other:
+#   - in this process, a fixed set of lock stripes: a person maps to one stripe, stripes are taken in index order,
+#   - on PostgreSQL, transaction-level advisory locks keyed by (kind, person id), so workers of other processes
+#     serialize on the same people too (released by the database at commit/rollback).
+#
+# The locks keep writers of one person in line so they get the usual 409 from the conflict check.  The guard
+# triggers below are the last word: they run in the writer's transaction on every path (ORM, bulk statements,
+# imports, other processes whose in-memory interval index is stale) and reject a row overlapping another booking
+# of the same instructor or student.  Migrated databases get the same DDL from Alembic.
+
+# Advisory lock namespaces, also used by the PostgreSQL trigger
+PERSON_KINDS = {
+    'instructor': 1,
+    'student': 2,
+}
+
+CONFLICT_MESSAGE = 'booking_conflict: the instructor or student is already booked at this time'
+
+_SQLITE_OVERLAP = (
+    "EXISTS (SELECT 1 FROM bookings WHERE {column} = new.{column}{exclude} "
+    "AND start_time < new.end_time AND end_time > new.start_time)"
+)
+
+SQLITE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS bookings_conflict_bi BEFORE INSERT ON bookings "
+    f"WHEN {_SQLITE_OVERLAP.format(column='instructor_id', exclude='')} OR {_SQLITE_OVERLAP.format(column='student_id', exclude='')} "
+    f"BEGIN SELECT RAISE(ABORT, '{CONFLICT_MESSAGE}'); END",
+    "CREATE TRIGGER IF NOT EXISTS bookings_conflict_bu BEFORE UPDATE OF start_time, end_time, instructor_id, student_id ON bookings "
+    f"WHEN {_SQLITE_OVERLAP.format(column='instructor_id', exclude=' AND id <> new.id')} "
+    f"OR {_SQLITE_OVERLAP.format(column='student_id', exclude=' AND id <> new.id')} "
+    f"BEGIN SELECT RAISE(ABORT, '{CONFLICT_MESSAGE}'); END",
+]
+
+POSTGRES_TRIGGERS = [
+    f"""
+    CREATE OR REPLACE FUNCTION check_booking_conflict() RETURNS trigger AS $$
+    BEGIN
+        -- Same locks as BookingLocks.hold (already held, and so re-entered, on the application paths)
+        IF NEW.instructor_id IS NOT NULL THEN
+            PERFORM pg_advisory_xact_lock({PERSON_KINDS['instructor']}, NEW.instructor_id);
+        END IF;
+        IF NEW.student_id IS NOT NULL THEN
+            PERFORM pg_advisory_xact_lock({PERSON_KINDS['student']}, NEW.student_id);
+        END IF;
+        IF EXISTS (SELECT 1 FROM bookings WHERE id <> NEW.id
+                   AND (instructor_id = NEW.instructor_id OR student_id = NEW.student_id)
+                   AND start_time < NEW.end_time AND end_time > NEW.start_time) THEN
+            RAISE EXCEPTION '{CONFLICT_MESSAGE}' USING ERRCODE = 'exclusion_violation';
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER bookings_conflict BEFORE INSERT OR UPDATE OF start_time, end_time, instructor_id, student_id "
+    "ON bookings FOR EACH ROW EXECUTE FUNCTION check_booking_conflict()",
+]
+
+for _statement in SQLITE_TRIGGERS:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_TRIGGERS:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def is_booking_conflict(error):
+    # IntegrityError raised by the guard triggers (SQLite RAISE(ABORT), PostgreSQL exclusion_violation)
+    return isinstance(error, IntegrityError) and 'booking_conflict' in str(error.orig)
+
+
+class BookingLocks:
+    def __init__(self, stripes=64):
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+
+    def init_app(self, app):
+        # More stripes, fewer unrelated people sharing one
+        self._stripes = [threading.Lock() for _ in range(app.config.get('BOOKING_LOCK_STRIPES', 64))]
+        app.extensions['booking_locks'] = self
+
+    @contextmanager
+    def hold(self, people):
+        """
+        Lock every (kind, person_id) of 'people' for the duration of the block.
+        The block must contain the conflict check and the commit: the database locks end with the transaction.
+        Not re-entrant, a block never opens another one.
+        """
+        keys = sorted({(PERSON_KINDS[kind], person_id) for kind, person_id in people if person_id is not None})
+        # One fixed order for everyone, so two writers can never wait on each other in a cycle
+        stripes = sorted({hash(key) % len(self._stripes) for key in keys})
+        for index in stripes:
+            self._stripes[index].acquire()
+        try:
+            if keys and db.session.get_bind().dialect.name == 'postgresql':
+                # One round trip for all keys, taken in the same sorted order; no_autoflush keeps pending
+                # changes of the current request from being written before the locks are held
+                with db.session.no_autoflush:
+                    db.session.execute(text(
+                        "SELECT count(pg_advisory_xact_lock(kind, person_id)) FROM ("
+                        "SELECT kind, person_id FROM unnest(CAST(:kinds AS integer[]), CAST(:person_ids AS integer[])) "
+                        "AS k(kind, person_id) ORDER BY kind, person_id) AS ordered"
+                    ), {'kinds': [key[0] for key in keys], 'person_ids': [key[1] for key in keys]})
+            yield
+        finally:
+            for index in reversed(stripes):
+                self._stripes[index].release()
+
+
+booking_locks = BookingLocks()
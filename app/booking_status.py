@@ -0,0 +1,128 @@
+# Finalproject/app/booking_status.py
+import threading
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .extensions import db
+from .models import Booking
+
+# Automatic status transitions for bookings whose end_time has passed.
+#
+# Without it a booking stays 'pending'/'confirmed' forever unless someone PUTs it, one request per booking.
+# Here each batch is ONE set-based statement:
+#   UPDATE bookings SET status = ? WHERE id IN (SELECT id ... WHERE status IN (...) AND end_time <= now LIMIT n)
+# committed on its own, so no transaction holds more than BOOKING_STATUS_BATCH_SIZE rows and no row is loaded
+# into Python.  Updated rows drop out of the predicate: the next batch takes the next ones, and an interrupted
+# run simply carries on the next time.
+#   - confirmed -> completed, pending -> completed (or cancelled with cancel_unconfirmed)
+#   - the summary / change log triggers and the table_versions / report cache hooks see the bulk UPDATE,
+#     the interval index does not care (status is not part of a conflict check)
+#   - nothing is published on GET /api/bookings/stream, clients catch up through GET /api/bookings/changes
+#
+# 'flask complete-past-bookings' runs it once (cron), BOOKING_STATUS_INTERVAL_SECONDS > 0 also runs it in a
+# background thread of the app process.  Several processes running it at once is harmless: on PostgreSQL a
+# batch skips the rows another one has locked, and an already updated row no longer matches.
+
+
+def status_transitions(cancel_unconfirmed=False):
+    # [(statuses moved, new status), ...]
+    if cancel_unconfirmed:
+        return [(('confirmed',), 'completed'), (('pending',), 'cancelled')]
+    return [(('pending', 'confirmed'), 'completed')]
+
+
+def transition_past_bookings(now, batch_size, cancel_unconfirmed=False, max_batches=None, on_batch=None):
+    """
+    Move bookings that ended at or before 'now' (naive UTC) out of pending/confirmed, one transaction per batch.
+    on_batch(new_status, count) is called after each committed batch. Returns {new_status: count}.
+    """
+    moved = {}
+    batches = 0
+    for from_statuses, to_status in status_transitions(cancel_unconfirmed):
+        while max_batches is None or batches < max_batches:
+            # (status, start_time, id) index: start_time < now is implied by end_time <= now and narrows the scan
+            ids = db.select(Booking.id).where(
+                Booking.status.in_(from_statuses),
+                Booking.start_time < now,
+                Booking.end_time <= now
+            ).order_by(Booking.start_time, Booking.id).limit(batch_size)
+            if db.session.get_bind().dialect.name == 'postgresql':
+                # Rows being edited by a request are left for the next run instead of waiting on them
+                ids = ids.with_for_update(skip_locked=True)
+            result = db.session.execute(
+                db.update(Booking).where(Booking.id.in_(ids.scalar_subquery())).values(status=to_status)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            if not result.rowcount:
+                break
+            moved[to_status] = moved.get(to_status, 0) + result.rowcount
+            batches += 1
+            if on_batch:
+                on_batch(to_status, result.rowcount)
+    return moved
+
+
+class BookingStatusWorker:
+    # Daemon thread calling transition_past_bookings every 'interval' seconds, inside an app context
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        app.extensions['booking_status_worker'] = self
+        interval = app.config.get('BOOKING_STATUS_INTERVAL_SECONDS', 0)
+        if interval > 0:
+            self.start(app, interval)
+
+    def start(self, app, interval):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(app, interval), name='booking-status-worker', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, app, interval):
+        # First run after one interval, not while the process (or a 'flask db upgrade') is starting
+        while not self._stop.wait(interval):
+            with app.app_context():
+                try:
+                    transition_past_bookings(
+                        datetime.utcnow(),
+                        app.config.get('BOOKING_STATUS_BATCH_SIZE', 1000),
+                        app.config.get('BOOKING_CANCEL_UNCONFIRMED', False)
+                    )
+                except Exception as e:
+                    print(f"Error updating past booking statuses: {e}")
+                    db.session.rollback()
+
+
+booking_status_worker = BookingStatusWorker()
+
+
+@click.command('complete-past-bookings')
+@click.option('--cancel-unconfirmed/--complete-unconfirmed', default=None,
+              help="Cancel ended pending bookings instead of completing them (default BOOKING_CANCEL_UNCONFIRMED).")
+@click.option('--batch-size', type=int, default=None, help="Bookings updated per transaction (default BOOKING_STATUS_BATCH_SIZE).")
+@click.option('--max-batches', type=int, default=None, help="Stop after this many batches, the next run carries on.")
+@with_appcontext
+def complete_past_bookings_command(cancel_unconfirmed, batch_size, max_batches):
+    """Move ended pending/confirmed bookings to completed (or cancelled)."""
+    if cancel_unconfirmed is None:
+        cancel_unconfirmed = current_app.config.get('BOOKING_CANCEL_UNCONFIRMED', False)
+    now = datetime.utcnow()
+    moved = transition_past_bookings(
+        now, batch_size or current_app.config.get('BOOKING_STATUS_BATCH_SIZE', 1000), cancel_unconfirmed, max_batches,
+        on_batch=lambda status, count: click.echo(f"  {count} bookings -> {status}")
+    )
+    click.echo(f"{sum(moved.values())} bookings ended before {now:%Y-%m-%d %H:%M} updated "
+               f"({', '.join(f'{count} {status}' for status, count in moved.items()) or 'none'})")
@@ -0,0 +1,137 @@
+# Finalproject/app/booking_summary.py
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import DDL, event
+
+from .extensions import db
+from .models import ArchivedBooking, Booking, BookingDailySummary, TrainingElement
+
+# booking_daily_summary (BookingDailySummary) is kept up to date by database triggers:
+#   - a booking INSERT adds 1 to its (date(start_time), instructor, element, status) row,
+#     a DELETE takes 1 away (the row goes at 0), an UPDATE of one of those columns does both,
+#   - a duration_minutes change of a training element rescales its rows (minutes = booking_count x duration),
+#   - archived bookings keep counting: a row entering bookings_archive adds back what its DELETE from bookings took away.
+# Like the change log triggers they run in the writer's transaction on every path (ORM, bulk statements, scripts),
+# so the summary never drifts from bookings.  Migrated databases get the same DDL from Alembic.
+
+_SUMMARY_KEY = (
+    "day = date({row}.start_time) AND instructor_id = COALESCE({row}.instructor_id, 0) "
+    "AND training_element_id = {row}.training_element_id AND status = {row}.status"
+)
+_DURATION = "COALESCE((SELECT duration_minutes FROM training_elements WHERE id = {row}.training_element_id), 0)"
+
+_SQLITE_ADD = (
+    "INSERT INTO booking_daily_summary (day, instructor_id, training_element_id, status, booking_count, minutes) "
+    f"VALUES (date(new.start_time), COALESCE(new.instructor_id, 0), new.training_element_id, new.status, 1, {_DURATION.format(row='new')}) "
+    "ON CONFLICT (day, instructor_id, training_element_id, status) "
+    "DO UPDATE SET booking_count = booking_count + 1, minutes = (booking_count + 1) * excluded.minutes;"
+)
+_SQLITE_REMOVE = (
+    f"UPDATE booking_daily_summary SET booking_count = booking_count - 1, minutes = (booking_count - 1) * {_DURATION.format(row='old')} "
+    f"WHERE {_SUMMARY_KEY.format(row='old')}; "
+    f"DELETE FROM booking_daily_summary WHERE {_SUMMARY_KEY.format(row='old')} AND booking_count <= 0;"
+)
+
+SQLITE_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS bookings_summary_ai AFTER INSERT ON bookings BEGIN {_SQLITE_ADD} END",
+    f"CREATE TRIGGER IF NOT EXISTS bookings_summary_ad AFTER DELETE ON bookings BEGIN {_SQLITE_REMOVE} END",
+    "CREATE TRIGGER IF NOT EXISTS bookings_summary_au AFTER UPDATE OF start_time, instructor_id, training_element_id, status ON bookings "
+    f"BEGIN {_SQLITE_REMOVE} {_SQLITE_ADD} END",
+    "CREATE TRIGGER IF NOT EXISTS training_elements_summary_au AFTER UPDATE OF duration_minutes ON training_elements BEGIN "
+    "UPDATE booking_daily_summary SET minutes = booking_count * new.duration_minutes WHERE training_element_id = new.id; END",
+]
+
+SQLITE_ARCHIVE_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS bookings_archive_summary_ai AFTER INSERT ON bookings_archive BEGIN {_SQLITE_ADD} END",
+    f"CREATE TRIGGER IF NOT EXISTS bookings_archive_summary_ad AFTER DELETE ON bookings_archive BEGIN {_SQLITE_REMOVE} END",
+]
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION update_booking_daily_summary() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE booking_daily_summary SET booking_count = booking_count - 1,
+                minutes = (booking_count - 1) * COALESCE((SELECT duration_minutes FROM training_elements WHERE id = OLD.training_element_id), 0)
+            WHERE day = OLD.start_time::date AND instructor_id = COALESCE(OLD.instructor_id, 0)
+                AND training_element_id = OLD.training_element_id AND status = OLD.status::text;
+            DELETE FROM booking_daily_summary
+            WHERE day = OLD.start_time::date AND instructor_id = COALESCE(OLD.instructor_id, 0)
+                AND training_element_id = OLD.training_element_id AND status = OLD.status::text AND booking_count <= 0;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO booking_daily_summary (day, instructor_id, training_element_id, status, booking_count, minutes)
+            VALUES (NEW.start_time::date, COALESCE(NEW.instructor_id, 0), NEW.training_element_id, NEW.status::text, 1,
+                COALESCE((SELECT duration_minutes FROM training_elements WHERE id = NEW.training_element_id), 0))
+            ON CONFLICT (day, instructor_id, training_element_id, status)
+            DO UPDATE SET booking_count = booking_daily_summary.booking_count + 1,
+                minutes = (booking_daily_summary.booking_count + 1) * EXCLUDED.minutes;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER bookings_daily_summary AFTER INSERT OR DELETE OR UPDATE OF start_time, instructor_id, training_element_id, status "
+    "ON bookings FOR EACH ROW EXECUTE FUNCTION update_booking_daily_summary()",
+    """
+    CREATE OR REPLACE FUNCTION rescale_booking_daily_summary() RETURNS trigger AS $$
+    BEGIN
+        UPDATE booking_daily_summary SET minutes = booking_count * NEW.duration_minutes WHERE training_element_id = NEW.id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER training_elements_daily_summary AFTER UPDATE OF duration_minutes ON training_elements "
+    "FOR EACH ROW EXECUTE FUNCTION rescale_booking_daily_summary()",
+]
+
+POSTGRES_ARCHIVE_TRIGGERS = [
+    "CREATE TRIGGER bookings_archive_daily_summary AFTER INSERT OR DELETE ON bookings_archive "
+    "FOR EACH ROW EXECUTE FUNCTION update_booking_daily_summary()",
+]
+
+# db.create_all(): attached to the tables the triggers fire on, booking_daily_summary is only needed when they run
+for _statement in SQLITE_TRIGGERS:
+    _table = TrainingElement.__table__ if 'ON training_elements' in _statement else Booking.__table__
+    event.listen(_table, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_TRIGGERS:
+    _table = TrainingElement.__table__ if 'ON training_elements' in _statement else Booking.__table__
+    event.listen(_table, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+for _statement in SQLITE_ARCHIVE_TRIGGERS:
+    event.listen(ArchivedBooking.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_ARCHIVE_TRIGGERS:
+    # Needs the function created with bookings, nothing orders the two tables: wait until every table exists
+    event.listen(db.metadata, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def rebuild_booking_summary():
+    # Recompute every row with one INSERT ... SELECT ... GROUP BY (backfill, repair after restoring a backup, ...)
+    # over the active and the archived bookings
+    columns = ('start_time', 'instructor_id', 'training_element_id', 'status')
+    bookings = db.union_all(
+        db.select(*(getattr(Booking, name) for name in columns)),
+        db.select(*(getattr(ArchivedBooking, name) for name in columns))
+    ).subquery()
+    day = db.func.date(bookings.c.start_time)
+    instructor_id = db.func.coalesce(bookings.c.instructor_id, 0)
+    booking_count = db.func.count()
+    totals = db.select(
+        day, instructor_id, bookings.c.training_element_id, db.cast(bookings.c.status, db.String(20)),
+        booking_count, booking_count * TrainingElement.duration_minutes
+    ).join(TrainingElement, bookings.c.training_element_id == TrainingElement.id).group_by(
+        day, instructor_id, bookings.c.training_element_id, bookings.c.status, TrainingElement.duration_minutes
+    )
+    db.session.execute(db.delete(BookingDailySummary))
+    db.session.execute(db.insert(BookingDailySummary).from_select(
+        ['day', 'instructor_id', 'training_element_id', 'status', 'booking_count', 'minutes'], totals
+    ))
+    db.session.commit()
+    return db.session.query(db.func.count()).select_from(BookingDailySummary).scalar()
+
+
+@click.command('rebuild-booking-summary')
+@with_appcontext
+def rebuild_booking_summary_command():
+    """Recompute the booking_daily_summary table from bookings."""
+    rows = rebuild_booking_summary()
+    click.echo(f"booking_daily_summary rebuilt: {rows} rows")
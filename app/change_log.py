@@ -0,0 +1,114 @@
+# Finalproject/app/change_log.py
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import DDL, event, text, tuple_
+
+from .extensions import db
+from .models import Booking, BookingChange
+
+# Triggers feeding the booking_changes log (BookingChange) used by GET /api/bookings/changes.
+# Living in the database, they record every INSERT/UPDATE/DELETE on bookings in the writer's transaction,
+# whether it comes from the ORM, a bulk statement or a script.  Migrated databases get the same DDL from Alembic.
+#
+# Order of the log, and so of the sync tokens (change_log_keys()):
+#   - SQLite: seq.  Writers are serialized by the database lock, a change with a higher seq always commits later.
+#   - PostgreSQL: (txid, seq).  seq comes from a sequence and is taken at INSERT time: a transaction holding
+#     seq 9 can commit after another one holding seq 10, and a token handed out after 10 would skip 9 for good.
+#     Each change therefore records the id of its transaction, and readers only see the changes of
+#     transactions below committed_horizon(), the oldest one still running: every change of those is visible
+#     already, and any transaction still to commit sorts after them.  Changes of running and newer transactions
+#     are held back until the next call.  Needs PostgreSQL 13+ (pg_current_xact_id, pg_current_snapshot).
+#
+# The log only grows: 'flask prune-booking-changes' drops changes older than BOOKING_CHANGES_RETENTION_DAYS,
+# oldest first, BOOKING_CHANGES_PRUNE_BATCH_SIZE rows per transaction.  A client whose token points before
+# what is left gets 410 from the endpoint and reloads the full list, so retention bounds how long a client may
+# stay offline and still sync incrementally.
+
+SQLITE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS bookings_changes_ai AFTER INSERT ON bookings BEGIN "
+    "INSERT INTO booking_changes (booking_id, action, changed_at) VALUES (new.id, 'upsert', CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER IF NOT EXISTS bookings_changes_au AFTER UPDATE ON bookings BEGIN "
+    "INSERT INTO booking_changes (booking_id, action, changed_at) VALUES (new.id, 'upsert', CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER IF NOT EXISTS bookings_changes_ad AFTER DELETE ON bookings BEGIN "
+    "INSERT INTO booking_changes (booking_id, action, changed_at) VALUES (old.id, 'delete', CURRENT_TIMESTAMP); END",
+]
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION record_booking_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO booking_changes (booking_id, action, changed_at, txid)
+            VALUES (OLD.id, 'delete', now(), pg_current_xact_id()::text::bigint);
+            RETURN OLD;
+        END IF;
+        INSERT INTO booking_changes (booking_id, action, changed_at, txid)
+        VALUES (NEW.id, 'upsert', now(), pg_current_xact_id()::text::bigint);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER bookings_changes AFTER INSERT OR UPDATE OR DELETE ON bookings "
+    "FOR EACH ROW EXECUTE FUNCTION record_booking_change()",
+]
+
+# db.create_all(): the trigger body only needs booking_changes when it fires, so creation order does not matter
+for _statement in SQLITE_TRIGGERS:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_TRIGGERS:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def change_log_keys():
+    # Sort key of the log and columns of the sync tokens, see above
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return (BookingChange.txid, BookingChange.seq)
+    return (BookingChange.seq,)
+
+
+def committed_horizon():
+    # PostgreSQL only: id of the oldest transaction still running (xmin of the current snapshot).
+    # Every transaction below it has ended, so all of its changes are visible to this one.
+    return db.session.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+
+
+def prune_booking_changes(cutoff, batch_size, max_batches=None):
+    """
+    Delete the changes recorded before 'cutoff', one transaction per batch. Returns the number of changes deleted.
+    Only a prefix of the log goes (everything before the oldest change kept) and the newest change always stays,
+    so GET /api/bookings/changes can tell from the oldest remaining change whether a token lost anything.
+    """
+    keys = change_log_keys()
+    # In log order from its start: cheap while the old changes are few, and they are what goes
+    keep_from = db.session.query(*keys).filter(BookingChange.changed_at >= cutoff).order_by(*keys).first()
+    newest = db.session.query(*keys).order_by(*(key.desc() for key in keys)).first()
+    if newest is None:
+        return 0
+    keep_from = tuple(newest) if keep_from is None else min(tuple(keep_from), tuple(newest))
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        seqs = db.session.query(BookingChange.seq).filter(tuple_(*keys) < tuple_(*keep_from)).order_by(*keys).limit(batch_size)
+        count = BookingChange.query.filter(BookingChange.seq.in_(seqs.scalar_subquery())).delete(synchronize_session=False)
+        db.session.commit()
+        if not count:
+            break
+        deleted += count
+        batches += 1
+    return deleted
+
+
+@click.command('prune-booking-changes')
+@click.option('--older-than-days', type=int, default=None, help="Retention horizon in days (default BOOKING_CHANGES_RETENTION_DAYS).")
+@click.option('--batch-size', type=int, default=None, help="Changes deleted per transaction (default BOOKING_CHANGES_PRUNE_BATCH_SIZE).")
+@click.option('--max-batches', type=int, default=None, help="Stop after this many batches, the next run carries on.")
+@with_appcontext
+def prune_booking_changes_command(older_than_days, batch_size, max_batches):
+    """Delete old entries of the booking change log."""
+    days = older_than_days if older_than_days is not None else current_app.config.get('BOOKING_CHANGES_RETENTION_DAYS', 30)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = prune_booking_changes(cutoff, batch_size or current_app.config.get('BOOKING_CHANGES_PRUNE_BATCH_SIZE', 5000), max_batches)
+    click.echo(f"{deleted} booking changes recorded before {cutoff:%Y-%m-%d %H:%M} deleted")
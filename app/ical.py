@@ -0,0 +1,71 @@
+# Finalproject/app/ical.py
+
+# Minimal iCalendar (RFC 5545) writer for the booking feeds (routes/calendar_feed.py).
+# Each function returns finished text (CRLF line endings, long lines folded) so the feed can be
+# streamed one VEVENT at a time, this module never touches the database.
+
+PRODUCT_ID = '-//Training Scheduler//Booking feed//EN'
+
+# Booking status -> VEVENT STATUS
+EVENT_STATUSES = {
+    'pending': 'TENTATIVE',
+    'confirmed': 'CONFIRMED',
+    'completed': 'CONFIRMED',
+    'cancelled': 'CANCELLED',
+}
+
+
+def escape_text(value):
+    # TEXT values: backslash, semicolon, comma and newlines are escaped
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def format_utc(value):
+    # Stored datetimes are naive UTC
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def fold_line(line):
+    # Content lines are limited to 75 octets, continuation lines start with a space
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a multi-byte UTF-8 character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode('utf-8'))
+        start = end
+        limit = 74 # room for the leading space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def calendar_header(name):
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODUCT_ID}', 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+             f'X-WR-CALNAME:{escape_text(name)}']
+    return ''.join(fold_line(line) for line in lines)
+
+
+def calendar_footer():
+    return 'END:VCALENDAR\r\n'
+
+
+def booking_event(uid, start_time, end_time, stamp, status, summary, description):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{format_utc(stamp)}',
+        f'DTSTART:{format_utc(start_time)}',
+        f'DTEND:{format_utc(end_time)}',
+        f'STATUS:{EVENT_STATUSES.get(status, "CONFIRMED")}',
+        f'SUMMARY:{escape_text(summary)}',
+    ]
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in lines)
@@ -0,0 +1,285 @@
+# Finalproject/app/interval_index.py
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from .extensions import db
+from .models import Booking
+
+# In-memory interval index used to answer "does [start, end) overlap any booking of this instructor/student?"
+# without a database round trip for every create/update.
+#
+# For each person we keep their bookings as a list sorted by start_time.  Bookings of one person never overlap
+# each other (the conflict check forbids it), so only the booking starting right before 'end' can overlap
+# [start, end) and a check is one binary search: O(log n).
+#
+# The index is only ever trusted to say "no overlap".  A hit, a cold (not yet loaded) person, or a person whose
+# stored bookings already overlap each other (legacy data) sends the caller to SQL, which stays the source of truth.
+# Changes are collected while the session flushes and applied once the transaction commits, a rollback discards them.
+#
+# That "no overlap" is only exact for writes made by THIS process.  With several worker processes a booking
+# committed by another one is invisible until the person's entry expires (BOOKING_INDEX_TTL_SECONDS, a few
+# seconds by default), so the index assumes a single process; multi-process deployments rely on the overlap
+# guard triggers (app/booking_locks.py) to reject what the index misses, or set BOOKING_INDEX_ENABLED=false.
+#
+# A person is loaded from "now" onwards, not their whole history: the rows starting at most
+# BOOKING_INDEX_MAX_DURATION_HOURS before the load (one range read on the (person, start_time) index), so every
+# booking of that length or shorter that can still reach "now" is in.  Checks starting before the load time go
+# to SQL.  A longer booking starting before that bound is not seen by the index, the guard triggers reject it.
+
+# Index keys are ('instructor', id) / ('student', id), matching Booking.instructor_id / Booking.student_id
+PERSON_COLUMNS = {
+    'instructor': Booking.instructor_id,
+    'student': Booking.student_id,
+}
+
+
+def to_naive(value):
+    # SQLite stores DateTime without tzinfo, compare the same way so aware and naive values never get mixed
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo is not None else value
+
+
+def merge_intervals(intervals):
+    # Sweep-line merge: sort by start and fold overlapping/touching [start, end) pairs into disjoint ones
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_intervals(windows, busy, min_length):
+    # Sweep-line difference: the parts of each window not covered by 'busy', keeping gaps of at least min_length.
+    # windows and busy must both be sorted and disjoint (see merge_intervals), the pass is linear in their sizes.
+    gaps = []
+    position = 0
+    for window_start, window_end in windows:
+        while position < len(busy) and busy[position][1] <= window_start:
+            position += 1
+        cursor = window_start
+        index = position
+        while index < len(busy) and busy[index][0] < window_end:
+            if busy[index][0] - cursor >= min_length:
+                gaps.append((cursor, busy[index][0]))
+            cursor = max(cursor, busy[index][1])
+            index += 1
+        if window_end - cursor >= min_length:
+            gaps.append((cursor, window_end))
+    return gaps
+
+
+class IntervalSet:
+    """
+    Disjoint, sorted [start, end) intervals with O(log n) overlap checks.
+    Overlapping input is merged, so the result is exact even when the source intervals overlap each other.
+    """
+    def __init__(self, intervals=()):
+        merged = merge_intervals(intervals)
+        self.starts = [start for start, end in merged]
+        self.ends = [end for start, end in merged]
+
+    def overlaps(self, start, end):
+        position = bisect_left(self.starts, end)
+        return position > 0 and self.ends[position - 1] > start
+
+    def add(self, start, end):
+        # Merge [start, end) with every interval it overlaps or touches
+        low = bisect_left(self.ends, start)
+        high = bisect_left(self.starts, end)
+        if high < len(self.starts) and self.starts[high] == end:
+            high += 1
+        if low < high:
+            start = min(start, self.starts[low])
+            end = max(end, self.ends[high - 1])
+        self.starts[low:high] = [start]
+        self.ends[low:high] = [end]
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+
+class _PersonIntervals:
+    def __init__(self, rows, covered_from):
+        # entries: (start_time, end_time, booking_id) sorted by start_time, starts: parallel list for bisect
+        # covered_from: the index only answers for checks starting at or after it, see the module comment
+        self.covered_from = covered_from
+        self.entries = sorted((to_naive(start), to_naive(end), booking_id) for booking_id, start, end in rows)
+        self.starts = [entry[0] for entry in self.entries]
+        self.loaded_at = time.monotonic()
+        self.disjoint = all(
+            self.entries[i][1] <= self.entries[i + 1][0] for i in range(len(self.entries) - 1)
+        )
+
+    def add(self, start, end, booking_id):
+        entry = (start, end, booking_id)
+        position = bisect_left(self.entries, entry)
+        self.entries.insert(position, entry)
+        self.starts.insert(position, start)
+        # Keep track of whether the disjoint invariant still holds around the new entry
+        if position > 0 and self.entries[position - 1][1] > start:
+            self.disjoint = False
+        if position + 1 < len(self.entries) and end > self.entries[position + 1][0]:
+            self.disjoint = False
+
+    def remove(self, booking_id):
+        for position, entry in enumerate(self.entries):
+            if entry[2] == booking_id:
+                del self.entries[position]
+                del self.starts[position]
+                return
+
+    def overlaps(self, start, end, exclude_id=None):
+        # Every entry before 'position' starts before 'end', walk back past the excluded booking (if any)
+        position = bisect_left(self.starts, end)
+        while position > 0:
+            entry_start, entry_end, booking_id = self.entries[position - 1]
+            if booking_id != exclude_id:
+                return entry_end > start
+            position -= 1
+        return False
+
+
+class BookingIntervalIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._people = {}       # (kind, person_id) -> _PersonIntervals
+        self._booking_keys = {}  # booking_id -> [(kind, person_id), ...] it is indexed under
+        self._generation = 0     # bumped by every applied commit and invalidation, see _get_or_load
+        self.enabled = False
+        self.ttl_seconds = None
+        self.max_duration = timedelta(hours=24)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('BOOKING_INDEX_ENABLED', True)
+        # Entries expire so that writes made by other processes are picked up again after a few seconds
+        self.ttl_seconds = app.config.get('BOOKING_INDEX_TTL_SECONDS', 5)
+        self.max_duration = timedelta(hours=app.config.get('BOOKING_INDEX_MAX_DURATION_HOURS', 24))
+        if not getattr(self, '_listening', False):
+            event.listen(Booking, 'after_insert', self._on_upsert)
+            event.listen(Booking, 'after_update', self._on_upsert)
+            event.listen(Booking, 'after_delete', self._on_delete)
+            event.listen(db.session, 'after_commit', self._on_commit)
+            event.listen(db.session, 'after_soft_rollback', self._on_rollback)
+            self._listening = True
+        app.extensions['booking_index'] = self
+
+    # --- Queries ---
+    def may_overlap(self, kind, person_id, start, end, exclude_id=None):
+        """
+        Returns False when the index proves that [start, end) is free for this person,
+        True when the caller has to confirm with SQL (hit, index disabled, untrusted data, or before the loaded window).
+        """
+        if not self.enabled or person_id is None:
+            return True
+        start, end = to_naive(start), to_naive(end)
+        intervals = self._get_or_load(kind, person_id)
+        if not intervals.disjoint or start < intervals.covered_from:
+            return True
+        with self._lock:
+            return intervals.overlaps(start, end, exclude_id)
+
+    def _get_or_load(self, kind, person_id):
+        key = (kind, person_id)
+        with self._lock:
+            intervals = self._people.get(key)
+            if intervals is not None and time.monotonic() - intervals.loaded_at < self.ttl_seconds:
+                return intervals
+            generation = self._generation
+        # Cold (or expired): one indexed range query for this person's bookings from "now" on, read outside the lock.
+        # no_autoflush keeps a half-edited booking of the current request from leaking into the index.
+        column = PERSON_COLUMNS[kind]
+        covered_from = datetime.utcnow()
+        with db.session.no_autoflush:
+            rows = db.session.query(Booking.id, Booking.start_time, Booking.end_time).filter(
+                column == person_id,
+                Booking.start_time >= covered_from - self.max_duration
+            ).all()
+        intervals = _PersonIntervals(rows, covered_from)
+        with self._lock:
+            # A commit applied while we were reading may be missing from 'rows' (cold people are skipped by _apply),
+            # so the result answers this call only and the next one reloads
+            if self._generation != generation:
+                return intervals
+            if key in self._people:
+                self._forget_key(key)
+            self._people[key] = intervals
+            for booking_id in (entry[2] for entry in intervals.entries):
+                self._booking_keys.setdefault(booking_id, []).append(key)
+        return intervals
+
+    # --- Maintenance ---
+    def invalidate(self, kind=None, person_id=None):
+        # Drop one person (or everything) so the next check reloads from the database.
+        # Needed after bulk UPDATE/DELETE statements, which do not go through the mapper events.
+        with self._lock:
+            self._generation += 1
+            if kind is None:
+                self._people.clear()
+                self._booking_keys.clear()
+            else:
+                self._forget_key((kind, person_id))
+
+    def _forget_key(self, key):
+        intervals = self._people.pop(key, None)
+        if intervals is None:
+            return
+        for booking_id in (entry[2] for entry in intervals.entries):
+            keys = self._booking_keys.get(booking_id)
+            if keys and key in keys:
+                keys.remove(key)
+                if not keys:
+                    del self._booking_keys[booking_id]
+
+    def _remove_booking(self, booking_id):
+        for key in self._booking_keys.pop(booking_id, []):
+            intervals = self._people.get(key)
+            if intervals is not None:
+                intervals.remove(booking_id)
+
+    def _apply(self, changes):
+        with self._lock:
+            self._generation += 1
+            for action, booking_id, people, start, end in changes:
+                self._remove_booking(booking_id)
+                if action == 'delete':
+                    continue
+                for key in people:
+                    # Only people that are already warm are updated, cold ones will load the committed row anyway
+                    intervals = self._people.get(key)
+                    if intervals is not None:
+                        intervals.add(start, end, booking_id)
+                        self._booking_keys.setdefault(booking_id, []).append(key)
+
+    # --- SQLAlchemy event handlers ---
+    @staticmethod
+    def _pending(booking):
+        # Changes are queued on the session that is flushing them until it commits or rolls back
+        return object_session(booking).info.setdefault('booking_index_changes', [])
+
+    def _on_upsert(self, mapper, connection, booking):
+        people = [(kind, getattr(booking, column.key)) for kind, column in PERSON_COLUMNS.items()
+                  if getattr(booking, column.key) is not None]
+        self._pending(booking).append(
+            ('upsert', booking.id, people, to_naive(booking.start_time), to_naive(booking.end_time))
+        )
+
+    def _on_delete(self, mapper, connection, booking):
+        self._pending(booking).append(('delete', booking.id, [], None, None))
+
+    def _on_commit(self, session):
+        changes = session.info.pop('booking_index_changes', None)
+        if changes:
+            self._apply(changes)
+
+    def _on_rollback(self, session, previous_transaction):
+        session.info.pop('booking_index_changes', None)
+
+
+booking_index = BookingIntervalIndex()
@@ -0,0 +1,53 @@
+# Finalproject/app/json_provider.py
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError: # optional, the stdlib json module is used without it
+    orjson = None
+
+# JSON provider used by jsonify() / app.json (registered in create_app)
+#
+# - datetime / date / time values are written as ISO 8601 strings ("2025-07-01T09:00:00"),
+#   so the serializers hand over the raw column values instead of calling .isoformat() on every field.
+#   (Flask's default would write datetimes as HTTP dates, "Tue, 01 Jul 2025 09:00:00 GMT".)
+# - With orjson installed, encoding and decoding go through it (native datetime support, written in Rust),
+#   otherwise through the stdlib json module with the same output.
+# - Keys are not sorted: nothing relies on the order and sorting large lists costs time.
+
+# Integer keys are allowed (e.g. the lookup tables of the calendar endpoint), like json.dumps does
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    sort_keys = False
+
+    @staticmethod
+    def default(value):
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        return DefaultJSONProvider.default(value)
+
+    def dumps(self, obj, **kwargs):
+        # Extra json.dumps arguments (indent, cls, ...) are only understood by the stdlib
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS).decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        option = _ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        # orjson returns bytes, hand them over without a decode/encode round trip
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype)
@@ -1,9 +1,10 @@
 # Finalproject/app/models.py
 from flask_login import UserMixin
-from .extensions import db, bcrypt
+from .extensions import db
+from .passwords import password_hasher
 
 # --- User Model ---
-# User (id, email, password_hash, first_name, last_name, role: admin/instructor/student, created_at, updated_at)
+# User (id, email, password_hash, first_name, last_name, role: admin/instructor/student, calendar_feed_version, token_version, created_at, updated_at)
 class User(db.Model, UserMixin):
     __tablename__ = 'users'
 
@@ -13,6 +14,10 @@ class User(db.Model, UserMixin):
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
     role = db.Column(db.Enum('admin', 'instructor', 'student', name='user_roles'), nullable=False)
+    # Part of the signed calendar feed token (routes/calendar_feed.py), bumping it revokes every issued feed URL
+    calendar_feed_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Part of the signed access tokens (app/access_tokens.py), bumping it revokes every token issued so far
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=db.func.now())
     updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
 
@@ -38,11 +43,12 @@ class User(db.Model, UserMixin):
         # Flask-Login expects the ID returned by get_id() to be a string
         return str(self.id)
     # Methods for password handling - critical for Flask-Login
+    # Both run on the password hashing pool (app/passwords.py) and raise PasswordHasherBusy (503) when it is full
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
 
 # --- Training Element Model ---
 # TrainingElement (id, name, description, duration_minutes, session_type, material_link, created_at, updated_at)
@@ -65,6 +71,19 @@ class TrainingElement(db.Model):
 # Booking (id, training_element_id, start_time, end_time, instructor_id, student_id,created_by_user_id, created_at, updated_at)
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    # Composite indexes for the hot access paths in routes/bookings.py
+    #   - instructor/student overlap checks: person_id = ? AND start_time < ? AND end_time > ?
+    #   - list filters on status / created_by_user_id, paginated by (start_time, id)
+    # Keep in sync with migrations/versions/b7c2e4f1a9d3_add_booking_composite_indexes.py
+    __table_args__ = (
+        db.Index('ix_bookings_instructor_id_start_time', 'instructor_id', 'start_time', 'end_time'),
+        db.Index('ix_bookings_student_id_start_time', 'student_id', 'start_time', 'end_time'),
+        db.Index('ix_bookings_status_start_time', 'status', 'start_time', 'id'),
+        db.Index('ix_bookings_created_by_user_id_start_time', 'created_by_user_id', 'start_time', 'id'),
+        db.Index('ix_bookings_start_time_id', 'start_time', 'id'),
+        # Ids are never handed out twice, archived bookings (ArchivedBooking) keep theirs
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     training_element_id = db.Column(db.Integer, db.ForeignKey('training_elements.id'), nullable=False)
@@ -77,6 +96,8 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.now())
     updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
     notes = db.Column(db.Text, nullable=True)
+    # Set when the booking is one occurrence of a recurring BookingSeries
+    series_id = db.Column(db.Integer, db.ForeignKey('booking_series.id'), nullable=True, index=True)
 
     # Relationships on Booking
     training_element = db.relationship(
@@ -98,4 +119,111 @@ class Booking(db.Model):
         'User',
         foreign_keys=[created_by_user_id],
         back_populates='created_bookings'
-    )
\ No newline at end of file
+    )
+    series = db.relationship('BookingSeries', back_populates='bookings')
+
+# --- Archived Booking Model ---
+# ArchivedBooking (same columns as Booking, archived_at)
+# Completed/cancelled bookings that ended before the retention horizon, moved out of 'bookings' in batches by
+# 'flask archive-bookings' (see app/archive.py) so conflict checks and list queries only scan the active schedule.
+# Rows keep their booking id and are read-only; the list, export, calendar and report endpoints read them too
+# when the requested dates reach back before the newest archived booking.
+class ArchivedBooking(db.Model):
+    __tablename__ = 'bookings_archive'
+    __table_args__ = (
+        db.Index('ix_bookings_archive_start_time_id', 'start_time', 'id'),
+        db.Index('ix_bookings_archive_end_time', 'end_time'),
+        db.Index('ix_bookings_archive_instructor_id_start_time', 'instructor_id', 'start_time'),
+        db.Index('ix_bookings_archive_student_id_start_time', 'student_id', 'start_time'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    training_element_id = db.Column(db.Integer, db.ForeignKey('training_elements.id'), nullable=False)
+    instructor_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    student_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.Enum('pending', 'confirmed', 'completed', 'cancelled', name='booking_statuses'), nullable=False)
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    notes = db.Column(db.Text, nullable=True)
+    series_id = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime, default=db.func.now())
+
+    # Read-only relationships, enough for serialize_booking
+    training_element = db.relationship('TrainingElement', viewonly=True)
+    instructor = db.relationship('User', foreign_keys=[instructor_id], viewonly=True)
+    student = db.relationship('User', foreign_keys=[student_id], viewonly=True)
+    created_by = db.relationship('User', foreign_keys=[created_by_user_id], viewonly=True)
+
+# --- Booking Series Model ---
+# BookingSeries (id, training_element_id, instructor_id, student_id, freq, interval, count, until, created_by_user_id, created_at, updated_at)
+# RRULE-like recurrence (daily/weekly every 'interval' days/weeks, 'count' occurrences or 'until' a date)
+# The series is the template, each occurrence is stored as a regular Booking row pointing back to it
+class BookingSeries(db.Model):
+    __tablename__ = 'booking_series'
+
+    id = db.Column(db.Integer, primary_key=True)
+    training_element_id = db.Column(db.Integer, db.ForeignKey('training_elements.id'), nullable=False)
+    instructor_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    student_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    freq = db.Column(db.Enum('daily', 'weekly', name='series_frequencies'), nullable=False)
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    count = db.Column(db.Integer, nullable=True)
+    until = db.Column(db.DateTime, nullable=True)
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=db.func.now())
+    updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+
+    bookings = db.relationship('Booking', back_populates='series', order_by='Booking.start_time')
+
+# --- Table Version Model ---
+# TableVersion (table_name, version)
+# Change counter per table, bumped right after every transaction that wrote to it commits (see app/table_versions.py).
+# List endpoints derive their ETag from it, so an unchanged list is answered with 304 without querying it.
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# --- Booking Change Model ---
+# BookingChange (seq, booking_id, action: upsert/delete, changed_at, txid)
+# Append-only change log of the bookings table, written by database triggers (see app/change_log.py)
+# so every write path is captured, including bulk UPDATEs and hard deletes (tombstones).
+# 'seq' only ever grows (AUTOINCREMENT on SQLite) and is the position clients sync from;
+# on PostgreSQL the position is (txid, seq), as sequence values can commit out of order.
+class BookingChange(db.Model):
+    __tablename__ = 'booking_changes'
+    __table_args__ = (
+        # PostgreSQL reads the log in (txid, seq) order, see app/change_log.py
+        db.Index('ix_booking_changes_txid_seq', 'txid', 'seq'),
+        {'sqlite_autoincrement': True},
+    )
+
+    seq = db.Column(db.Integer, primary_key=True)
+    booking_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.Enum('upsert', 'delete', name='booking_change_actions'), nullable=False)
+    changed_at = db.Column(db.DateTime, default=db.func.now())
+    # Writing transaction (PostgreSQL pg_current_xact_id()), NULL on SQLite
+    txid = db.Column(db.BigInteger, nullable=True)
+
+# --- Booking Daily Summary Model ---
+# BookingDailySummary (day, instructor_id, training_element_id, status, booking_count, minutes)
+# Per-day counters of bookings (by start_time date) for dashboards and reports, so they read O(days) rows
+# instead of every booking.  Maintained by database triggers in the same transaction as each booking write
+# (see app/booking_summary.py), 'flask rebuild-booking-summary' recomputes it from scratch.
+# instructor_id 0 = booking without instructor; minutes = booking_count x the element's duration_minutes.
+class BookingDailySummary(db.Model):
+    __tablename__ = 'booking_daily_summary'
+    __table_args__ = (
+        db.Index('ix_booking_daily_summary_instructor_id_day', 'instructor_id', 'day'),
+    )
+
+    day = db.Column(db.Date, primary_key=True)
+    instructor_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    training_element_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    status = db.Column(db.String(20), primary_key=True)
+    booking_count = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Integer, nullable=False, default=0)
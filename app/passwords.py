@@ -0,0 +1,74 @@
+# Finalproject/app/passwords.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import ServiceUnavailable
+
+from .extensions import bcrypt
+
+# bcrypt hashing/verification off the request threads, with bounded concurrency.
+#
+# One bcrypt call burns ~0.25s of CPU at cost 12.  Run inline, a burst of logins (shift change) keeps every
+# worker thread busy hashing and even GET /ping waits for a free one.  Here every hash/check goes through a pool
+# of PASSWORD_HASH_WORKERS threads (bcrypt releases the GIL, so they use real cores) and at most
+# PASSWORD_HASH_MAX_PENDING more calls may wait for one of them.  Past that the request is refused at once with
+# a 503 + Retry-After instead of queueing up behind the others: the backlog, and so the latency of a login,
+# stays bounded and the rest of the API keeps its threads.
+#
+# The work factor is BCRYPT_LOG_ROUNDS (per config, 4 in TestingConfig).  A stored hash made with another cost
+# is replaced on the next successful login, the only moment the plain password is at hand (routes/auth.py).
+
+
+class PasswordHasherBusy(ServiceUnavailable):
+    description = "Too many password checks in progress, please retry in a moment."
+
+
+class PasswordHasher:
+    def __init__(self):
+        self._executor = None  # None: hash in the calling thread (app not initialized, or PASSWORD_HASH_WORKERS = 0)
+        self._slots = None     # running + waiting calls
+        self.rounds = 12
+        self.retry_after = 1
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        workers = app.config.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+            self._slots = threading.BoundedSemaphore(workers + app.config.get('PASSWORD_HASH_MAX_PENDING', 16))
+        app.extensions['password_hasher'] = self
+
+    # --- API ---
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def check(self, password_hash, password):
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # bcrypt hashes read '$2b$<cost>$<salt+hash>'
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def _run(self, function, *args):
+        if self._executor is None:
+            return function(*args)
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy(retry_after=self.retry_after)
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,111 @@
+# Finalproject/app/report_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+
+from .extensions import db
+from .models import Booking, TrainingElement
+
+# In-memory cache of report results (routes/reports.py), keyed by (report, range_start, range_end, params).
+#
+# An entry only depends on the bookings starting inside its [range_start, range_end), so a booking write
+# drops just the entries whose range contains the old or new start_time of that booking.
+# Writes the mapper events cannot describe (bulk statements on bookings, a training element duration change)
+# drop everything.  Like the interval index, changes are collected while the session flushes and applied
+# once it commits; entries also expire after a TTL so writes made by other worker processes show up.
+
+
+class ReportCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> (value, stored_at), least recently used first
+        self._generation = 0          # bumped by every invalidation, see get_or_compute
+        self.ttl_seconds = 300
+        self.max_entries = 256
+
+    def init_app(self, app):
+        self.ttl_seconds = app.config.get('REPORT_CACHE_TTL_SECONDS', 300)
+        self.max_entries = app.config.get('REPORT_CACHE_MAX_ENTRIES', 256)
+        if not getattr(self, '_listening', False):
+            event.listen(Booking, 'after_insert', self._on_booking_write)
+            event.listen(Booking, 'after_update', self._on_booking_write)
+            event.listen(Booking, 'after_delete', self._on_booking_write)
+            event.listen(TrainingElement, 'after_update', self._on_training_element_update)
+            event.listen(db.session, 'do_orm_execute', self._on_bulk_statement)
+            event.listen(db.session, 'after_commit', self._on_commit)
+            event.listen(db.session, 'after_soft_rollback', self._on_rollback)
+            self._listening = True
+        app.extensions['report_cache'] = self
+
+    # --- Queries ---
+    def get_or_compute(self, report, range_start, range_end, params, compute):
+        key = (report, range_start, range_end, params)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and time.monotonic() - cached[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return cached[0]
+            generation = self._generation
+        # Computed outside the lock, two requests may compute the same report once each
+        value = compute()
+        with self._lock:
+            # A write committed while we were computing may be missing from 'value': answer this call only
+            if self._generation != generation:
+                return value
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    # --- Maintenance ---
+    def invalidate(self, moments=None):
+        # Drop the entries whose range contains one of 'moments' (datetimes), or every entry with None
+        with self._lock:
+            self._generation += 1
+            if moments is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if any(key[1] <= moment < key[2] for moment in moments)]:
+                del self._entries[key]
+
+    # --- SQLAlchemy event handlers ---
+    @staticmethod
+    def _pending(session):
+        return session.info.setdefault('report_cache_changes', [])
+
+    def _on_booking_write(self, mapper, connection, booking):
+        # New start_time and, for an update that moved the booking, the old one
+        history = inspect(booking).attrs.start_time.history
+        moments = [value.replace(tzinfo=None) for value in (*history.added, *history.unchanged, *history.deleted) if value is not None]
+        # start_time not loaded (expired instance): the affected range is unknown
+        self._pending(object_session(booking)).append(moments or None)
+
+    def _on_training_element_update(self, mapper, connection, training_element):
+        if inspect(training_element).attrs.duration_minutes.history.has_changes():
+            self._pending(object_session(training_element)).append(None)
+
+    def _on_bulk_statement(self, orm_execute_state):
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in (Booking, TrainingElement):
+            self._pending(orm_execute_state.session).append(None)
+
+    def _on_commit(self, session):
+        changes = session.info.pop('report_cache_changes', None)
+        if not changes:
+            return
+        if any(moments is None for moments in changes):
+            self.invalidate()
+        else:
+            self.invalidate([moment for moments in changes for moment in moments])
+
+    def _on_rollback(self, session, previous_transaction):
+        session.info.pop('report_cache_changes', None)
+
+
+report_cache = ReportCache()
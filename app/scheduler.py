@@ -0,0 +1,65 @@
+# Finalproject/app/scheduler.py
+from datetime import timedelta
+
+# Auto-scheduling engine: place many students with a pool of instructors in one pass, entirely in memory.
+# The caller loads busy time once (range queries) and persists the result (bulk insert), this module never touches the database.
+#
+# Greedy earliest-fit with load balancing:
+#   - the window is cut into back-to-back candidate slots of the session length,
+#   - every slot keeps the instructors that are still free at that time,
+#   - each student gets the earliest slot where they are free and at least one instructor is,
+#     taken by the least loaded free instructor (ties go to the lowest id).
+# A pointer skips over fully booked slots, so the cost grows with students + slots rather than students x slots.
+
+
+def build_slots(windows, duration_minutes):
+    # Back-to-back [start, start + duration) slots inside every working window
+    step = timedelta(minutes=duration_minutes)
+    slots = []
+    for window_start, window_end in windows:
+        start = window_start
+        while start + step <= window_end:
+            slots.append((start, start + step))
+            start += step
+    return slots
+
+
+def auto_schedule(student_ids, instructor_ids, slots, instructor_busy, student_busy):
+    """
+    student_ids: students to place, in priority order
+    instructor_ids: the instructor pool
+    slots: sorted, non-overlapping (start_time, end_time) candidates (see build_slots)
+    instructor_busy / student_busy: id -> IntervalSet of existing bookings (missing = free)
+    Returns (assignments, unassigned) where assignments is a list of
+    (student_id, instructor_id, start_time, end_time) and unassigned a list of student ids without a slot.
+    """
+    free_instructors = []
+    for start_time, end_time in slots:
+        free_instructors.append([
+            instructor_id for instructor_id in instructor_ids
+            if instructor_id not in instructor_busy or not instructor_busy[instructor_id].overlaps(start_time, end_time)
+        ])
+    load = {instructor_id: 0 for instructor_id in instructor_ids}
+
+    assignments = []
+    unassigned = []
+    first_open = 0
+    for student_id in student_ids:
+        while first_open < len(slots) and not free_instructors[first_open]:
+            first_open += 1
+        busy = student_busy.get(student_id)
+        for index in range(first_open, len(slots)):
+            candidates = free_instructors[index]
+            if not candidates:
+                continue
+            start_time, end_time = slots[index]
+            if busy is not None and busy.overlaps(start_time, end_time):
+                continue
+            instructor_id = min(candidates, key=lambda candidate: (load[candidate], candidate))
+            candidates.remove(instructor_id)
+            load[instructor_id] += 1
+            assignments.append((student_id, instructor_id, start_time, end_time))
+            break
+        else:
+            unassigned.append(student_id)
+    return assignments, unassigned
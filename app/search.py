@@ -0,0 +1,106 @@
+# Finalproject/app/search.py
+import sqlite3
+
+from flask import current_app
+from sqlalchemy import DDL, bindparam, column, event, select, table, text
+
+from .extensions import db
+from .models import TrainingElement, User
+
+# Search index for the name filters and the typeahead endpoint
+#
+# SQLite: FTS5 virtual tables with the trigram tokenizer (SQLite >= 3.34), so substring matches like ilike('%x%')
+#         are answered from the index.  They are external-content tables over 'users' / 'training_elements'
+#         and triggers keep them in sync on every INSERT/UPDATE/DELETE, whichever code path writes the row.
+# Postgres: pg_trgm GIN indexes on the same columns (see the migration), ilike('%x%') uses them directly.
+# Anything else, or terms shorter than a trigram, falls back to a plain ilike.
+# Either way callers get a subquery of matching ids to filter with IN (...), no extra joins.
+
+# Searchable columns of each FTS table, the table name is '<source table>_fts'
+FTS_COLUMNS = {
+    'users': ('first_name', 'last_name', 'email'),
+    'training_elements': ('name', 'description'),
+}
+
+
+def _fts_ddl(table_name, columns):
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{name}' for name in columns)
+    old_values = ', '.join(f'old.{name}' for name in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table_name}_fts USING fts5({column_list}, content='{table_name}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {table_name}_fts(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {table_name}_fts({table_name}_fts, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_au AFTER UPDATE ON {table_name} BEGIN "
+        f"INSERT INTO {table_name}_fts({table_name}_fts, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {table_name}_fts(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def _sqlite_supports_trigram(ddl, target, bind, **kw):
+    return sqlite3.sqlite_version_info >= (3, 34)
+
+
+# Tables created through db.create_all() (seed.py, tests) get the index too, migrated databases get it from Alembic
+# db.drop_all() drops the FTS table with its source table, a stale index would otherwise survive a re-seed
+for _model in (User, TrainingElement):
+    for _statement in _fts_ddl(_model.__tablename__, FTS_COLUMNS[_model.__tablename__]):
+        event.listen(
+            _model.__table__, 'after_create',
+            DDL(_statement).execute_if(dialect='sqlite', callable_=_sqlite_supports_trigram)
+        )
+    event.listen(
+        _model.__table__, 'before_drop',
+        DDL(f"DROP TABLE IF EXISTS {_model.__tablename__}_fts").execute_if(dialect='sqlite')
+    )
+
+
+def fts_available():
+    # Checked once per app: the tables exist only if the DB was created/migrated with this version
+    cache = current_app.extensions.setdefault('search_fts', {})
+    if 'available' not in cache:
+        available = False
+        if db.engine.dialect.name == 'sqlite':
+            available = db.session.execute(
+                text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('users_fts', 'training_elements_fts')")
+            ).scalar() == 2
+        cache['available'] = available
+    return cache['available']
+
+
+def _fts_query(columns, term):
+    # Phrase query restricted to some columns, e.g. {first_name last_name} : "jim"
+    escaped = term.replace('"', '""')
+    return f'{{{" ".join(columns)}}} : "{escaped}"'
+
+
+def _matching_ids(model, columns, term):
+    table_name = model.__tablename__
+    if len(term) >= 3 and fts_available():
+        fts_table = table(f'{table_name}_fts', column('rowid'))
+        # unique=True: several name filters can be combined in one statement
+        match = text(f'{table_name}_fts MATCH :fts_query').bindparams(bindparam('fts_query', _fts_query(columns, term), unique=True))
+        return select(fts_table.c.rowid).where(match)
+    return select(model.id).where(db.or_(*[getattr(model, name).ilike(f'%{term}%') for name in columns]))
+
+
+def matching_user_ids(term, columns=('first_name', 'last_name')):
+    """Subquery of ids of users whose name (by default) contains 'term', for Booking.<x>_id.in_(...)"""
+    return _matching_ids(User, columns, term)
+
+
+def matching_training_element_ids(term, columns=('name',)):
+    """Subquery of ids of training elements whose name (by default) contains 'term'"""
+    return _matching_ids(TrainingElement, columns, term)
+
+
+def rebuild_search_index():
+    # Re-populate the FTS tables from their content tables (after restoring a backup, bulk loads with triggers off, ...)
+    if not fts_available():
+        return False
+    for table_name in FTS_COLUMNS:
+        db.session.execute(text(f"INSERT INTO {table_name}_fts({table_name}_fts) VALUES ('rebuild')"))
+    db.session.commit()
+    return True
@@ -0,0 +1,87 @@
+# Finalproject/app/table_versions.py
+import hashlib
+
+from sqlalchemy import event, text
+
+from .extensions import db
+from .models import TableVersion
+
+# Per-table change counters (table_versions) used as cheap validators for conditional GETs.
+#
+# Writes to a tracked table are noted on the session while it flushes, and the counters are bumped once the
+# transaction has committed, in a short transaction of their own.  The counter row is never locked by a
+# request's write transaction, so writers of unrelated bookings don't queue behind one hot row
+# (see app/booking_locks.py: only writes for the same person serialize):
+#   - ORM unit of work (db.session.add/delete/commit): after_flush
+#   - ORM-enabled bulk statements (query.update(), session.execute(insert(Model), [...])): do_orm_execute
+# A rollback discards the noted tables.  Between a commit and its bump a reader may still get the old version,
+# i.e. a 304 for an instant; readers take the versions before the data, so an ETag never vouches for an older body.
+# Reading the versions is a single primary key lookup, far cheaper than running and serializing a list query.
+
+TRACKED_TABLES = ('bookings', 'users', 'training_elements', 'booking_series')
+
+_BUMP = text("UPDATE table_versions SET version = version + 1 WHERE table_name = :table_name")
+
+
+def _seed_rows(target, connection, **kw):
+    connection.execute(TableVersion.__table__.insert(), [{'table_name': name, 'version': 0} for name in TRACKED_TABLES])
+
+
+# db.create_all() creates the rows up-front, migrated databases get them from Alembic
+event.listen(TableVersion.__table__, 'after_create', _seed_rows)
+
+
+def _pending(session):
+    return session.info.setdefault('table_version_changes', set())
+
+
+@event.listens_for(db.session, 'after_flush')
+def _note_flush(session, flush_context):
+    _pending(session).update(
+        instance.__table__.name
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if getattr(instance, '__table__', None) is not None and instance.__table__.name in TRACKED_TABLES
+    )
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _note_bulk_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table_name = mapper.local_table.name if mapper is not None else None
+    if table_name in TRACKED_TABLES:
+        _pending(orm_execute_state.session).add(table_name)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _bump_after_commit(session):
+    table_names = session.info.pop('table_version_changes', None)
+    if not table_names:
+        return
+    # Own transaction, committed at once: the row lock lasts one statement per table
+    with session.get_bind().begin() as connection:
+        for table_name in sorted(table_names):
+            connection.execute(_BUMP, {'table_name': table_name})
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('table_version_changes', None)
+
+
+def get_table_versions(table_names):
+    rows = db.session.query(TableVersion.table_name, TableVersion.version).filter(TableVersion.table_name.in_(table_names)).all()
+    return dict(rows)
+
+
+def compute_etag(table_names, *scope):
+    """
+    Weak validator for a response built from 'table_names', scoped by anything else the response depends on
+    (caller, role, query string, ...).  Returns None when a table is not tracked, i.e. never answer with 304.
+    """
+    versions = get_table_versions(table_names)
+    if len(versions) != len(set(table_names)):
+        return None
+    payload = repr((sorted(versions.items()), scope)).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()
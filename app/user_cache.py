@@ -0,0 +1,125 @@
+# Finalproject/app/user_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from .extensions import db
+from .models import User
+
+# Identity cache behind Flask-Login's user loader (app/__init__.py).
+#
+# load_user runs on every authenticated request and used to cost a SELECT on users each time.  The cache keeps
+# a small detached snapshot per user id (UserSnapshot: the columns the views read off current_user), bounded
+# LRU with a TTL.  Like the report cache, changes are collected while the session flushes and applied once it
+# commits: any update or delete of a User row (PUT/DELETE /api/users/<id>, calendar feed reset, rehash on login)
+# drops its entry, so a role change applies from the very next request of this process.  Bulk statements on
+# users drop everything.  Other worker processes pick the change up when the entry expires (USER_CACHE_TTL_SECONDS).
+#
+# current_user is therefore NOT attached to db.session: views that modify the logged-in user load the row first.
+
+SNAPSHOT_COLUMNS = ('id', 'email', 'first_name', 'last_name', 'role', 'calendar_feed_version')
+
+
+class UserSnapshot(UserMixin):
+    __slots__ = SNAPSHOT_COLUMNS
+
+    def __init__(self, **values):
+        for name in SNAPSHOT_COLUMNS:
+            setattr(self, name, values[name])
+
+    def get_id(self):
+        return str(self.id)
+
+
+class UserCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # user_id -> (UserSnapshot, stored_at), least recently used first
+        self._generation = 0          # bumped by every invalidation, see load
+        self.enabled = True
+        self.ttl_seconds = 60
+        self.max_entries = 10000
+
+    def init_app(self, app):
+        self.enabled = app.config.get('USER_CACHE_ENABLED', True)
+        self.ttl_seconds = app.config.get('USER_CACHE_TTL_SECONDS', 60)
+        self.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', 10000)
+        if not getattr(self, '_listening', False):
+            event.listen(User, 'after_update', self._on_user_write)
+            event.listen(User, 'after_delete', self._on_user_write)
+            event.listen(db.session, 'do_orm_execute', self._on_bulk_statement)
+            event.listen(db.session, 'after_commit', self._on_commit)
+            event.listen(db.session, 'after_soft_rollback', self._on_rollback)
+            self._listening = True
+        app.extensions['user_cache'] = self
+
+    # --- Queries ---
+    def load(self, user_id):
+        # Snapshot of the user, None when there is no such user (Flask-Login then treats the session as anonymous)
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        if self.enabled:
+            with self._lock:
+                cached = self._entries.get(user_id)
+                if cached is not None and time.monotonic() - cached[1] < self.ttl_seconds:
+                    self._entries.move_to_end(user_id)
+                    return cached[0]
+                generation = self._generation
+        row = db.session.query(*(getattr(User, name) for name in SNAPSHOT_COLUMNS)).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        snapshot = UserSnapshot(**row._asdict())
+        if self.enabled:
+            with self._lock:
+                # A change committed while we were reading may be missing from 'row': answer this call only
+                if self._generation != generation:
+                    return snapshot
+                self._entries[user_id] = (snapshot, time.monotonic())
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    # --- Maintenance ---
+    def invalidate(self, user_ids=None):
+        # Drop these users (ids), or every entry with None
+        with self._lock:
+            self._generation += 1
+            if user_ids is None:
+                self._entries.clear()
+                return
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    # --- SQLAlchemy event handlers ---
+    @staticmethod
+    def _pending(session):
+        return session.info.setdefault('user_cache_changes', [])
+
+    def _on_user_write(self, mapper, connection, user):
+        self._pending(object_session(user)).append(user.id)
+
+    def _on_bulk_statement(self, orm_execute_state):
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is User:
+            self._pending(orm_execute_state.session).append(None)
+
+    def _on_commit(self, session):
+        changes = session.info.pop('user_cache_changes', None)
+        if not changes:
+            return
+        self.invalidate(None if None in changes else changes)
+
+    def _on_rollback(self, session, previous_transaction):
+        session.info.pop('user_cache_changes', None)
+
+
+user_cache = UserCache()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Finalproject/benchmarks/json_serialization.py
+#
+# Micro-benchmark of the JSON provider (app/json_provider.py) on a booking list response.
+#
+#   python benchmarks/json_serialization.py [--bookings 10000] [--repeat 7]
+#
+# Encodes the same page of serialized bookings (the dicts serialize_booking returns, datetimes included) with:
+#   - Flask's default provider, the datetimes converted with .isoformat() first (how the serializers used to do it),
+#   - FastJSONProvider on the stdlib json module (orjson not installed),
+#   - FastJSONProvider on orjson, when it is installed.
+# Every variant must produce the same document.
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from flask.json.provider import DefaultJSONProvider
+
+import app.json_provider as json_provider
+from app import create_app
+
+DATETIME_KEYS = ('startTime', 'endTime', 'createdAt', 'updatedAt')
+
+
+def booking_dicts(count):
+    # Same keys and value types as routes.bookings.serialize_booking
+    first = datetime(2031, 1, 6, 8)
+    bookings = []
+    for n in range(count):
+        start = first + timedelta(hours=n)
+        bookings.append({
+            'id': n + 1,
+            'trainingElementId': 1,
+            'trainingElementName': 'Machine TPM',
+            'startTime': start,
+            'endTime': start + timedelta(minutes=50),
+            'instructorId': 2,
+            'instructorFirstName': 'Jimmy',
+            'instructorLastName': 'Le',
+            'studentId': 3 + n % 50,
+            'studentFirstName': 'Brian',
+            'studentLastName': 'Nguyen',
+            'status': 'confirmed',
+            'createdById': 1,
+            'createdByEmail': 'admin@example.com',
+            'notes': None,
+            'seriesId': None,
+            'createdAt': first - timedelta(days=7),
+            'updatedAt': first - timedelta(days=7),
+        })
+    return bookings
+
+
+def with_iso_strings(bookings):
+    return [{**booking, **{key: booking[key].isoformat() for key in DATETIME_KEYS}} for booking in bookings]
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count, repeat):
+    app = create_app('config.TestingConfig')
+    bookings = booking_dicts(count)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = app.json
+    orjson = json_provider.orjson
+
+    variants = [
+        ('Flask default provider, isoformat() in the serializer',
+         lambda: default_provider.response(bookings=with_iso_strings(bookings), next_cursor=None)),
+        ('FastJSONProvider, stdlib json', lambda: fast_provider.response(bookings=bookings, next_cursor=None)),
+    ]
+    if orjson is not None:
+        variants.append(('FastJSONProvider, orjson', lambda: fast_provider.response(bookings=bookings, next_cursor=None)))
+
+    print(f"--- Encoding a response of {count} bookings, best of {repeat} ---")
+    documents = []
+    with app.test_request_context():
+        for label, encode in variants:
+            # The stdlib variant runs with orjson hidden from the provider
+            json_provider.orjson = None if 'stdlib' in label else orjson
+            try:
+                elapsed = best_of(repeat, encode)
+                documents.append(json.loads(encode().get_data()))
+            finally:
+                json_provider.orjson = orjson
+            print(f"{label:55s} {elapsed * 1000:8.1f} ms  {count / elapsed:10.0f} bookings/s")
+    if orjson is None:
+        print("orjson is not installed, 'pip install orjson' to compare it")
+    print("Same output:", all(document == documents[0] for document in documents))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JSON provider serialization micro-benchmark.")
+    parser.add_argument('--bookings', type=int, default=10000, help="Bookings in the encoded response.")
+    parser.add_argument('--repeat', type=int, default=7, help="Runs per measurement, the best one is reported.")
+    args = parser.parse_args()
+    main(args.bookings, args.repeat)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# Finalproject/benchmarks/login_throughput.py
+#
+# Login throughput and API latency under a burst of logins, with bcrypt inline vs on the bounded pool
+# (app/passwords.py).
+#
+#   python benchmarks/login_throughput.py [--clients 32] [--seconds 8] [--rounds 10] [--workers N] [--max-pending 8]
+#
+# For each mode a threaded werkzeug server is started on a temporary SQLite database, then 'clients' threads
+# log in again and again for 'seconds' while another thread pings GET /ping every 20 ms:
+#   - inline: PASSWORD_HASH_WORKERS = 0, every request thread runs bcrypt itself,
+#   - pool:   PASSWORD_HASH_WORKERS = workers (default: CPU count), at most max-pending more calls waiting,
+#             the rest refused with 503 + Retry-After, which the clients honor before trying again.
+# Reported: successful logins/s, status codes, login latency and /ping latency percentiles.
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from werkzeug.serving import make_server
+
+from app import create_app, db
+from app.models import User
+from config import TestingConfig
+
+PASSWORD = 'benchpass'
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+
+def start_server(mode, args, db_path):
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        BCRYPT_LOG_ROUNDS = args.rounds
+        PASSWORD_HASH_WORKERS = 0 if mode == 'inline' else (args.workers or os.cpu_count() or 1)
+        PASSWORD_HASH_MAX_PENDING = args.max_pending
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        for n in range(args.clients):
+            user = User(email=f'user{n}@example.com', first_name='Bench', last_name=str(n), role='student')
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def request(port, method, path, body=None):
+    # (status, seconds, Retry-After header)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    started = time.perf_counter()
+    connection.request(method, path, body=json.dumps(body) if body else None, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.status, time.perf_counter() - started, response.getheader('Retry-After')
+
+
+def run(mode, args):
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server(mode, args, os.path.join(directory, 'bench.db'))
+        port = server.server_port
+        stop = threading.Event()
+        lock = threading.Lock()
+        codes, login_latencies, ping_latencies = {}, [], []
+
+        def client(n):
+            while not stop.is_set():
+                status, elapsed, retry_after = request(port, 'POST', '/api/auth/login',
+                                                       {'email': f'user{n}@example.com', 'password': PASSWORD})
+                if stop.is_set():
+                    break # finished after the measurement window
+                with lock:
+                    codes[status] = codes.get(status, 0) + 1
+                    if status == 200:
+                        login_latencies.append(elapsed)
+                if status == 503:
+                    time.sleep(float(retry_after or 1))
+
+        def pinger():
+            while not stop.is_set():
+                ping_latencies.append(request(port, 'GET', '/ping')[1])
+                time.sleep(0.02)
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(args.clients)] + [threading.Thread(target=pinger)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        server.shutdown()
+
+    print(f"{mode:6s} logins/s={codes.get(200, 0) / args.seconds:7.1f}  codes={codes}  "
+          f"login p50={percentile(login_latencies, .5):.3f}s p95={percentile(login_latencies, .95):.3f}s  "
+          f"ping p50={percentile(ping_latencies, .5) * 1000:.1f}ms p95={percentile(ping_latencies, .95) * 1000:.1f}ms "
+          f"max={max(ping_latencies, default=0) * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Login throughput under the bounded bcrypt pool.")
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent clients logging in.")
+    parser.add_argument('--seconds', type=float, default=8, help="Length of each measurement.")
+    parser.add_argument('--rounds', type=int, default=10, help="bcrypt work factor (BCRYPT_LOG_ROUNDS).")
+    parser.add_argument('--workers', type=int, default=None, help="PASSWORD_HASH_WORKERS of the pool mode (default: CPU count).")
+    parser.add_argument('--max-pending', type=int, default=8, help="PASSWORD_HASH_MAX_PENDING of the pool mode.")
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    print(f"--- {args.clients} clients, bcrypt cost {args.rounds}, {args.seconds:g}s per mode ---")
+    for mode in ('inline', 'pool'):
+        run(mode, args)
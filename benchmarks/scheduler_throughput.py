@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# Finalproject/benchmarks/scheduler_throughput.py
+#
+# Throughput of the batch auto-scheduler (app/scheduler.py, POST /api/scheduler/auto).
+#
+#   python benchmarks/scheduler_throughput.py [--repeat 5]
+#
+# 1. The engine alone: build_slots + auto_schedule on synthetic pools, every instructor and student already
+#    holding a few bookings, for growing numbers of students.  The cost should grow with students + slots,
+#    so students/s stays roughly flat as the batch grows.
+# 2. The endpoint, dry run, on an in-memory TestingConfig database: request parsing, the busy-time range
+#    queries and the response included.
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, time as clock, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app, db
+from app.interval_index import IntervalSet
+from app.models import Booking, TrainingElement, User
+from app.scheduler import auto_schedule, build_slots
+from routes.availability import working_windows
+
+RANGE_START = datetime(2031, 1, 6)
+WORK_START, WORK_END = clock(8, 0), clock(17, 0)
+WEEKDAYS = {0, 1, 2, 3, 4}
+DURATION_MINUTES = 60
+
+# (students, instructors, days in the window)
+ENGINE_SIZES = [(500, 10, 30), (2000, 20, 60), (10000, 50, 92)]
+ENDPOINT_SIZES = [(200, 10, 30), (1000, 20, 60)]
+
+
+def best_of(repeat, function):
+    # Best wall time of 'repeat' runs and the last result
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def random_busy(ids, days, per_person, rng):
+    # id -> IntervalSet of 'per_person' one-hour bookings at random working hours of the window
+    busy = {}
+    for person_id in ids:
+        intervals = []
+        for _ in range(per_person):
+            start = datetime.combine(RANGE_START.date() + timedelta(days=rng.randrange(days)), clock(rng.randrange(8, 17)))
+            intervals.append((start, start + timedelta(hours=1)))
+        busy[person_id] = IntervalSet(intervals)
+    return busy
+
+
+def bench_engine(repeat):
+    print("--- Engine: build_slots + auto_schedule ---")
+    rng = random.Random(42)
+    for student_count, instructor_count, days in ENGINE_SIZES:
+        student_ids = list(range(1, student_count + 1))
+        instructor_ids = list(range(100001, 100001 + instructor_count))
+        instructor_busy = random_busy(instructor_ids, days, 10, rng)
+        student_busy = random_busy(student_ids, days, 3, rng)
+        windows = working_windows(RANGE_START, RANGE_START + timedelta(days=days), WORK_START, WORK_END, WEEKDAYS)
+
+        def run():
+            slots = build_slots(windows, DURATION_MINUTES)
+            return slots, auto_schedule(student_ids, instructor_ids, slots, instructor_busy, student_busy)
+
+        elapsed, (slots, (assignments, unassigned)) = best_of(repeat, run)
+        print(f"{student_count:6d} students x {instructor_count:3d} instructors, {len(slots):5d} slots: "
+              f"{elapsed * 1000:8.1f} ms  {student_count / elapsed:10.0f} students/s  "
+              f"({len(assignments)} placed, {len(unassigned)} unassigned)")
+
+
+def bench_endpoint(repeat):
+    print("--- Endpoint: POST /api/scheduler/auto (dry_run) ---")
+    for student_count, instructor_count, days in ENDPOINT_SIZES:
+        app = create_app('config.TestingConfig')
+        with app.app_context():
+            db.create_all()
+            admin = User(email='admin@example.com', first_name='Admin', last_name='Bench', role='admin')
+            admin.set_password('benchpass')
+            students = [User(email=f'student{n}@example.com', first_name='Student', last_name=str(n), role='student', password_hash='x')
+                        for n in range(student_count)]
+            instructors = [User(email=f'instructor{n}@example.com', first_name='Instructor', last_name=str(n), role='instructor', password_hash='x')
+                           for n in range(instructor_count)]
+            element = TrainingElement(name='Machine TPM', description='Bench', duration_minutes=DURATION_MINUTES, session_type='hands_on')
+            db.session.add_all([admin, element, *students, *instructors])
+            db.session.commit()
+            # A few existing bookings per instructor, so the busy-time queries have rows to read
+            rng = random.Random(7)
+            rows = []
+            for index, instructor in enumerate(instructors):
+                for day in range(0, days, 3):
+                    start = datetime.combine(RANGE_START.date() + timedelta(days=day), clock(rng.randrange(8, 17)))
+                    rows.append(dict(training_element_id=element.id, instructor_id=instructor.id, student_id=students[index % student_count].id,
+                                     start_time=start, end_time=start + timedelta(hours=1), status='confirmed', created_by_user_id=admin.id))
+            db.session.execute(db.insert(Booking), rows)
+            db.session.commit()
+            body = {
+                'training_element_id': element.id,
+                'student_ids': [student.id for student in students],
+                'instructor_ids': [instructor.id for instructor in instructors],
+                'from': RANGE_START.date().isoformat(),
+                'to': (RANGE_START + timedelta(days=days)).date().isoformat(),
+                'dry_run': True,
+            }
+
+        client = app.test_client()
+        response = client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': 'benchpass'})
+        assert response.status_code == 200, response.get_json()
+        elapsed, response = best_of(repeat, lambda: client.post('/api/scheduler/auto', json=body))
+        assert response.status_code == 200, response.get_json()
+        print(f"{student_count:6d} students x {instructor_count:3d} instructors, {days:3d} days: "
+              f"{elapsed * 1000:8.1f} ms  {student_count / elapsed:10.0f} students/s  ({response.get_json()['message']})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Auto-scheduler throughput benchmark.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement, the best one is reported.")
+    args = parser.parse_args()
+    bench_engine(args.repeat)
+    bench_endpoint(args.repeat)
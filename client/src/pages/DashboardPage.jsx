@@ -1,9 +1,46 @@
 // client/src/pages/DashboardPage.jsx
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { useAuth } from '../context/AuthContext'; // Correct relative import path
+import apiService from '../services/api';
+
+// First day of this month and of the next one, as YYYY-MM-DD (the summary range is [from, to))
+const currentMonthRange = () => {
+  const now = new Date();
+  const format = (date) => `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-01`;
+  return [format(now), format(new Date(now.getFullYear(), now.getMonth() + 1, 1))];
+};
 
 function DashboardPage() {
   const { user } = useAuth(); // Access user from AuthContext
+  const [monthTotals, setMonthTotals] = useState(null); // Booking counts of the current month (admin & instructor)
+  const [feedUrl, setFeedUrl] = useState(''); // Personal .ics feed URL for calendar apps
+
+  useEffect(() => {
+    if (!user) {
+      return;
+    }
+    apiService.getCalendarFeedUrl()
+      .then(setFeedUrl)
+      .catch((error) => console.error("Failed to load the calendar feed URL:", error));
+  }, [user]);
+
+  const handleResetFeedUrl = async () => {
+    try {
+      setFeedUrl(await apiService.resetCalendarFeedUrl());
+    } catch (error) {
+      console.error("Failed to reset the calendar feed URL:", error);
+    }
+  };
+
+  useEffect(() => {
+    if (!user || !['admin', 'instructor'].includes(user.role)) {
+      return;
+    }
+    const [from, to] = currentMonthRange();
+    apiService.getDailySummary(from, to)
+      .then((data) => setMonthTotals(data.totals))
+      .catch((error) => console.error("Failed to load the booking summary:", error));
+  }, [user]);
 
   if (!user) {
     // This case should ideally be handled by ProtectedRoute, but good for defensive coding
@@ -30,6 +67,29 @@ function DashboardPage() {
             <span className="font-semibold text-gray-700">User ID:</span> <span className="text-gray-500 break-words">{user.id}</span>
           </p>
         </div>
+        {monthTotals && (
+          <div className="text-left text-lg space-y-3 mb-8">
+            <h3 className="text-2xl font-bold text-gray-700">Bookings this month</h3>
+            {Object.entries(monthTotals.counts).map(([status, count]) => (
+              <p key={status}>
+                <span className="font-semibold text-gray-700 capitalize">{status}:</span> <span className="text-blue-600">{count}</span>
+              </p>
+            ))}
+            <p>
+              <span className="font-semibold text-gray-700">Hours booked:</span> <span className="text-teal-600">{(monthTotals.bookedMinutes / 60).toFixed(1)}</span>
+            </p>
+          </div>
+        )}
+        {feedUrl && (
+          <div className="text-left text-lg space-y-3">
+            <h3 className="text-2xl font-bold text-gray-700">Calendar feed</h3>
+            <p className="text-gray-600">Subscribe to this URL in your calendar app to see your sessions there.</p>
+            <input type="text" readOnly value={feedUrl} onFocus={(event) => event.target.select()} className="w-full p-2 border rounded text-sm text-gray-700" />
+            <button onClick={handleResetFeedUrl} className="px-4 py-2 bg-red-500 text-white rounded hover:bg-red-600">
+              Reset link
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -94,6 +94,19 @@ api.interceptors.response.use(
 );
 
 
+// Helper function to follow 'nextCursor' through every page of a paginated list endpoint
+// The backend returns at most one page per request, e.g. { bookings: [...], nextCursor: '...' }
+const fetchAllPages = async (url, key) => {
+  let items = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, { params: cursor ? { cursor } : {} });
+    items = items.concat(response.data[key]);
+    cursor = response.data.nextCursor;
+  } while (cursor);
+  return items;
+};
+
 // Define API service methods
 const apiService = {
   // Auth Endpoints
@@ -125,8 +138,7 @@ const apiService = {
 
   // User Management
   getUsers: async () => {
-    const response = await api.get('/users');
-    return response.data;
+    return fetchAllPages('/users', 'users');
   },
   getUser: async (id) => {
     const response = await api.get(`/users/${id}`);
@@ -143,8 +155,7 @@ const apiService = {
 
   // Training Element Management
   getTrainingElements: async () => {
-    const response = await api.get('/training_elements');
-    return response.data;
+    return fetchAllPages('/training_elements', 'trainingElements');
   },
   getTrainingElement: async (id) => {
     const response = await api.get(`/training_elements/${id}`);
@@ -170,8 +181,7 @@ const apiService = {
 
   // Booking Management
   getBookings: async () => {
-    const response = await api.get('/bookings');
-    return response.data;
+    return fetchAllPages('/bookings', 'bookings');
   },
   getBooking: async (id) => {
     const response = await api.get(`/bookings/${id}`);
@@ -189,6 +199,54 @@ const apiService = {
     const response = await api.delete(`/bookings/${id}`);
     return response.data;
   },
+  // Reports
+  // Per-day booking counts/minutes for [from, to) (dates, YYYY-MM-DD), instructors get their own bookings only
+  getDailySummary: async (from, to) => {
+    const response = await api.get('/reports/daily-summary', { params: { from, to } });
+    return response.data;
+  },
+  // Calendar feed (.ics) URL for calendar apps, resetting it revokes the previous URL
+  getCalendarFeedUrl: async () => {
+    const response = await api.get('/calendar/feed-url');
+    return response.data.url;
+  },
+  resetCalendarFeedUrl: async () => {
+    const response = await api.delete('/calendar/feed-url');
+    return response.data.url;
+  },
+  // Live booking events instead of polling the whole list (Server-Sent Events)
+  // handlers: { created, updated, deleted, resync }, each receives the parsed payload; returns an unsubscribe function
+  subscribeToBookingEvents: (handlers) => {
+    let source = null;
+    let retryTimer = null;
+    let unsubscribed = false;
+    const connect = () => {
+      source = new EventSource(`${api.defaults.baseURL}/bookings/stream`, { withCredentials: true });
+      ['created', 'updated', 'deleted', 'resync'].forEach((type) => {
+        if (handlers[type]) {
+          source.addEventListener(type, (event) => handlers[type](JSON.parse(event.data)));
+        }
+      });
+      // EventSource gives up on a refused stream (503 while the server has too many open): try again later,
+      // and resync since events may have been missed in between
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !unsubscribed) {
+          retryTimer = setTimeout(() => {
+            connect();
+            if (handlers.resync) {
+              handlers.resync({});
+            }
+          }, 5000);
+        }
+      };
+    };
+    connect();
+    return () => {
+      unsubscribed = true;
+      clearTimeout(retryTimer);
+      source.close();
+    };
+  },
 };
 
 export default apiService;
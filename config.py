@@ -19,6 +19,97 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(basedir, 'schedulingapp.db')}")
     SQLALCHEMY_TRACK_MODIFICATIONS = False # Disable Flask-SQLAlchemy event system overhead
 
+    # Server-side page size limits for the list endpoints (?limit=&cursor=)
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 100))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 500))
+
+    # In-memory interval index for booking conflict checks (app/interval_index.py)
+    # It assumes a single worker process: the TTL bounds how long writes made by other processes go unseen by this one
+    BOOKING_INDEX_ENABLED = os.getenv('BOOKING_INDEX_ENABLED', 'true').lower() == 'true'
+    BOOKING_INDEX_TTL_SECONDS = int(os.getenv('BOOKING_INDEX_TTL_SECONDS', 5))
+    # A person is loaded from now on only: the bookings starting at most this long before now
+    BOOKING_INDEX_MAX_DURATION_HOURS = int(os.getenv('BOOKING_INDEX_MAX_DURATION_HOURS', 24))
+
+    # In-process lock stripes serializing booking writes per instructor/student (app/booking_locks.py)
+    BOOKING_LOCK_STRIPES = int(os.getenv('BOOKING_LOCK_STRIPES', 64))
+
+    # Password hashing (app/passwords.py): bcrypt cost, threads running bcrypt and how many calls may wait for
+    # one of them before a login/registration gets a 503. Hashes of another cost are redone at the next login
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))
+
+    # Identity cache of the Flask-Login user loader (app/user_cache.py): writes made in this process apply at once,
+    # the TTL bounds how long writes made by other worker processes can go unseen
+    USER_CACHE_ENABLED = os.getenv('USER_CACHE_ENABLED', 'true').lower() == 'true'
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', 60))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 10000))
+
+    # Opt-in signed access tokens (POST /api/auth/token, 'Authorization: Bearer ...', app/access_tokens.py):
+    # token lifetime, and how often revocations made by other worker processes are reloaded
+    ACCESS_TOKENS_ENABLED = os.getenv('ACCESS_TOKENS_ENABLED', 'false').lower() == 'true'
+    ACCESS_TOKEN_TTL_SECONDS = int(os.getenv('ACCESS_TOKEN_TTL_SECONDS', 900))
+    ACCESS_TOKEN_REVOCATION_REFRESH_SECONDS = int(os.getenv('ACCESS_TOKEN_REVOCATION_REFRESH_SECONDS', 30))
+
+    # Upper bound on the number of bookings accepted by one POST /api/bookings/bulk request
+    BULK_BOOKING_MAX_ITEMS = int(os.getenv('BULK_BOOKING_MAX_ITEMS', 1000))
+
+    # Upper bound on the number of occurrences a recurring booking series can expand to
+    SERIES_MAX_OCCURRENCES = int(os.getenv('SERIES_MAX_OCCURRENCES', 500))
+
+    # Longest date range accepted by the free-slot finder (GET /api/availability)
+    AVAILABILITY_MAX_DAYS = int(os.getenv('AVAILABILITY_MAX_DAYS', 92))
+
+    # Longest window accepted by the compact calendar endpoint (GET /api/bookings/calendar)
+    CALENDAR_MAX_DAYS = int(os.getenv('CALENDAR_MAX_DAYS', 92))
+
+    # Instructor workload / utilization reports (GET /api/reports/...): longest range and result cache
+    REPORT_MAX_DAYS = int(os.getenv('REPORT_MAX_DAYS', 366))
+    REPORT_CACHE_TTL_SECONDS = int(os.getenv('REPORT_CACHE_TTL_SECONDS', 300))
+    REPORT_CACHE_MAX_ENTRIES = int(os.getenv('REPORT_CACHE_MAX_ENTRIES', 256))
+
+    # iCalendar feeds (GET /api/calendar/<token>.ics): how far back bookings are included, rows fetched per batch
+    ICS_FEED_PAST_DAYS = int(os.getenv('ICS_FEED_PAST_DAYS', 90))
+    ICS_FEED_BATCH_SIZE = int(os.getenv('ICS_FEED_BATCH_SIZE', 500))
+
+    # CSV imports (POST /api/imports/..., flask import-bookings): rows per batch, rejected rows listed in a response
+    CSV_IMPORT_CHUNK_SIZE = int(os.getenv('CSV_IMPORT_CHUNK_SIZE', 1000))
+    CSV_IMPORT_MAX_ERRORS = int(os.getenv('CSV_IMPORT_MAX_ERRORS', 1000))
+
+    # Booking exports (GET /api/exports/bookings, flask export-bookings): rows fetched and written per batch
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+    # Booking archive (flask archive-bookings): completed/cancelled bookings that ended more than
+    # ARCHIVE_RETENTION_DAYS ago move to bookings_archive, ARCHIVE_BATCH_SIZE per transaction
+    ARCHIVE_RETENTION_DAYS = int(os.getenv('ARCHIVE_RETENTION_DAYS', 365))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 1000))
+
+    # Booking change log (GET /api/bookings/changes, flask prune-booking-changes): changes older than
+    # BOOKING_CHANGES_RETENTION_DAYS are deleted, BOOKING_CHANGES_PRUNE_BATCH_SIZE per transaction;
+    # a client holding an older token gets 410 and reloads the full list
+    BOOKING_CHANGES_RETENTION_DAYS = int(os.getenv('BOOKING_CHANGES_RETENTION_DAYS', 30))
+    BOOKING_CHANGES_PRUNE_BATCH_SIZE = int(os.getenv('BOOKING_CHANGES_PRUNE_BATCH_SIZE', 5000))
+
+    # Ended bookings move from pending/confirmed to completed (app/booking_status.py, flask complete-past-bookings),
+    # BOOKING_STATUS_BATCH_SIZE per transaction; pending ones are cancelled instead with BOOKING_CANCEL_UNCONFIRMED.
+    # BOOKING_STATUS_INTERVAL_SECONDS > 0 also runs it in a background thread of each app process, 0 leaves it to cron
+    BOOKING_STATUS_INTERVAL_SECONDS = int(os.getenv('BOOKING_STATUS_INTERVAL_SECONDS', 0))
+    BOOKING_STATUS_BATCH_SIZE = int(os.getenv('BOOKING_STATUS_BATCH_SIZE', 1000))
+    BOOKING_CANCEL_UNCONFIRMED = os.getenv('BOOKING_CANCEL_UNCONFIRMED', 'false').lower() == 'true'
+
+    # Upper bound on the number of students placed by one auto-scheduling run (POST /api/scheduler/auto)
+    AUTO_SCHEDULE_MAX_STUDENTS = int(os.getenv('AUTO_SCHEDULE_MAX_STUDENTS', 5000))
+
+    # Live booking events (GET /api/bookings/stream): events kept for reconnecting clients,
+    # keep-alive interval and how long one stream stays open before the client reconnects
+    BOOKING_EVENTS_BUFFER = int(os.getenv('BOOKING_EVENTS_BUFFER', 1000))
+    BOOKING_STREAM_KEEPALIVE_SECONDS = int(os.getenv('BOOKING_STREAM_KEEPALIVE_SECONDS', 15))
+    BOOKING_STREAM_MAX_SECONDS = int(os.getenv('BOOKING_STREAM_MAX_SECONDS', 300))
+    # Streams open at once per process, each one holds a worker thread: keep it below the thread count
+    # (or run a gevent worker), the next stream gets a 503 with this Retry-After
+    BOOKING_STREAM_MAX_CLIENTS = int(os.getenv('BOOKING_STREAM_MAX_CLIENTS', 20))
+    BOOKING_STREAM_RETRY_AFTER_SECONDS = int(os.getenv('BOOKING_STREAM_RETRY_AFTER_SECONDS', 5))
+
 # Development-specific configurations
 # This class inherits from Config, so it gets all base settings,
 # and you can override or add development-specific ones here.
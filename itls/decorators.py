@@ -1,9 +1,11 @@
 from functools import wraps
-from flask import abort
+from flask import abort, make_response, request
 from flask_login import current_user
 
 # Generated by AI
 # User as @role_required('admin') or @role_required('instructor') for certain routes
+# With an access token current_user.role is the signed role claim (app/access_tokens.py): no database round trip,
+# and a role change revokes the user's tokens instead of leaving a stale claim
 def roles_required(*roles):
     def decorator(f):
         @wraps(f)
@@ -15,3 +17,29 @@ def roles_required(*roles):
             return f(*args, **kwargs)
         return wrapper
     return decorator
+
+
+# Conditional GET for list endpoints: @conditional_get('bookings', 'users')
+# The ETag comes from the change counters of the tables the response is built from (app/table_versions.py),
+# scoped to the caller, their role and the query string.  A matching If-None-Match gets an empty 304
+# before the view runs, so no list query and no serialization happen at all.
+def conditional_get(*table_names):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            from app.table_versions import compute_etag
+            user_id = current_user.get_id() if current_user.is_authenticated else None
+            role = current_user.role if current_user.is_authenticated else None
+            etag = compute_etag(table_names, user_id, role, request.path, sorted(request.args.items(multi=True)))
+            if etag and request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if not etag or response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # Let browsers keep the list but always revalidate it
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
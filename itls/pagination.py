@@ -0,0 +1,99 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+# Keyset (cursor) pagination shared by the list endpoints
+# Rather than OFFSET (which re-scans every skipped row), each page starts strictly after the sort key
+# of the last row of the previous page, e.g. (start_time, id) for bookings.
+# The cursor handed to the client is that sort key encoded as url-safe base64 JSON, clients treat it as opaque.
+
+
+def get_page_size():
+    # ?limit= is optional, clamp it into [1, PAGE_SIZE_MAX] so one request can never pull the whole table
+    default_size = current_app.config.get('PAGE_SIZE_DEFAULT', 100)
+    max_size = current_app.config.get('PAGE_SIZE_MAX', 500)
+    limit = request.args.get('limit', default_size, type=int)
+    return max(1, min(limit, max_size))
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, key_columns):
+    # Raise ValueError for anything that is not a cursor we issued, the routes turn that into a 400
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(key_columns):
+        raise ValueError("Invalid cursor")
+    decoded = []
+    for column, value in zip(key_columns, values):
+        python_type = column.type.python_type
+        if python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError):
+                raise ValueError("Invalid cursor")
+        # JSON true/false decode to bool, a subclass of int: never a valid id
+        elif not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+            raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def _after(key_columns, values):
+    # Lexicographic "row > key" written out with OR/AND so it works on every backend:
+    # (a > x) OR (a = x AND b > y) OR ...
+    clauses = []
+    for index, column in enumerate(key_columns):
+        equal_prefix = [key_columns[i] == values[i] for i in range(index)]
+        clauses.append(and_(*equal_prefix, column > values[index]))
+    return or_(*clauses)
+
+
+def paginate_by_keyset(query, key_columns, cursor=None, limit=None):
+    """
+    Returns one page of 'query' ordered by 'key_columns' and the cursor of the next page (None on the last page).
+    The last key column must be unique (primary key) so that the ordering is total.
+    """
+    if limit is None:
+        limit = get_page_size()
+    if cursor:
+        query = query.filter(_after(key_columns, decode_cursor(cursor, key_columns)))
+    # Fetch one extra row to know whether another page exists without a COUNT(*)
+    rows = query.order_by(*key_columns).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in key_columns])
+    return rows, next_cursor
+
+
+def paginate_merged_by_keyset(sources, cursor=None, limit=None):
+    """
+    paginate_by_keyset over several tables read as one list, e.g. bookings and bookings_archive.
+    'sources' is a list of (query, key_columns), each ordered the same way on keys of the same types.
+    Each source returns at most one page after the cursor, the pages are merged on the sort key:
+    one indexed range read per source, and the cursors are the same as for a single table.
+    """
+    if limit is None:
+        limit = get_page_size()
+    pages = []
+    for query, key_columns in sources:
+        if cursor:
+            query = query.filter(_after(key_columns, decode_cursor(cursor, key_columns)))
+        rows = query.order_by(*key_columns).limit(limit + 1).all()
+        pages.append([(tuple(getattr(row, column.key) for column in key_columns), row) for row in rows])
+    merged = sorted((entry for page in pages for entry in page), key=lambda entry: entry[0])
+    rows = [row for _, row in merged[:limit + 1]]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(list(merged[limit - 1][0]))
+    return rows, next_cursor
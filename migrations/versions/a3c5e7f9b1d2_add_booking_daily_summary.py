@@ -0,0 +1,135 @@
+"""add_booking_daily_summary
+
+Revision ID: a3c5e7f9b1d2
+Revises: f1b7d3c9e8a5
+Create Date: 2026-10-17 14:05:31.208817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c5e7f9b1d2'
+down_revision = 'f1b7d3c9e8a5'
+branch_labels = None
+depends_on = None
+
+
+# Same DDL as app/booking_summary.py
+SQLITE_ADD = (
+    "INSERT INTO booking_daily_summary (day, instructor_id, training_element_id, status, booking_count, minutes) "
+    "VALUES (date(new.start_time), COALESCE(new.instructor_id, 0), new.training_element_id, new.status, 1, "
+    "COALESCE((SELECT duration_minutes FROM training_elements WHERE id = new.training_element_id), 0)) "
+    "ON CONFLICT (day, instructor_id, training_element_id, status) "
+    "DO UPDATE SET booking_count = booking_count + 1, minutes = (booking_count + 1) * excluded.minutes;"
+)
+SQLITE_KEY = (
+    "day = date(old.start_time) AND instructor_id = COALESCE(old.instructor_id, 0) "
+    "AND training_element_id = old.training_element_id AND status = old.status"
+)
+SQLITE_REMOVE = (
+    "UPDATE booking_daily_summary SET booking_count = booking_count - 1, "
+    "minutes = (booking_count - 1) * COALESCE((SELECT duration_minutes FROM training_elements WHERE id = old.training_element_id), 0) "
+    f"WHERE {SQLITE_KEY}; "
+    f"DELETE FROM booking_daily_summary WHERE {SQLITE_KEY} AND booking_count <= 0;"
+)
+
+POSTGRES_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION update_booking_daily_summary() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE booking_daily_summary SET booking_count = booking_count - 1,
+            minutes = (booking_count - 1) * COALESCE((SELECT duration_minutes FROM training_elements WHERE id = OLD.training_element_id), 0)
+        WHERE day = OLD.start_time::date AND instructor_id = COALESCE(OLD.instructor_id, 0)
+            AND training_element_id = OLD.training_element_id AND status = OLD.status::text;
+        DELETE FROM booking_daily_summary
+        WHERE day = OLD.start_time::date AND instructor_id = COALESCE(OLD.instructor_id, 0)
+            AND training_element_id = OLD.training_element_id AND status = OLD.status::text AND booking_count <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO booking_daily_summary (day, instructor_id, training_element_id, status, booking_count, minutes)
+        VALUES (NEW.start_time::date, COALESCE(NEW.instructor_id, 0), NEW.training_element_id, NEW.status::text, 1,
+            COALESCE((SELECT duration_minutes FROM training_elements WHERE id = NEW.training_element_id), 0))
+        ON CONFLICT (day, instructor_id, training_element_id, status)
+        DO UPDATE SET booking_count = booking_daily_summary.booking_count + 1,
+            minutes = (booking_daily_summary.booking_count + 1) * EXCLUDED.minutes;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rescale_booking_daily_summary() RETURNS trigger AS $$
+BEGIN
+    UPDATE booking_daily_summary SET minutes = booking_count * NEW.duration_minutes WHERE training_element_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('booking_daily_summary',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('instructor_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('training_element_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('booking_count', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'instructor_id', 'training_element_id', 'status')
+    )
+    with op.batch_alter_table('booking_daily_summary', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_daily_summary_instructor_id_day', ['instructor_id', 'day'], unique=False)
+
+    # ### end Alembic commands ###
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute(f"CREATE TRIGGER bookings_summary_ai AFTER INSERT ON bookings BEGIN {SQLITE_ADD} END")
+        op.execute(f"CREATE TRIGGER bookings_summary_ad AFTER DELETE ON bookings BEGIN {SQLITE_REMOVE} END")
+        op.execute(
+            "CREATE TRIGGER bookings_summary_au AFTER UPDATE OF start_time, instructor_id, training_element_id, status ON bookings "
+            f"BEGIN {SQLITE_REMOVE} {SQLITE_ADD} END"
+        )
+        op.execute(
+            "CREATE TRIGGER training_elements_summary_au AFTER UPDATE OF duration_minutes ON training_elements BEGIN "
+            "UPDATE booking_daily_summary SET minutes = booking_count * new.duration_minutes WHERE training_element_id = new.id; END"
+        )
+    elif bind.dialect.name == 'postgresql':
+        op.execute(POSTGRES_FUNCTIONS)
+        op.execute(
+            "CREATE TRIGGER bookings_daily_summary AFTER INSERT OR DELETE OR UPDATE OF start_time, instructor_id, training_element_id, status "
+            "ON bookings FOR EACH ROW EXECUTE FUNCTION update_booking_daily_summary()"
+        )
+        op.execute(
+            "CREATE TRIGGER training_elements_daily_summary AFTER UPDATE OF duration_minutes ON training_elements "
+            "FOR EACH ROW EXECUTE FUNCTION rescale_booking_daily_summary()"
+        )
+
+    # Backfill from the existing bookings
+    op.execute(
+        "INSERT INTO booking_daily_summary (day, instructor_id, training_element_id, status, booking_count, minutes) "
+        "SELECT date(b.start_time), COALESCE(b.instructor_id, 0), b.training_element_id, CAST(b.status AS VARCHAR(20)), "
+        "COUNT(b.id), COUNT(b.id) * t.duration_minutes "
+        "FROM bookings b JOIN training_elements t ON t.id = b.training_element_id "
+        "GROUP BY date(b.start_time), COALESCE(b.instructor_id, 0), b.training_element_id, b.status, t.duration_minutes"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for name in ('bookings_summary_ai', 'bookings_summary_ad', 'bookings_summary_au', 'training_elements_summary_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS bookings_daily_summary ON bookings")
+        op.execute("DROP TRIGGER IF EXISTS training_elements_daily_summary ON training_elements")
+        op.execute("DROP FUNCTION IF EXISTS update_booking_daily_summary()")
+        op.execute("DROP FUNCTION IF EXISTS rescale_booking_daily_summary()")
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('booking_daily_summary', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_daily_summary_instructor_id_day')
+
+    op.drop_table('booking_daily_summary')
+    # ### end Alembic commands ###
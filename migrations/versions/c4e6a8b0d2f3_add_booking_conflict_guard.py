@@ -0,0 +1,72 @@
+"""add_booking_conflict_guard
+
+Revision ID: c4e6a8b0d2f3
+Revises: b8d2f4a6c0e1
+Create Date: 2026-10-17 16:42:18.530217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e6a8b0d2f3'
+down_revision = 'b8d2f4a6c0e1'
+branch_labels = None
+depends_on = None
+
+
+# Same DDL as app/booking_locks.py
+CONFLICT_MESSAGE = 'booking_conflict: the instructor or student is already booked at this time'
+SQLITE_OVERLAP = (
+    "EXISTS (SELECT 1 FROM bookings WHERE {column} = new.{column}{exclude} "
+    "AND start_time < new.end_time AND end_time > new.start_time)"
+)
+
+POSTGRES_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION check_booking_conflict() RETURNS trigger AS $$
+BEGIN
+    IF NEW.instructor_id IS NOT NULL THEN
+        PERFORM pg_advisory_xact_lock(1, NEW.instructor_id);
+    END IF;
+    IF NEW.student_id IS NOT NULL THEN
+        PERFORM pg_advisory_xact_lock(2, NEW.student_id);
+    END IF;
+    IF EXISTS (SELECT 1 FROM bookings WHERE id <> NEW.id
+               AND (instructor_id = NEW.instructor_id OR student_id = NEW.student_id)
+               AND start_time < NEW.end_time AND end_time > NEW.start_time) THEN
+        RAISE EXCEPTION '{CONFLICT_MESSAGE}' USING ERRCODE = 'exclusion_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade():
+    # Existing bookings are not checked, only rows written from now on
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for suffix, action, exclude in (('bi', 'INSERT', ''), ('bu', 'UPDATE OF start_time, end_time, instructor_id, student_id', ' AND id <> new.id')):
+            op.execute(
+                f"CREATE TRIGGER bookings_conflict_{suffix} BEFORE {action} ON bookings "
+                f"WHEN {SQLITE_OVERLAP.format(column='instructor_id', exclude=exclude)} "
+                f"OR {SQLITE_OVERLAP.format(column='student_id', exclude=exclude)} "
+                f"BEGIN SELECT RAISE(ABORT, '{CONFLICT_MESSAGE}'); END"
+            )
+    elif bind.dialect.name == 'postgresql':
+        op.execute(POSTGRES_FUNCTION)
+        op.execute(
+            "CREATE TRIGGER bookings_conflict BEFORE INSERT OR UPDATE OF start_time, end_time, instructor_id, student_id "
+            "ON bookings FOR EACH ROW EXECUTE FUNCTION check_booking_conflict()"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for suffix in ('bi', 'bu'):
+            op.execute(f"DROP TRIGGER IF EXISTS bookings_conflict_{suffix}")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS bookings_conflict ON bookings")
+        op.execute("DROP FUNCTION IF EXISTS check_booking_conflict()")
@@ -0,0 +1,72 @@
+"""add_search_index
+
+Revision ID: d9a3c6e0f127
+Revises: c4d81f2e6b05
+Create Date: 2026-10-17 11:20:48.902315
+
+"""
+import sqlite3
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a3c6e0f127'
+down_revision = 'c4d81f2e6b05'
+branch_labels = None
+depends_on = None
+
+# SQLite: FTS5 trigram tables kept in sync by triggers (same DDL as app/search.py)
+# Postgres: pg_trgm GIN indexes so ilike('%x%') on these columns is index-backed
+SEARCH_COLUMNS = {
+    'users': ('first_name', 'last_name', 'email'),
+    'training_elements': ('name', 'description'),
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # The trigram tokenizer needs SQLite 3.34+ (same check as app/search.py),
+        # without it the search endpoints keep using ilike and there is nothing to create
+        if sqlite3.sqlite_version_info < (3, 34):
+            return
+        for table_name, columns in SEARCH_COLUMNS.items():
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f'new.{name}' for name in columns)
+            old_values = ', '.join(f'old.{name}' for name in columns)
+            op.execute(f"CREATE VIRTUAL TABLE {table_name}_fts USING fts5({column_list}, content='{table_name}', content_rowid='id', tokenize='trigram')")
+            op.execute(
+                f"CREATE TRIGGER {table_name}_fts_ai AFTER INSERT ON {table_name} BEGIN "
+                f"INSERT INTO {table_name}_fts(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {table_name}_fts_ad AFTER DELETE ON {table_name} BEGIN "
+                f"INSERT INTO {table_name}_fts({table_name}_fts, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {table_name}_fts_au AFTER UPDATE ON {table_name} BEGIN "
+                f"INSERT INTO {table_name}_fts({table_name}_fts, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {table_name}_fts(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            )
+            # Index the rows that already exist
+            op.execute(f"INSERT INTO {table_name}_fts({table_name}_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table_name, columns in SEARCH_COLUMNS.items():
+            for name in columns:
+                op.execute(f"CREATE INDEX ix_{table_name}_{name}_trgm ON {table_name} USING gin ({name} gin_trgm_ops)")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for table_name in SEARCH_COLUMNS:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table_name}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table_name}_fts")
+    elif bind.dialect.name == 'postgresql':
+        for table_name, columns in SEARCH_COLUMNS.items():
+            for name in columns:
+                op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_{name}_trgm")
@@ -1,8 +1,10 @@
 # Finalproject/routes/auth.py
 from flask import request, jsonify, Blueprint
 from flask_login import login_user, logout_user, login_required, current_user
-from app.extensions import db, bcrypt # Adjusted: Imported bcrypt from app.extensions, removed werkzeug.security imports
+from app.extensions import db
+from app.passwords import password_hasher, PasswordHasherBusy # bcrypt runs on a bounded pool, PasswordHasherBusy (503) when it is full
 from app.models import User # This import remains correct
+from app.access_tokens import access_tokens
 
 auth_bp = Blueprint("auth_bp", __name__)
 
@@ -54,8 +56,8 @@ def register():
     if role not in allowed_roles:
         return jsonify(message=f"Invalid role specified. Allowed roles are: {', '.join(allowed_roles)}"), 400 # Adjusted: Added role validation
 
-    # Hash password using Flask-Bcrypt's generate_password_hash
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8') # Adjusted: Used bcrypt from app.extensions and 'password' variable
+    # Hash password with the configured bcrypt cost (BCRYPT_LOG_ROUNDS) on the password hashing pool
+    hashed_password = password_hasher.hash(password)
 
     user = User(
         email=email,
@@ -69,29 +71,63 @@ def register():
     return jsonify({'message':'User registered successfully', 'user': serialize_user(user)}), 201
 
 
-@auth_bp.route('/login', methods=["POST"])
-def login():
-    data = request.get_json()
+# Supporting function: the user matching the posted email/password
+    # Returns (user, None) or (None, error response); shared by the session login and the access token endpoint
+def authenticate(data):
     if not data: 
-        return jsonify(message="No input data provided or invalid JSON"), 400
+        return None, (jsonify(message="No input data provided or invalid JSON"), 400)
 
     email = data.get('email') 
     password = data.get('password') 
 
     if not email or not password: # Combined checks for missing email or password
-        return jsonify(message="Email and password are required"), 400
+        return None, (jsonify(message="Email and password are required"), 400)
 
     user = User.query.filter_by(email=email).first() 
 
-    if not user or not bcrypt.check_password_hash(user.password_hash, password): # Used bcrypt.check_password_hash and 'password' variable
-        return jsonify({'message':'Invalid credentials'}), 401 
-    
+    if not user or not user.check_password(password):
+        return None, (jsonify({'message':'Invalid credentials'}), 401)
+
+    # Stored hash made with another cost than BCRYPT_LOG_ROUNDS: replace it while the password is at hand
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.set_password(password)
+            db.session.commit()
+        except PasswordHasherBusy:
+            db.session.rollback() # pool full: keep the old hash, the next login tries again
+    return user, None
+
+
+@auth_bp.route('/login', methods=["POST"])
+def login():
+    user, error = authenticate(request.get_json())
+    if error:
+        return error
+
     login_user(user)
 
 
 
     return jsonify({'message':'Login successful', 'user': serialize_user(user)}) 
 
+# Signed access token instead of a session cookie (opt-in, ACCESS_TOKENS_ENABLED)
+    # POST /api/auth/token {email, password} -> {access_token, token_type, expires_in, user}
+    # Send it as 'Authorization: Bearer <access_token>' until it expires, then request a new one.
+    # POST /api/auth/logout with the token revokes it, like a password or role change (app/access_tokens.py)
+@auth_bp.route('/token', methods=["POST"])
+def issue_access_token():
+    if not access_tokens.enabled:
+        return jsonify(message="Access tokens are not enabled"), 404
+    user, error = authenticate(request.get_json())
+    if error:
+        return error
+    return jsonify(
+        access_token=access_tokens.issue(user),
+        token_type='Bearer',
+        expires_in=access_tokens.ttl_seconds,
+        user=serialize_user(user)
+    ), 200
+
 @auth_bp.route('/current_user', methods=["GET"]) 
 @login_required 
 def get_current_user():
@@ -115,5 +151,11 @@ def get_current_user():
 @auth_bp.route('/logout', methods=["POST"])
 @login_required
 def logout():
+    # Signed in with an access token: revoke it (with the user's other access tokens)
+    if access_tokens.is_token_user(current_user):
+        user = db.session.get(User, current_user.id)
+        if user is not None:
+            access_tokens.revoke_user(user)
+            db.session.commit()
     logout_user()
     return jsonify({'message':'Logged out successfully'})
@@ -0,0 +1,129 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required
+from datetime import datetime, time, timedelta
+
+from app.extensions import db
+from app.models import Booking, TrainingElement, User
+from app.interval_index import merge_intervals, subtract_intervals, to_naive
+from itls.decorators import roles_required
+
+availability_bp = Blueprint("availability_bp", __name__)
+# ----Overall----
+# Free-slot finder for schedulers (admin & instructor)
+# Busy time of every requested instructor comes from ONE range query over bookings,
+# merged per instructor with a sweep line and subtracted from the working-hour windows of each day,
+# so the browser no longer needs the whole calendar to find an open slot.
+
+# Supporting function for parsing 'from'/'to' which may be a date (2025-07-01) or a datetime (2025-07-01T08:00:00Z)
+def parse_date_or_datetime(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return to_naive(parsed)
+
+# Supporting function for parsing 'weekdays' ("0,2,4"), raises ValueError unless every day is 0 (Monday) to 6 (Sunday)
+def parse_weekdays(value):
+    weekdays = {int(day) for day in value.split(',') if day != ''}
+    if not all(0 <= day <= 6 for day in weekdays):
+        raise ValueError("weekdays out of range")
+    return weekdays
+
+# Supporting function: working-hour windows [day + work_start, day + work_end) for every allowed weekday in range
+def working_windows(range_start, range_end, work_start, work_end, weekdays):
+    windows = []
+    day = range_start.date()
+    while day <= range_end.date():
+        if day.weekday() in weekdays:
+            window_start = max(datetime.combine(day, work_start), range_start)
+            window_end = min(datetime.combine(day, work_end), range_end)
+            if window_start < window_end:
+                windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return windows
+
+# Find free gaps of instructors
+    # GET /api/availability?instructor_ids=2,5&from=2025-07-01&to=2025-08-01&training_element_id=3
+    # Optional: work_start/work_end (HH:MM, default 08:00-17:00), weekdays (0=Mon..6=Sun, default 0,1,2,3,4),
+    #           duration_minutes instead of training_element_id, no instructor_ids = every instructor
+@availability_bp.route('/', methods=["GET"], strict_slashes=False)
+@login_required
+@roles_required('admin', 'instructor')
+def get_availability():
+    try:
+        from_str = request.args.get('from')
+        to_str = request.args.get('to')
+        if not from_str or not to_str:
+            return jsonify(message="Missing required parameters: from, to"), 400
+        try:
+            range_start = parse_date_or_datetime(from_str)
+            range_end = parse_date_or_datetime(to_str)
+        except ValueError:
+            return jsonify(message="Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SSZ')"), 400
+        if range_end <= range_start:
+            return jsonify(message="'to' must be after 'from'"), 400
+        max_days = current_app.config.get('AVAILABILITY_MAX_DAYS', 92)
+        if range_end - range_start > timedelta(days=max_days):
+            return jsonify(message=f"The date range can span at most {max_days} days"), 400
+
+        try:
+            work_start = time.fromisoformat(request.args.get('work_start', '08:00'))
+            work_end = time.fromisoformat(request.args.get('work_end', '17:00'))
+        except ValueError:
+            return jsonify(message="work_start and work_end must use the HH:MM format"), 400
+        if work_end <= work_start:
+            return jsonify(message="work_end must be after work_start"), 400
+        try:
+            weekdays = parse_weekdays(request.args.get('weekdays', '0,1,2,3,4'))
+        except ValueError:
+            return jsonify(message="weekdays must be a comma separated list of 0 (Monday) to 6 (Sunday)"), 400
+
+        # Slot length comes from the training element, or directly from duration_minutes
+        training_element_id = request.args.get('training_element_id', type=int)
+        duration_minutes = request.args.get('duration_minutes', type=int)
+        if training_element_id is not None:
+            training_element = TrainingElement.query.get(training_element_id)
+            if not training_element:
+                return jsonify(message=f"Training element with ID: {training_element_id} not found"), 400
+            duration_minutes = training_element.duration_minutes
+        if not duration_minutes or duration_minutes <= 0:
+            return jsonify(message="Provide a training_element_id or a positive duration_minutes"), 400
+
+        instructor_query = db.session.query(User.id, User.first_name, User.last_name).filter(User.role == 'instructor')
+        raw_ids = request.args.get('instructor_ids')
+        if raw_ids:
+            try:
+                instructor_ids = {int(value) for value in raw_ids.split(',') if value != ''}
+            except ValueError:
+                return jsonify(message="instructor_ids must be a comma separated list of integers"), 400
+            instructor_query = instructor_query.filter(User.id.in_(instructor_ids))
+        instructors = instructor_query.order_by(User.id).all()
+        if not instructors:
+            return jsonify(message="No instructors found"), 404
+
+        # One range query for the busy time of every instructor.
+        # All statuses count as busy, matching the conflict check of create_bookings.
+        busy_by_instructor = {instructor.id: [] for instructor in instructors}
+        rows = db.session.query(Booking.instructor_id, Booking.start_time, Booking.end_time).filter(
+            Booking.instructor_id.in_(busy_by_instructor.keys()),
+            Booking.start_time < range_end,
+            Booking.end_time > range_start
+        ).all()
+        for instructor_id, start_time, end_time in rows:
+            busy_by_instructor[instructor_id].append((start_time, end_time))
+
+        windows = working_windows(range_start, range_end, work_start, work_end, weekdays)
+        min_length = timedelta(minutes=duration_minutes)
+        result = []
+        for instructor in instructors:
+            gaps = subtract_intervals(windows, merge_intervals(busy_by_instructor[instructor.id]), min_length)
+            result.append({
+                'instructorId': instructor.id,
+                'instructorFirstName': instructor.first_name,
+                'instructorLastName': instructor.last_name,
+                'freeSlots': [{'startTime': start.isoformat(), 'endTime': end.isoformat()} for start, end in gaps]
+            })
+        return jsonify(
+            {'from': range_start.isoformat(), 'to': range_end.isoformat(), 'durationMinutes': duration_minutes, 'instructors': result}
+        ), 200
+    except Exception as e:
+        print(f"Error computing availability: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
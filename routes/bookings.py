@@ -1,10 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_login import login_required, current_user
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
 from app.extensions import db, login_manager
-from app.models import Booking, TrainingElement, User
-from itls.decorators import roles_required
+from app.models import ArchivedBooking, Booking, BookingChange, TrainingElement, User
+from app.interval_index import booking_index, IntervalSet, to_naive
+from app.booking_events import booking_events
+from app.booking_locks import booking_locks, is_booking_conflict
+from app.archive import reaches_archive
+from app.change_log import change_log_keys, committed_horizon
+from app.search import matching_user_ids, matching_training_element_ids
+from itls.decorators import roles_required, conditional_get
+from itls.pagination import paginate_by_keyset, paginate_merged_by_keyset, get_page_size, encode_cursor, decode_cursor
+from routes.availability import parse_date_or_datetime
 
 bookings_bp = Blueprint("booking_bp", __name__)
 print(f"DEBUG: bookings_bp is initialized with name: {bookings_bp.name}") # Corrected: use .name for blueprint
@@ -23,8 +34,8 @@ def serialize_booking(booking):
         'id': booking.id,
         'trainingElementId': booking.training_element_id,
         'trainingElementName': booking.training_element.name if booking.training_element else None,
-        'startTime': booking.start_time.isoformat() if booking.start_time else None, # Ensure .isoformat()
-        'endTime': booking.end_time.isoformat() if booking.end_time else None,     # Ensure .isoformat()
+        'startTime': booking.start_time, # datetime, written as ISO 8601 by the JSON provider (app/json_provider.py)
+        'endTime': booking.end_time,
         'instructorId': booking.instructor_id,
         'instructorFirstName': booking.instructor.first_name if booking.instructor else None,
         'instructorLastName': booking.instructor.last_name if booking.instructor else None,   
@@ -35,94 +46,357 @@ def serialize_booking(booking):
         'createdById': booking.created_by_user_id,
         'createdByEmail': booking.created_by.email if booking.created_by else None,
         'notes': booking.notes,
-        'createdAt':booking.created_at.isoformat() if booking.created_at else None,
-        'updatedAt': booking.updated_at.isoformat() if booking.updated_at else None
+        'seriesId': booking.series_id,
+        'createdAt':booking.created_at,
+        'updatedAt': booking.updated_at
     }
 
+# serialize_booking reads 4 relationships per booking; without eager loading each one is a lazy SELECT (N+1 queries).
+# Load them up-front with LEFT OUTER JOINs so a list response costs a single query regardless of its size.
+BOOKING_LOAD_OPTIONS = (
+    joinedload(Booking.training_element),
+    joinedload(Booking.instructor),
+    joinedload(Booking.student),
+    joinedload(Booking.created_by),
+)
+
+# Same for archived bookings (app/archive.py), which serialize_booking reads the same way
+ARCHIVED_BOOKING_LOAD_OPTIONS = (
+    joinedload(ArchivedBooking.training_element),
+    joinedload(ArchivedBooking.instructor),
+    joinedload(ArchivedBooking.student),
+    joinedload(ArchivedBooking.created_by),
+)
+
+# Supporting function for (re)loading one booking with everything serialize_booking needs
+def get_booking_for_response(booking_id):
+    return Booking.query.options(*BOOKING_LOAD_OPTIONS).filter(Booking.id == booking_id).first()
+
+# Supporting function for conflict detection
+    # Returns an existing booking of this instructor/student ('kind') overlapping [start_time, end_time), or None
+    # The in-memory interval index answers the common "no conflict" case without SQL,
+    # the database is only queried to confirm a possible hit (or when the index cannot be trusted)
+def find_conflicting_booking(kind, person_id, start_time, end_time, exclude_id):
+    if not booking_index.may_overlap(kind, person_id, start_time, end_time, exclude_id):
+        return None
+    person_column = Booking.instructor_id if kind == 'instructor' else Booking.student_id
+    # Conflict checks run while an update is pending, don't let the query autoflush the half-edited booking
+    with db.session.no_autoflush:
+        return Booking.query.filter(
+            person_column == person_id,
+            Booking.id != exclude_id,
+            start_time < Booking.end_time,
+            end_time > Booking.start_time
+        ).first()
+
+# Supporting function for the list filters, shared with the export endpoint (routes/exports.py)
+    # 'args': request.args, or any MultiDict with the same keys; 'model': Booking or ArchivedBooking
+    # Returns (conditions, None) for .filter(*conditions) / .where(*conditions), or (None, error message)
+def booking_filter_conditions(args, model=Booking):
+    conditions = []
+    training_element_name = args.get('training_element_name')
+    start_time_str = args.get('start_time')
+    end_time_str = args.get('end_time')
+    instructor_id = args.get('instructor_id', type=int) # Ensure type conversion
+    instructor_name = args.get('instructor_name')
+    student_id = args.get('student_id', type=int) # Ensure type conversion
+    student_name = args.get('student_name')
+    status = args.get('status')
+    created_by_user_id = args.get('created_by_user_id', type=int)
+    created_by_user_name = args.get('created_by_user_name') 
+
+    # Name filters resolve matching ids through the search index (app/search.py) and filter with IN (...),
+    # instead of joining TrainingElement/User once per filter and scanning with ilike('%x%')
+    if training_element_name:
+        conditions.append(model.training_element_id.in_(matching_training_element_ids(training_element_name))) # case-insensitive substring match
+    if start_time_str:
+        try:
+            start_time = datetime.fromisoformat(start_time_str.replace('Z','+00:00'))
+            conditions.append(model.start_time >= start_time)
+        except ValueError:
+            return None, "Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DDTHH:MM:SSZ')"
+    if end_time_str:
+        try:
+            end_time = datetime.fromisoformat(end_time_str.replace('Z','+00:00'))
+            conditions.append(model.end_time <= end_time)
+        except ValueError:
+            return None, "Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DDTHH:MM:SSZ')"
+    if instructor_id is not None: # Able to handle when key is 0
+        conditions.append(model.instructor_id == instructor_id)
+    if instructor_name:
+        # Match the name in either first_name or last_name
+        conditions.append(model.instructor_id.in_(matching_user_ids(instructor_name)))
+
+    if student_id is not None:
+        conditions.append(model.student_id == student_id)
+    if student_name:
+        conditions.append(model.student_id.in_(matching_user_ids(student_name)))
+
+    if status:
+        allowed_statuses = ['pending', 'confirmed', 'completed', 'cancelled']
+        if status not in allowed_statuses:
+            return None, f"Invalid status filter: '{status}'. Allowed statuses are: {', '.join(allowed_statuses)}"
+        conditions.append(model.status == status)
+
+    if created_by_user_id is not None:
+        conditions.append(model.created_by_user_id == created_by_user_id)
+    if created_by_user_name:
+        conditions.append(model.created_by_user_id.in_(matching_user_ids(created_by_user_name)))
+    return conditions, None
+
+# Supporting function: lower bound of the list filters (the 'start_time' filter, already validated), None if unbounded
+    # Tells whether the archive has to be read as well (app/archive.py)
+def filter_range_start(args):
+    start_time_str = args.get('start_time')
+    return datetime.fromisoformat(start_time_str.replace('Z', '+00:00')) if start_time_str else None
+
 # Querying exist bookings
 @bookings_bp.route('/', methods=["GET"], strict_slashes=False) # strict_slashes=False for resolvee the Preflight issue
 @login_required
+@conditional_get('bookings', 'users', 'training_elements')
 def get_all_bookings():
     # Query existing booking
     try:
         # create 'query' as a object for dynamic query operation later
         # it acts a query "constructor/builder"
-        query = Booking.query
+        query = Booking.query.options(*BOOKING_LOAD_OPTIONS)
         # use "args" attribute in "request" for geting use's query in the URL
-        training_element_name = request.args.get('training_element_name')
-        start_time_str = request.args.get('start_time')
-        end_time_str = request.args.get('end_time')
-        instructor_id = request.args.get('instructor_id', type=int) # Ensure type conversion
-        instructor_name = request.args.get('instructor_name')
-        student_id = request.args.get('student_id', type=int) # Ensure type conversion
-        student_name = request.args.get('student_name')
-        status = request.args.get('status')
-        created_by_user_id = request.args.get('created_by_user_id', type=int)
-        created_by_user_name = request.args.get('created_by_user_name') 
-
-        if training_element_name:
-            query = query.join(TrainingElement).filter(TrainingElement.name.ilike(f'%{training_element_name}%')) # ilike for case-insensitive search
-        if start_time_str:
-            try:
-                start_time = datetime.fromisoformat(start_time_str.replace('Z','+00:00'))
-                query = query.filter(Booking.start_time >= start_time)
-            except ValueError:
-                return jsonify(message="Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DDTHH:MM:SSZ')"), 400
-        if end_time_str:
-            try:
-                end_time = datetime.fromisoformat(end_time_str.replace('Z','+00:00'))
-                query = query.filter(Booking.end_time <= end_time)
-            except ValueError:
-                return jsonify(message="Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DDTHH:MM:SSZ')"), 400
-        if instructor_id is not None: # Able to handle when key is 0
-            query = query.filter(Booking.instructor_id == instructor_id)
-        if instructor_name:
-            # Join with the User table via the 'instructor' relationship and filter by first_name OR last_name
-            # This handles searching for a name that might be in either field
-            query = query.join(Booking.instructor).filter(
-                db.or_(
-                    User.first_name.ilike(f'%{instructor_name}%'),
-                    User.last_name.ilike(f'%{instructor_name}%')
-                )
-            )
-
-        if student_id is not None:
-            query = query.filter(Booking.student_id == student_id)
-        if student_name:
-            # Join with the User table via the 'student' relationship and filter by first_name OR last_name
-            query = query.join(Booking.student).filter(
-                db.or_(
-                    User.first_name.ilike(f'%{student_name}%'),
-                    User.last_name.ilike(f'%{student_name}%')
-                )
-            )
-
-        if status:
-            allowed_statuses = ['pending', 'confirmed', 'completed', 'cancelled']
-            if status not in allowed_statuses:
-                return jsonify(message=f"Invalid status filter: '{status}'. Allowed statuses are: {', '.join(allowed_statuses)}"), 400
-            query = query.filter(Booking.status == status)
-
-        if created_by_user_id is not None:
-            query = query.filter(Booking.created_by_user_id == created_by_user_id)
-        if created_by_user_name:
-            # Join with the User table via the 'created_by' relationship
-            query = query.join(Booking.created_by).filter(
-                db.or_(
-                    User.first_name.ilike(f'%{created_by_user_name}%'),
-                    User.last_name.ilike(f'%{created_by_user_name}%')
-                )
-            )
-
-        # Construct a query for executing
-        bookings = query.all()
-        return jsonify([serialize_booking(booking) for booking in bookings]), 200
+        conditions, error = booking_filter_conditions(request.args)
+        if error:
+            return jsonify(message=error), 400
+        query = query.filter(*conditions)
+
+        # Construct a query for executing, one page at a time ordered by (start_time, id)
+        # Clients pass the returned 'next_cursor' back as ?cursor= to get the following page
+        # When the filters reach back before the archive horizon, archived bookings are merged into the same list
+        try:
+            if reaches_archive(filter_range_start(request.args)):
+                archived_conditions, _ = booking_filter_conditions(request.args, ArchivedBooking)
+                archived_query = ArchivedBooking.query.options(*ARCHIVED_BOOKING_LOAD_OPTIONS).filter(*archived_conditions)
+                bookings, next_cursor = paginate_merged_by_keyset([
+                    (query, (Booking.start_time, Booking.id)),
+                    (archived_query, (ArchivedBooking.start_time, ArchivedBooking.id)),
+                ], request.args.get('cursor'))
+            else:
+                bookings, next_cursor = paginate_by_keyset(query, (Booking.start_time, Booking.id), request.args.get('cursor'))
+        except ValueError:
+            return jsonify(message="Invalid cursor"), 400
+        return jsonify(bookings=[serialize_booking(booking) for booking in bookings], next_cursor=next_cursor), 200
 
     except Exception as e:
         print(f"Error fetching bookings: {e}")
         db.session.rollback()
         return jsonify(message="Internal server error", error=str(e)), 500
         
+# Supporting function: naive UTC datetime (as stored) -> unix epoch seconds
+def to_epoch(value):
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+# Calendar window in a compact columnar format
+    # GET /api/bookings/calendar?from=2025-07-01&to=2025-08-01  (required, [from, to), date or ISO 8601 datetime)
+    # Bookings overlapping the window that the caller's calendar shows (same role rule as the stream),
+    # as parallel arrays instead of one 17-key object per booking:
+    #   {from, to, ids: [...], start: [epoch...], end: [epoch...], trainingElementIds, instructorIds, studentIds, statuses,
+    #    trainingElements: {id: name}, users: {id: [first_name, last_name]}}
+    # Reads only the needed columns as row tuples, names come from two IN lookups of the distinct ids.
+@bookings_bp.route('/calendar', methods=["GET"], strict_slashes=False)
+@login_required
+@conditional_get('bookings', 'users', 'training_elements')
+def get_calendar_window():
+    try:
+        from_str = request.args.get('from')
+        to_str = request.args.get('to')
+        if not from_str or not to_str:
+            return jsonify(message="Missing required parameters: from, to"), 400
+        try:
+            range_start = parse_date_or_datetime(from_str)
+            range_end = parse_date_or_datetime(to_str)
+        except ValueError:
+            return jsonify(message="Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SSZ')"), 400
+        if range_end <= range_start:
+            return jsonify(message="'to' must be after 'from'"), 400
+        max_days = current_app.config.get('CALENDAR_MAX_DAYS', 92)
+        if range_end - range_start > timedelta(days=max_days):
+            return jsonify(message=f"The date range can span at most {max_days} days"), 400
+
+        # Archived bookings are added when the window starts before the archive horizon (app/archive.py)
+        models = [Booking, ArchivedBooking] if reaches_archive(range_start) else [Booking]
+        statements = []
+        for model in models:
+            statement = db.select(
+                model.id, model.start_time, model.end_time,
+                model.training_element_id, model.instructor_id, model.student_id, model.status
+            ).where(
+                model.start_time < range_end,
+                model.end_time > range_start
+            )
+            if current_user.role == 'instructor':
+                statement = statement.where(model.instructor_id == current_user.id)
+            elif current_user.role == 'student':
+                statement = statement.where(model.student_id == current_user.id)
+            statements.append(statement)
+        statement = statements[0] if len(statements) == 1 else db.union_all(*statements)
+        rows = db.session.execute(statement.order_by('start_time', 'id')).all()
+
+        columns = {
+            'ids': [], 'start': [], 'end': [],
+            'trainingElementIds': [], 'instructorIds': [], 'studentIds': [], 'statuses': []
+        }
+        for booking_id, start_time, end_time, training_element_id, instructor_id, student_id, status in rows:
+            columns['ids'].append(booking_id)
+            columns['start'].append(to_epoch(start_time))
+            columns['end'].append(to_epoch(end_time))
+            columns['trainingElementIds'].append(training_element_id)
+            columns['instructorIds'].append(instructor_id)
+            columns['studentIds'].append(student_id)
+            columns['statuses'].append(status)
+
+        # Lookup tables, one entry per distinct id in the window
+        training_elements = {}
+        element_ids = set(columns['trainingElementIds'])
+        if element_ids:
+            training_elements = dict(db.session.query(TrainingElement.id, TrainingElement.name).filter(TrainingElement.id.in_(element_ids)).all())
+        users = {}
+        user_ids = set(columns['instructorIds']) | set(columns['studentIds'])
+        if user_ids:
+            users = {
+                user_id: [first_name, last_name]
+                for user_id, first_name, last_name in db.session.query(User.id, User.first_name, User.last_name).filter(User.id.in_(user_ids))
+            }
+        return jsonify(
+            {'from': to_epoch(range_start), 'to': to_epoch(range_end), **columns, 'trainingElements': training_elements, 'users': users}
+        ), 200
+    except Exception as e:
+        print(f"Error fetching calendar window: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Delta sync of bookings
+    # GET /api/bookings/changes?since=<token>&limit=
+    # Returns the bookings created/updated after 'token' (current state, same shape as the list),
+    # the ids deleted after it (tombstones) and the token to pass next time, from the booking_changes log.
+    # Without 'since' only the current token is returned: take it BEFORE loading the full list,
+    # re-sent rows are harmless, missed ones are not. 'has_more' = call again right away with next_token.
+    # On PostgreSQL changes of transactions that may still be running are held back to a later call, so a
+    # token never gets ahead of a change yet to commit (app/change_log.py).
+    # 410 when the token points before the oldest retained change (log pruned by 'flask prune-booking-changes'):
+    # reload the full list.
+@bookings_bp.route('/changes', methods=["GET"], strict_slashes=False)
+@login_required
+def get_booking_changes():
+    try:
+        keys = change_log_keys()
+        horizon = committed_horizon() if len(keys) == 2 else None
+        since = request.args.get('since')
+        if not since:
+            # Position of the last visible change: transactions still running sort after it
+            latest = db.session.query(*keys)
+            if horizon is not None:
+                latest = latest.filter(BookingChange.txid < horizon)
+            latest = latest.order_by(*(key.desc() for key in keys)).first()
+            next_key = list(latest) if latest else [0] * len(keys)
+            return jsonify(bookings=[], deleted=[], next_token=encode_cursor(next_key), has_more=False), 200
+        try:
+            since_key = decode_cursor(since, keys)
+        except ValueError:
+            return jsonify(message="Invalid token"), 400
+        oldest = db.session.query(*keys).order_by(*keys).first()
+        if oldest is not None:
+            # seq has no gaps on SQLite: the change right before the oldest one is still a valid position.
+            # (txid, seq) has gaps: any token before the oldest retained change may have lost some
+            # (including, needlessly, one handed out while the log was still empty)
+            expired = list(oldest) > since_key if horizon is not None else since_key[0] < oldest.seq - 1
+            if expired:
+                return jsonify(message="Token expired, reload all bookings"), 410
+
+        # One page of the log in log order, on the primary key (SQLite) / ix_booking_changes_txid_seq (PostgreSQL)
+        limit = get_page_size()
+        query = db.session.query(BookingChange.seq, BookingChange.txid, BookingChange.booking_id, BookingChange.action)
+        if horizon is not None:
+            query = query.filter(BookingChange.txid < horizon)
+        changes, more_cursor = paginate_by_keyset(query, keys, since, limit)
+        has_more = more_cursor is not None
+
+        # Several changes of one booking collapse into its last action
+        last_action = {}
+        for change in changes:
+            last_action[change.booking_id] = change.action
+        upserted_ids = [booking_id for booking_id, action in last_action.items() if action == 'upsert']
+        bookings = []
+        if upserted_ids:
+            bookings = Booking.query.options(*BOOKING_LOAD_OPTIONS).filter(Booking.id.in_(upserted_ids)).order_by(Booking.id).all()
+        # Deleted by a later change than this page holds: still a tombstone
+        found_ids = {booking.id for booking in bookings}
+        deleted = sorted(booking_id for booking_id in last_action if booking_id not in found_ids)
+
+        next_key = [getattr(changes[-1], key.key) for key in keys] if changes else since_key
+        return jsonify(
+            bookings=[serialize_booking(booking) for booking in bookings],
+            deleted=deleted,
+            next_token=encode_cursor(next_key),
+            has_more=has_more
+        ), 200
+    except Exception as e:
+        print(f"Error fetching booking changes: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Supporting function for the stream: same visibility as the calendar,
+    # admin sees every booking, an instructor / student only the bookings they teach / attend
+def booking_event_visible(booking_data, role, user_id):
+    if role == 'admin':
+        return True
+    if role == 'instructor':
+        return booking_data.get('instructorId') == user_id
+    return booking_data.get('studentId') == user_id
+
+# Live booking events (Server-Sent Events)
+    # GET /api/bookings/stream, used with EventSource(url, { withCredentials: true })
+    # Pushes 'created' / 'updated' (full booking) and 'deleted' ({id, ...}) events committed by this server process,
+    # 'resync' when events were missed (reload the list), and a comment line as keep-alive.
+    # The stream closes after BOOKING_STREAM_MAX_SECONDS, EventSource reconnects with Last-Event-ID and resumes.
+    # 503 + Retry-After while BOOKING_STREAM_MAX_CLIENTS streams are open in this process (app/booking_events.py).
+@bookings_bp.route('/stream', methods=["GET"], strict_slashes=False)
+@login_required
+def stream_booking_events():
+    # Read everything the generator needs now: it runs after the request context is gone,
+    # which also hands the database connection back while the client idles
+    role = current_user.role
+    user_id = current_user.id
+    json_provider = current_app.json
+    keepalive_seconds = current_app.config.get('BOOKING_STREAM_KEEPALIVE_SECONDS', 15)
+    max_seconds = current_app.config.get('BOOKING_STREAM_MAX_SECONDS', 300)
+    last_seq = booking_events.last_seq
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id and last_event_id.isdigit():
+        last_seq = int(last_event_id)
+
+    def generate():
+        seq = last_seq
+        deadline = time.monotonic() + max_seconds
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            events, lost = booking_events.wait_for_events(seq, min(keepalive_seconds, max(deadline - time.monotonic(), 0)))
+            if lost:
+                seq = booking_events.last_seq
+                yield f"id: {seq}\nevent: resync\ndata: {{}}\n\n"
+                continue
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for booking_event in events:
+                seq = booking_event.seq
+                if booking_event_visible(booking_event.booking, role, user_id):
+                    yield f"id: {seq}\nevent: {booking_event.event_type}\ndata: {json_provider.dumps(booking_event.booking)}\n\n"
+
+    # Answered by the 503 handler in app/__init__.py when every slot is taken
+    release_stream = booking_events.open_stream()
+    # no-cache / X-Accel-Buffering: no, so proxies pass events through as they come
+    response = Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs when the server closes the response: stream over, client gone, or never started
+    response.call_on_close(release_stream)
+    return response
+
 # Create new bookings
 @bookings_bp.route('/', methods=["POST"], strict_slashes=False)
 @login_required
@@ -239,48 +513,229 @@ def create_bookings():
         
         # CHANGE: Refined conflict query to ensure roles are distinct for conflict
         # Checks for instructor double-booking
-        instructor_conflict = Booking.query.filter(
-            Booking.instructor_id == instructor_id,
-            Booking.id != (data.get('id') if data.get('id') else -1), # Exclude current booking ID for update scenarios
-            start_time < Booking.end_time,
-            end_time > Booking.start_time
-        ).first()
+        exclude_id = data.get('id') if data.get('id') else -1 # Exclude current booking ID for update scenarios
+        # Check and insert while holding the instructor's and student's locks, so a concurrent request
+        # for one of them waits for this commit instead of seeing the same free slot (app/booking_locks.py)
+        with booking_locks.hold([('instructor', instructor_id), ('student', student_id)]):
+            instructor_conflict = find_conflicting_booking('instructor', instructor_id, start_time, end_time, exclude_id)
 
-        if instructor_conflict:
-            return jsonify(message=f"Instructor {instructor_conflict.instructor.first_name} {instructor_conflict.instructor.last_name} is already booked at this time."), 409
+            if instructor_conflict:
+                return jsonify(message=f"Instructor {instructor_conflict.instructor.first_name} {instructor_conflict.instructor.last_name} is already booked at this time."), 409
 
-        # Checks for student double-booking
-        student_conflict = Booking.query.filter(
-            Booking.student_id == student_id,
-            Booking.id != (data.get('id') if data.get('id') else -1), # Exclude current booking ID for update scenarios
-            start_time < Booking.end_time,
-            end_time > Booking.start_time
-        ).first()
+            # Checks for student double-booking
+            student_conflict = find_conflicting_booking('student', student_id, start_time, end_time, exclude_id)
 
-        if student_conflict:
-            return jsonify(message=f"Student {student_conflict.student.first_name} {student_conflict.student.last_name} is already booked at this time."), 409
-        # END CHANGE
-
-        new_booking= Booking(
-            training_element_id = training_element_id,
-            instructor_id = instructor_id,
-            student_id = student_id,
-            start_time = start_time,
-            end_time = end_time,
-            status = status,
-            created_by_user_id = current_user.id,
-            notes = notes
-        )
-        db.session.add(new_booking)
-        db.session.commit()
-        # Ensure 100% new_booking is refreshed from database
-        db.session.refresh(new_booking)
-        return jsonify(message="Your session is successfully booked", booking=serialize_booking(new_booking)), 201
+            if student_conflict:
+                return jsonify(message=f"Student {student_conflict.student.first_name} {student_conflict.student.last_name} is already booked at this time."), 409
+            # END CHANGE
+
+            new_booking= Booking(
+                training_element_id = training_element_id,
+                instructor_id = instructor_id,
+                student_id = student_id,
+                start_time = start_time,
+                end_time = end_time,
+                status = status,
+                created_by_user_id = current_user.id,
+                notes = notes
+            )
+            db.session.add(new_booking)
+            db.session.commit()
+        # Ensure 100% new_booking is refreshed from database, relationships included, in one query
+        new_booking = get_booking_for_response(new_booking.id)
+        booking_data = serialize_booking(new_booking)
+        booking_events.publish('created', booking_data)
+        return jsonify(message="Your session is successfully booked", booking=booking_data), 201
+    except IntegrityError as e:
+        # Guard trigger: a writer the locks cannot see (another process, a stale index) took the slot first
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify(message="The instructor or student is already booked at this time."), 409
+        print(f"Error creating booking : {e}")
+        return jsonify(message="Internal server error", error=str(e)), 500
     except Exception as e:
         print(f"Error creating booking : {e}")
         db.session.rollback()
         return jsonify(message="Internal server error", error=str(e)), 500
 
+# Create many bookings in one request (e.g. a training wave of a few hundred sessions)
+    # Body: a JSON array of bookings (same fields as POST /api/bookings) or {"bookings": [...]}
+    # Every referenced training element and user is resolved with a handful of IN queries,
+    # overlaps are checked against the database (one range query) and within the batch in a single pass,
+    # and all valid bookings are inserted with one flush in one transaction.
+    # Response: per-item results in input order, 201 when every item was created, 207 when only some were
+@bookings_bp.route('/bulk', methods=["POST"], strict_slashes=False)
+@login_required
+@roles_required('admin', 'instructor')
+def create_bookings_bulk():
+    try:
+        data = request.get_json()
+        items = data.get('bookings') if isinstance(data, dict) else data
+        if not items or not isinstance(items, list):
+            return jsonify(message="No input data provided, expected a list of bookings"), 400
+        max_items = current_app.config.get('BULK_BOOKING_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return jsonify(message=f"Too many bookings in one request, the maximum is {max_items}"), 400
+
+        results = [None] * len(items)
+        candidates = [] # (index, parsed fields) that passed the per-item checks so far
+
+        # ---Parse and validate each item (no database access)---
+        for index, item in enumerate(items):
+            fields, error = parse_bulk_booking_item(item)
+            if error:
+                results[index] = {'index': index, 'status': 'error', 'code': error[0], 'message': error[1]}
+            else:
+                candidates.append((index, fields))
+
+        # ---Resolve every referenced training element and user with IN queries---
+        element_ids = {fields['training_element_id'] for _, fields in candidates}
+        user_ids = {fields[key] for _, fields in candidates for key in ('instructor_id', 'student_id')}
+        existing_element_ids = {row.id for row in db.session.query(TrainingElement.id).filter(TrainingElement.id.in_(element_ids))} if element_ids else set()
+        user_roles = {row.id: row.role for row in db.session.query(User.id, User.role).filter(User.id.in_(user_ids))} if user_ids else {}
+
+        valid = []
+        for index, fields in candidates:
+            if fields['training_element_id'] not in existing_element_ids:
+                message = f"Training element with ID: {fields['training_element_id']} not found"
+            elif user_roles.get(fields['instructor_id']) != 'instructor':
+                message = f"Instructor with ID: {fields['instructor_id']} not found or is not an instructor"
+            elif user_roles.get(fields['student_id']) != 'student':
+                message = f"Student with ID: {fields['student_id']} not found or is not a student"
+            else:
+                valid.append((index, fields))
+                continue
+            results[index] = {'index': index, 'status': 'error', 'code': 400, 'message': message}
+
+        # ---Conflict check: one range query for everyone involved, then an in-memory pass---
+        # Everyone in the batch stays locked until the commit (app/booking_locks.py)
+        new_bookings = []
+        with booking_locks.hold(booking_people([fields for _, fields in valid])):
+            busy = load_busy_intervals([fields for _, fields in valid])
+            for index, fields in valid:
+                conflict = reserve_slot(busy, fields)
+                if conflict:
+                    results[index] = {'index': index, 'status': 'error', 'code': conflict[0], 'message': conflict[1]}
+                    continue
+                new_bookings.append((index, Booking(created_by_user_id=current_user.id, **fields)))
+
+            # ---Insert everything with one flush and commit once---
+            if new_bookings:
+                db.session.add_all([booking for _, booking in new_bookings])
+                db.session.flush()
+                created_ids = [(index, booking.id) for index, booking in new_bookings]
+                db.session.commit()
+        if new_bookings:
+            # Reload the created bookings with their relationships in a single query for the response
+            loaded = {booking.id: booking for booking in Booking.query.options(*BOOKING_LOAD_OPTIONS).filter(Booking.id.in_([booking_id for _, booking_id in created_ids]))}
+            for index, booking_id in created_ids:
+                results[index] = {'index': index, 'status': 'created', 'booking': serialize_booking(loaded[booking_id])}
+
+        created_count = len(new_bookings)
+        if created_count == len(items):
+            status_code = 201
+        elif created_count:
+            status_code = 207
+        elif all(result['code'] == 409 for result in results):
+            # Every booking lost to an existing one: same answer as a single create
+            status_code = 409
+        else:
+            status_code = 400
+        return jsonify(message=f"{created_count} of {len(items)} bookings created", results=results), status_code
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify(message="A booking of the batch was taken concurrently, nothing was created. Please retry."), 409
+        print(f"Error creating bookings in bulk: {e}")
+        return jsonify(message="Internal server error", error=str(e)), 500
+    except Exception as e:
+        print(f"Error creating bookings in bulk: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Supporting function for batch conflict checks (bulk endpoint, CSV import)
+    # One range query for the booked time of every instructor/student of 'items' (parsed fields)
+    # Returns ('instructor' | 'student', person_id) -> IntervalSet
+def load_busy_intervals(items):
+    if not items:
+        return {}
+    instructor_ids = {fields['instructor_id'] for fields in items}
+    student_ids = {fields['student_id'] for fields in items}
+    window_start = min(fields['start_time'] for fields in items)
+    window_end = max(fields['end_time'] for fields in items)
+    existing = db.session.query(Booking.instructor_id, Booking.student_id, Booking.start_time, Booking.end_time).filter(
+        db.or_(Booking.instructor_id.in_(instructor_ids), Booking.student_id.in_(student_ids)),
+        Booking.start_time < window_end,
+        Booking.end_time > window_start
+    ).all()
+    intervals = {}
+    for row in existing:
+        if row.instructor_id in instructor_ids:
+            intervals.setdefault(('instructor', row.instructor_id), []).append((row.start_time, row.end_time))
+        if row.student_id in student_ids:
+            intervals.setdefault(('student', row.student_id), []).append((row.start_time, row.end_time))
+    return {key: IntervalSet(value) for key, value in intervals.items()}
+
+# Supporting function: the (kind, person_id) pairs of 'items' (parsed fields) for booking_locks.hold
+def booking_people(items):
+    return [('instructor', fields['instructor_id']) for fields in items] + [('student', fields['student_id']) for fields in items]
+
+# Supporting function: conflict check of one item against 'busy' (see load_busy_intervals)
+    # A free item occupies its slot for the rest of the batch. Returns None or (409, message)
+def reserve_slot(busy, fields):
+    start_time, end_time = fields['start_time'], fields['end_time']
+    instructor_busy = busy.setdefault(('instructor', fields['instructor_id']), IntervalSet())
+    student_busy = busy.setdefault(('student', fields['student_id']), IntervalSet())
+    if instructor_busy.overlaps(start_time, end_time):
+        return 409, f"Instructor with ID: {fields['instructor_id']} is already booked at this time."
+    if student_busy.overlaps(start_time, end_time):
+        return 409, f"Student with ID: {fields['student_id']} is already booked at this time."
+    instructor_busy.add(start_time, end_time)
+    student_busy.add(start_time, end_time)
+    return None
+
+# Supporting function for the bulk endpoint
+    # Validates one item the same way create_bookings does, except for the checks that need the database
+    # 'user' is the one creating the booking, current_user by default (the CSV import CLI has no request)
+    # Returns (fields, None) or (None, (status_code, message))
+def parse_bulk_booking_item(item, user=None):
+    user = user if user is not None else current_user
+    if not isinstance(item, dict):
+        return None, (400, "Each booking must be a JSON object")
+    missing_fields = [field for field in ('training_element_id', 'start_time', 'end_time', 'instructor_id', 'student_id') if item.get(field) in (None, '')]
+    if user.role == 'instructor' and 'instructor_id' in missing_fields:
+        missing_fields.remove('instructor_id') # Instructors book themselves
+    if missing_fields:
+        return None, (400, f"Missing required fields: {','.join(missing_fields)}")
+    try:
+        training_element_id = int(item['training_element_id'])
+        student_id = int(item['student_id'])
+        instructor_id = int(item['instructor_id']) if item.get('instructor_id') is not None else user.id
+    except (ValueError, TypeError):
+        return None, (400, "training_element_id, instructor_id and student_id must be valid integers")
+    if user.role == 'instructor' and instructor_id != user.id:
+        return None, (403, "Instructors can only book themselves as the instructor.")
+    try:
+        start_time = to_naive(datetime.fromisoformat(item['start_time'].replace('Z', '+00:00')))
+        end_time = to_naive(datetime.fromisoformat(item['end_time'].replace('Z', '+00:00')))
+    except (ValueError, TypeError, AttributeError):
+        return None, (400, "Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DDTHH:MM:SSZ')")
+    if end_time <= start_time:
+        return None, (400, "booking end_time must be after start_time")
+    status = item.get('status', 'pending')
+    allowed_status = ['pending', 'confirmed', 'completed', 'cancelled']
+    if status not in allowed_status:
+        return None, (400, f"invalid status, allowed status: {allowed_status}")
+    return {
+        'training_element_id': training_element_id,
+        'instructor_id': instructor_id,
+        'student_id': student_id,
+        'start_time': start_time,
+        'end_time': end_time,
+        'status': status,
+        'notes': item.get('notes'),
+    }, None
+
 # Update existing booking for instructor & admin 
 @bookings_bp.route('/<int:booking_id>', methods=["PUT"], strict_slashes=False)
 @login_required
@@ -288,7 +743,7 @@ def create_bookings():
 def update_booking_by_id(booking_id):
     try:
         # Retrieve record of booking via 'booking_id'
-        booking = Booking.query.get(booking_id)
+        booking = get_booking_for_response(booking_id)
         if not booking:
             return jsonify(message="No booking data found"), 404
         
@@ -389,38 +844,39 @@ def update_booking_by_id(booking_id):
         
 
         
-        # Re-check Conflict Detection if relevant fields changed
-        if (booking.start_time != original_start_time or
-            booking.end_time != original_end_time or
-            booking.instructor_id != original_instructor_id or
-            booking.student_id != original_student_id):
-
-            # Checks for instructor double-booking (using updated instructor_id)
-            instructor_conflict = Booking.query.filter(
-                Booking.instructor_id == booking.instructor_id,
-                Booking.id != booking_id,
-                booking.start_time < Booking.end_time,
-                booking.end_time > Booking.start_time
-            ).first()
-
-            if instructor_conflict:
-                return jsonify(message=f"Conflict detected: Instructor is already booked during this time."), 409
-
-            # Checks for student double-booking (using updated student_id)
-            student_conflict = Booking.query.filter(
-                Booking.student_id == booking.student_id,
-                Booking.id != booking_id,
-                booking.start_time < Booking.end_time,
-                booking.end_time > Booking.start_time
-            ).first()
-
-            if student_conflict:
-                return jsonify(message=f"Conflict detected: Student is already booked during this time."), 409
-
-        booking.updated_at = db.func.now()
-        # Commit change to database
-        db.session.commit()
-        return jsonify(message="Booking updated successfully", booking=serialize_booking(booking)), 200
+        # Re-check Conflict Detection if relevant fields changed, holding the (new) people's locks until the commit
+        with booking_locks.hold([('instructor', booking.instructor_id), ('student', booking.student_id)]):
+            if (booking.start_time != original_start_time or
+                booking.end_time != original_end_time or
+                booking.instructor_id != original_instructor_id or
+                booking.student_id != original_student_id):
+
+                # Checks for instructor double-booking (using updated instructor_id)
+                instructor_conflict = find_conflicting_booking('instructor', booking.instructor_id, booking.start_time, booking.end_time, booking_id)
+
+                if instructor_conflict:
+                    return jsonify(message=f"Conflict detected: Instructor is already booked during this time."), 409
+
+                # Checks for student double-booking (using updated student_id)
+                student_conflict = find_conflicting_booking('student', booking.student_id, booking.start_time, booking.end_time, booking_id)
+
+                if student_conflict:
+                    return jsonify(message=f"Conflict detected: Student is already booked during this time."), 409
+
+            booking.updated_at = db.func.now()
+            # Commit change to database
+            db.session.commit()
+        # Commit expires the instance, reload it with its relationships in one query before serializing
+        booking = get_booking_for_response(booking_id)
+        booking_data = serialize_booking(booking)
+        booking_events.publish('updated', booking_data)
+        return jsonify(message="Booking updated successfully", booking=booking_data), 200
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify(message="Conflict detected: Instructor or student is already booked during this time."), 409
+        print(f"Error updating booking: {e}")
+        return jsonify(message="Internal server error", error=str(e)), 500
     except Exception as e:
         print(f"Error updating booking: {e}") # Corrected print message
         db.session.rollback()
@@ -448,8 +904,11 @@ def delete_booking_by_id(booking_id):
             return jsonify(message="Access denied: You must be an admin or the creator of this booking to delete it."), 403 # Changed to 403 Forbidden
 
         
+        # Subscribers only need the id, and the people it belonged to for the role filter
+        booking_data = {'id': booking.id, 'instructorId': booking.instructor_id, 'studentId': booking.student_id}
         db.session.delete(booking)
         db.session.commit()
+        booking_events.publish('deleted', booking_data)
         return '', 204
     except Exception as e:
         print(f"Error deleting booking {booking_id}: {e}")
@@ -0,0 +1,123 @@
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context, url_for
+from flask_login import login_required, current_user
+from datetime import datetime, time, timedelta
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models import Booking, TrainingElement, User
+from app.ical import booking_event, calendar_footer, calendar_header
+from app.table_versions import compute_etag
+
+calendar_feed_bp = Blueprint("calendar_feed_bp", __name__)
+# ----Overall----
+# Per-user iCalendar (.ics) feed for calendar clients (Google Calendar, Outlook, Apple Calendar, ...)
+# Clients cannot log in, so the feed URL carries a signed token (user id + calendar_feed_version) instead of a cookie.
+# Resetting the feed URL bumps calendar_feed_version, which revokes every URL issued before.
+# Clients poll often: an unchanged feed is answered with 304 from the table versions (one primary key lookup),
+# a changed one is streamed VEVENT by VEVENT from a server-side cursor instead of being built in memory.
+
+# Supporting function: serializer of the feed tokens, keyed by SECRET_KEY with its own salt
+def feed_serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='calendar-feed')
+
+# Supporting function: feed URL of a user
+def feed_url(user):
+    token = feed_serializer().dumps({'uid': user.id, 'v': user.calendar_feed_version})
+    return url_for('calendar_feed_bp.get_calendar_feed', token=token, _external=True)
+
+# Supporting function: user of a feed token, None when the signature is wrong or the token was revoked
+def load_feed_user(token):
+    try:
+        claims = feed_serializer().loads(token)
+    except BadSignature:
+        return None
+    if not isinstance(claims, dict):
+        return None
+    user = db.session.get(User, claims.get('uid'))
+    if user is None or user.calendar_feed_version != claims.get('v'):
+        return None
+    return user
+
+# Feed URL of the current user
+@calendar_feed_bp.route('/feed-url', methods=["GET"], strict_slashes=False)
+@login_required
+def get_feed_url():
+    return jsonify(url=feed_url(current_user)), 200
+
+# Reset the feed URL: every URL issued so far stops working
+@calendar_feed_bp.route('/feed-url', methods=["DELETE"], strict_slashes=False)
+@login_required
+def reset_feed_url():
+    try:
+        # current_user is a cached snapshot (app/user_cache.py), change the row itself
+        user = db.session.get(User, current_user.id)
+        user.calendar_feed_version = user.calendar_feed_version + 1
+        db.session.commit()
+        return jsonify(message="Calendar feed URL reset", url=feed_url(user)), 200
+    except Exception as e:
+        print(f"Error resetting calendar feed URL: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# The feed itself (no session, the token authenticates)
+    # Students get the sessions they attend, instructors the ones they teach, admins every booking,
+    # from midnight (UTC) ICS_FEED_PAST_DAYS days ago onwards
+@calendar_feed_bp.route('/<token>.ics', methods=["GET"], strict_slashes=False)
+def get_calendar_feed(token):
+    try:
+        user = load_feed_user(token)
+        if user is None:
+            return jsonify(message="Invalid or revoked calendar feed"), 404
+
+        # The window starts at midnight, so the body only changes with the data or the date: both are in the ETag
+        since = datetime.combine(datetime.utcnow().date() - timedelta(days=current_app.config.get('ICS_FEED_PAST_DAYS', 90)), time.min)
+        etag = compute_etag(('bookings', 'users', 'training_elements'), 'ics', user.id, user.role, since.date().isoformat())
+        if etag and request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        instructor = aliased(User)
+        student = aliased(User)
+        statement = db.select(
+            Booking.id, Booking.start_time, Booking.end_time, Booking.status, Booking.notes,
+            db.func.coalesce(Booking.updated_at, Booking.created_at), TrainingElement.name,
+            instructor.first_name, instructor.last_name, student.first_name, student.last_name
+        ).join(TrainingElement, Booking.training_element_id == TrainingElement.id).outerjoin(
+            instructor, Booking.instructor_id == instructor.id
+        ).outerjoin(
+            student, Booking.student_id == student.id
+        ).where(Booking.end_time >= since).order_by(Booking.start_time, Booking.id)
+        if user.role == 'instructor':
+            statement = statement.where(Booking.instructor_id == user.id)
+        elif user.role == 'student':
+            statement = statement.where(Booking.student_id == user.id)
+        calendar_name = f"Training sessions - {user.first_name} {user.last_name}"
+        host = request.host.split(':')[0]
+
+        def generate():
+            yield calendar_header(calendar_name)
+            # yield_per: rows are fetched in batches (a server-side cursor where the driver supports it)
+            rows = db.session.execute(statement.execution_options(yield_per=current_app.config.get('ICS_FEED_BATCH_SIZE', 500)))
+            for (booking_id, start_time, end_time, status, notes, stamp, element_name,
+                 instructor_first, instructor_last, student_first, student_last) in rows:
+                description = [f"Instructor: {instructor_first or ''} {instructor_last or ''}".rstrip(),
+                               f"Student: {student_first or ''} {student_last or ''}".rstrip()]
+                if notes:
+                    description.append(notes)
+                yield booking_event(
+                    f"booking-{booking_id}@{host}", start_time, end_time, stamp or start_time, status,
+                    element_name, '\n'.join(description)
+                )
+            yield calendar_footer()
+
+        response = Response(stream_with_context(generate()), mimetype='text/calendar')
+        if etag:
+            response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    except Exception as e:
+        print(f"Error building calendar feed: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
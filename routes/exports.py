@@ -0,0 +1,162 @@
+import csv
+import io
+import zlib
+
+import click
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from flask.cli import with_appcontext
+from flask_login import login_required
+from sqlalchemy.orm import aliased
+from werkzeug.datastructures import MultiDict
+
+from app.extensions import db
+from app.models import ArchivedBooking, Booking, TrainingElement, User
+from app.archive import reaches_archive
+from itls.decorators import roles_required
+from routes.bookings import booking_filter_conditions, filter_range_start
+
+exports_bp = Blueprint("exports_bp", __name__)
+# ----Overall----
+# Full dumps of bookings joined to users and training elements for analytics, as an admin endpoint and a CLI command
+# One column-only SELECT is read with yield_per (a server-side cursor where the driver supports it),
+# each batch of rows is written as CSV or newline-delimited JSON and, optionally, gzip-compressed on the fly.
+# Nothing but the current batch is held in memory, whatever the number of bookings.
+# Filters are the ones of GET /api/bookings (booking_filter_conditions), archived bookings included the same way.
+
+# Exported columns, in order
+EXPORT_COLUMNS = [
+    'id', 'training_element_id', 'training_element_name',
+    'instructor_id', 'instructor_email', 'instructor_first_name', 'instructor_last_name',
+    'student_id', 'student_email', 'student_first_name', 'student_last_name',
+    'start_time', 'end_time', 'status', 'notes', 'series_id',
+    'created_by_user_id', 'created_by_email', 'created_at', 'updated_at',
+]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Supporting function: SELECT of the exported columns from 'model' (Booking or ArchivedBooking)
+def export_select(model, conditions):
+    instructor = aliased(User)
+    student = aliased(User)
+    created_by = aliased(User)
+    columns = [
+        model.id, model.training_element_id, TrainingElement.name,
+        model.instructor_id, instructor.email, instructor.first_name, instructor.last_name,
+        model.student_id, student.email, student.first_name, student.last_name,
+        model.start_time, model.end_time, model.status, model.notes, model.series_id,
+        model.created_by_user_id, created_by.email, model.created_at, model.updated_at
+    ]
+    return db.select(*(column.label(name) for column, name in zip(columns, EXPORT_COLUMNS))).join(
+        TrainingElement, model.training_element_id == TrainingElement.id
+    ).outerjoin(
+        instructor, model.instructor_id == instructor.id
+    ).outerjoin(
+        student, model.student_id == student.id
+    ).outerjoin(
+        created_by, model.created_by_user_id == created_by.id
+    ).where(*conditions)
+
+# Supporting function: the export statement for the list filters in 'args', ordered like the list endpoint
+    # Archived bookings are included when the filters reach back before the archive horizon (app/archive.py)
+    # Returns (statement, None) or (None, error message)
+def export_statement(args):
+    conditions, error = booking_filter_conditions(args)
+    if error:
+        return None, error
+    statements = [export_select(Booking, conditions)]
+    if reaches_archive(filter_range_start(args)):
+        archived_conditions, _ = booking_filter_conditions(args, ArchivedBooking)
+        statements.append(export_select(ArchivedBooking, archived_conditions))
+    statement = statements[0] if len(statements) == 1 else db.union_all(*statements)
+    return statement.order_by('start_time', 'id'), None
+
+# Supporting function: the export as a stream of byte chunks
+    # export_format: 'csv' | 'ndjson', compress: gzip the whole stream
+def iter_export(statement, export_format, compress, batch_size, json_provider):
+    compressor = zlib.compressobj(wbits=31) if compress else None # wbits=31: gzip container
+
+    def emit(text):
+        data = text.encode('utf-8')
+        return compressor.compress(data) if compressor else data
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    rows = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for batch in rows.partitions():
+        for row in batch:
+            if writer:
+                writer.writerow([value.isoformat() if hasattr(value, 'isoformat') else value for value in row])
+            else:
+                buffer.write(json_provider.dumps(dict(zip(EXPORT_COLUMNS, row))))
+                buffer.write('\n')
+        chunk = emit(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        if chunk:
+            yield chunk
+    tail = emit(buffer.getvalue())
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
+
+# Export bookings
+    # GET /api/exports/bookings?format=csv|ndjson&gzip=true + any filter of GET /api/bookings
+@exports_bp.route('/bookings', methods=["GET"], strict_slashes=False)
+@login_required
+@roles_required('admin')
+def export_bookings():
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify(message=f"Invalid format, allowed formats: {', '.join(EXPORT_FORMATS)}"), 400
+        compress = request.args.get('gzip', 'false').lower() in ('1', 'true', 'yes')
+        statement, error = export_statement(request.args)
+        if error:
+            return jsonify(message=error), 400
+
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"bookings.{extension}"
+        if compress:
+            mimetype, filename = 'application/gzip', filename + '.gz'
+        chunks = iter_export(
+            statement, export_format, compress,
+            current_app.config.get('EXPORT_BATCH_SIZE', 1000), current_app.json
+        )
+        response = Response(stream_with_context(chunks), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    except Exception as e:
+        print(f"Error exporting bookings: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# ---CLI: flask export-bookings -o bookings.csv.gz --gzip --filter status=completed---
+@click.command('export-bookings')
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--gzip', 'compress', is_flag=True, help="Compress the output with gzip.")
+@click.option('--output', '-o', type=click.File('wb'), default='-', help="Output file (default: standard output).")
+@click.option('--filter', 'filters', multiple=True, metavar='NAME=VALUE', help="Filter of GET /api/bookings, e.g. status=completed (repeatable).")
+@with_appcontext
+def export_bookings_command(export_format, compress, output, filters):
+    """Export bookings joined to users and training elements."""
+    args = MultiDict()
+    for item in filters:
+        name, separator, value = item.partition('=')
+        if not separator:
+            raise click.BadParameter(f"expected NAME=VALUE, got '{item}'", param_hint='--filter')
+        args.add(name, value)
+    statement, error = export_statement(args)
+    if error:
+        raise click.ClickException(error)
+    for chunk in iter_export(
+        statement, export_format, compress,
+        current_app.config.get('EXPORT_BATCH_SIZE', 1000), current_app.json
+    ):
+        output.write(chunk)
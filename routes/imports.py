@@ -0,0 +1,266 @@
+import csv
+import io
+from itertools import islice
+
+import click
+from flask import Blueprint, request, jsonify, current_app
+from flask.cli import with_appcontext
+from flask_login import login_required, current_user
+
+from app.extensions import db
+from app.models import Booking, TrainingElement, User
+from app.interval_index import booking_index
+from app.booking_locks import booking_locks
+from itls.decorators import roles_required
+from routes.bookings import parse_bulk_booking_item, load_busy_intervals, reserve_slot, booking_people
+
+imports_bp = Blueprint("imports_bp", __name__)
+# ----Overall----
+# CSV import of bookings and training elements (HR training plans), as an admin endpoint and as CLI commands
+# The file is parsed as a stream and handled CSV_IMPORT_CHUNK_SIZE rows at a time:
+#   - users (by email) and training elements (by name) of a chunk are resolved with one IN query each,
+#   - rows are validated like POST /api/bookings/bulk and conflict-checked with one range query per chunk,
+#   - accepted rows are written with one bulk INSERT and committed per chunk.
+# Only one chunk is ever held in memory, so memory stays flat whatever the file size.
+# Rejected rows are reported with their line number (the endpoint returns the first CSV_IMPORT_MAX_ERRORS of them).
+#
+# Bookings CSV columns:          training_element, instructor_email, student_email, start_time, end_time[, status, notes]
+# Training elements CSV columns: name, duration_minutes, session_type[, description, material_link]
+
+SESSION_TYPES = ['classroom', 'hands_on', 'e_learning', 'assessment']
+
+# Supporting function: consecutive chunks of (line number, row) from a csv.DictReader
+def read_chunks(reader, chunk_size):
+    rows = ((reader.line_num, row) for row in reader)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+# Supporting function: stripped cell, '' for missing ones
+def cell(row, name):
+    return (row.get(name) or '').strip()
+
+# Supporting function: import every booking row of 'reader'
+    # 'user' creates the bookings (same rules as the bulk endpoint), on_error(line, code, message) gets each rejected row
+    # dry_run: everything is checked, flushed so later chunks see earlier ones, and rolled back at the end
+    # Returns (rows read, bookings created)
+def import_booking_rows(reader, user, on_error, chunk_size, dry_run=False):
+    rows_read = 0
+    created = 0
+    missing_columns = {'training_element', 'instructor_email', 'student_email', 'start_time', 'end_time'} - set(reader.fieldnames or [])
+    if missing_columns:
+        on_error(1, 400, f"Missing columns: {', '.join(sorted(missing_columns))}")
+        return 0, 0
+    for chunk in read_chunks(reader, chunk_size):
+        rows_read += len(chunk)
+        # ---Resolve names and emails of the chunk with IN queries---
+        element_names = {cell(row, 'training_element') for _, row in chunk}
+        emails = {cell(row, key) for _, row in chunk for key in ('instructor_email', 'student_email')}
+        element_ids = dict(db.session.query(TrainingElement.name, TrainingElement.id).filter(TrainingElement.name.in_(element_names)).all())
+        users = {email: (user_id, role) for email, user_id, role in db.session.query(User.email, User.id, User.role).filter(User.email.in_(emails))}
+
+        # ---Validate each row---
+        valid = []
+        for line, row in chunk:
+            instructor = users.get(cell(row, 'instructor_email'))
+            student = users.get(cell(row, 'student_email'))
+            if cell(row, 'training_element') not in element_ids:
+                on_error(line, 400, f"Training element '{cell(row, 'training_element')}' not found")
+            elif instructor is None or instructor[1] != 'instructor':
+                on_error(line, 400, f"Instructor '{cell(row, 'instructor_email')}' not found or is not an instructor")
+            elif student is None or student[1] != 'student':
+                on_error(line, 400, f"Student '{cell(row, 'student_email')}' not found or is not a student")
+            else:
+                fields, error = parse_bulk_booking_item({
+                    'training_element_id': element_ids[cell(row, 'training_element')],
+                    'instructor_id': instructor[0],
+                    'student_id': student[0],
+                    'start_time': cell(row, 'start_time'),
+                    'end_time': cell(row, 'end_time'),
+                    'status': cell(row, 'status') or 'pending',
+                    'notes': cell(row, 'notes') or None,
+                }, user)
+                if error:
+                    on_error(line, *error)
+                else:
+                    valid.append((line, fields))
+
+        # Everyone in the chunk stays locked from the conflict check to the commit (app/booking_locks.py)
+        with booking_locks.hold(booking_people([fields for _, fields in valid])):
+            # ---Conflict check against the database and the rows accepted so far in this chunk---
+            busy = load_busy_intervals([fields for _, fields in valid])
+            accepted = []
+            for line, fields in valid:
+                conflict = reserve_slot(busy, fields)
+                if conflict:
+                    on_error(line, *conflict)
+                else:
+                    accepted.append(dict(fields, created_by_user_id=user.id))
+
+            # ---One bulk INSERT per chunk---
+            if accepted:
+                db.session.execute(db.insert(Booking), accepted)
+                created += len(accepted)
+                if dry_run:
+                    db.session.flush()
+                else:
+                    db.session.commit()
+                # Bulk statements skip the ORM events the interval index listens to
+                for fields in accepted:
+                    booking_index.invalidate('instructor', fields['instructor_id'])
+                    booking_index.invalidate('student', fields['student_id'])
+    if dry_run:
+        db.session.rollback()
+    return rows_read, created
+
+# Supporting function: import every training element row of 'reader', names already in use are rejected
+    # Returns (rows read, training elements created)
+def import_training_element_rows(reader, on_error, chunk_size, dry_run=False):
+    rows_read = 0
+    created = 0
+    missing_columns = {'name', 'duration_minutes', 'session_type'} - set(reader.fieldnames or [])
+    if missing_columns:
+        on_error(1, 400, f"Missing columns: {', '.join(sorted(missing_columns))}")
+        return 0, 0
+    for chunk in read_chunks(reader, chunk_size):
+        rows_read += len(chunk)
+        names = {cell(row, 'name') for _, row in chunk}
+        taken = {name for (name,) in db.session.query(TrainingElement.name).filter(TrainingElement.name.in_(names))}
+        accepted = []
+        for line, row in chunk:
+            name = cell(row, 'name')
+            if not name:
+                on_error(line, 400, "Missing required fields: name")
+                continue
+            if name in taken:
+                on_error(line, 409, f"Training element '{name}' already exists")
+                continue
+            try:
+                duration_minutes = int(cell(row, 'duration_minutes'))
+            except ValueError:
+                on_error(line, 400, "duration_minutes must be a positive integer")
+                continue
+            if duration_minutes <= 0:
+                on_error(line, 400, "duration_minutes must be a positive integer")
+                continue
+            if cell(row, 'session_type') not in SESSION_TYPES:
+                on_error(line, 400, f"session type is invalid, allowed types: {', '.join(SESSION_TYPES)}")
+                continue
+            taken.add(name) # duplicates inside the file
+            accepted.append({
+                'name': name,
+                'description': cell(row, 'description') or None,
+                'duration_minutes': duration_minutes,
+                'session_type': cell(row, 'session_type'),
+                'material_link': cell(row, 'material_link') or None,
+            })
+        if accepted:
+            db.session.execute(db.insert(TrainingElement), accepted)
+            created += len(accepted)
+            if dry_run:
+                db.session.flush()
+            else:
+                db.session.commit()
+    if dry_run:
+        db.session.rollback()
+    return rows_read, created
+
+# Supporting function: text stream of the uploaded CSV, a multipart 'file' field or the raw request body (text/csv)
+def request_csv_reader():
+    stream = request.files['file'].stream if 'file' in request.files else request.stream
+    return csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+
+# Supporting function: run an import for the endpoint and build its response
+def run_import(importer, *args):
+    dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+    max_errors = current_app.config.get('CSV_IMPORT_MAX_ERRORS', 1000)
+    chunk_size = current_app.config.get('CSV_IMPORT_CHUNK_SIZE', 1000)
+    errors = []
+    error_count = 0
+
+    def on_error(line, code, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < max_errors:
+            errors.append({'line': line, 'code': code, 'message': message})
+
+    try:
+        rows_read, created = importer(request_csv_reader(), *args, on_error, chunk_size, dry_run)
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        return jsonify(message=f"Unreadable CSV file: {e}"), 400
+    if created == rows_read and not error_count:
+        status_code = 200 if dry_run else 201
+    elif created:
+        status_code = 207
+    else:
+        status_code = 400
+    return jsonify(
+        message=f"{created} of {rows_read} rows imported" + (" (dry run, nothing saved)" if dry_run else ""),
+        dry_run=dry_run,
+        rows=rows_read,
+        created=created,
+        error_count=error_count,
+        errors=errors,
+        errors_truncated=error_count > len(errors)
+    ), status_code
+
+# Import bookings from CSV
+    # POST /api/imports/bookings[?dry_run=true], body: text/csv or multipart with a 'file' field
+@imports_bp.route('/bookings', methods=["POST"], strict_slashes=False)
+@login_required
+@roles_required('admin')
+def import_bookings():
+    try:
+        return run_import(import_booking_rows, current_user._get_current_object())
+    except Exception as e:
+        print(f"Error importing bookings: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Import training elements from CSV
+    # POST /api/imports/training_elements[?dry_run=true]
+@imports_bp.route('/training_elements', methods=["POST"], strict_slashes=False)
+@login_required
+@roles_required('admin')
+def import_training_elements():
+    try:
+        return run_import(import_training_element_rows)
+    except Exception as e:
+        print(f"Error importing training elements: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# ---CLI: flask import-bookings plan.csv --created-by admin@example.com / flask import-training-elements elements.csv---
+def print_error(line, code, message):
+    click.echo(f"line {line}: [{code}] {message}", err=True)
+
+@click.command('import-bookings')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--created-by', required=True, help="Email of the admin or instructor recorded as creator.")
+@click.option('--chunk-size', type=int, default=None, help="Rows per batch (default CSV_IMPORT_CHUNK_SIZE).")
+@click.option('--dry-run', is_flag=True, help="Check every row without saving anything.")
+@with_appcontext
+def import_bookings_command(csv_file, created_by, chunk_size, dry_run):
+    """Import bookings from a CSV file."""
+    user = User.query.filter_by(email=created_by).first()
+    if user is None or user.role not in ('admin', 'instructor'):
+        raise click.ClickException(f"{created_by} is not an admin or instructor")
+    rows_read, created = import_booking_rows(
+        csv.DictReader(csv_file), user, print_error, chunk_size or current_app.config.get('CSV_IMPORT_CHUNK_SIZE', 1000), dry_run
+    )
+    click.echo(f"{created} of {rows_read} rows imported" + (" (dry run, nothing saved)" if dry_run else ""))
+
+@click.command('import-training-elements')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--chunk-size', type=int, default=None, help="Rows per batch (default CSV_IMPORT_CHUNK_SIZE).")
+@click.option('--dry-run', is_flag=True, help="Check every row without saving anything.")
+@with_appcontext
+def import_training_elements_command(csv_file, chunk_size, dry_run):
+    """Import training elements from a CSV file."""
+    rows_read, created = import_training_element_rows(
+        csv.DictReader(csv_file), print_error, chunk_size or current_app.config.get('CSV_IMPORT_CHUNK_SIZE', 1000), dry_run
+    )
+    click.echo(f"{created} of {rows_read} rows imported" + (" (dry run, nothing saved)" if dry_run else ""))
@@ -0,0 +1,263 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from datetime import date, time, timedelta
+
+from app.extensions import db
+from app.models import ArchivedBooking, Booking, BookingDailySummary, TrainingElement, User
+from app.report_cache import report_cache
+from app.archive import reaches_archive
+from itls.decorators import roles_required
+from routes.availability import parse_date_or_datetime, parse_weekdays, working_windows
+
+reports_bp = Blueprint("reports_bp", __name__)
+# ----Overall----
+# Workload / utilization reports for admins (daily summary also for instructors), computed by the database instead of a spreadsheet export
+# One GROUP BY query returns (instructor, day, status) -> count, minutes; the reports roll those rows up
+# per week or per instructor.  Whole-day ranges read the booking_daily_summary table (O(days) rows),
+# others group bookings joined to training_elements.duration_minutes.
+# Results are cached per (report, range, parameters) in app/report_cache.py,
+# booking writes inside the range drop the entry.
+
+BOOKING_STATUSES = ('pending', 'confirmed', 'completed', 'cancelled')
+
+# Supporting function for parsing the common parameters: from, to (required) and instructor_ids (optional)
+    # Returns (range_start, range_end, instructor_ids or None, None) or (None, None, None, error response)
+def parse_report_range():
+    from_str = request.args.get('from')
+    to_str = request.args.get('to')
+    if not from_str or not to_str:
+        return None, None, None, (jsonify(message="Missing required parameters: from, to"), 400)
+    try:
+        range_start = parse_date_or_datetime(from_str)
+        range_end = parse_date_or_datetime(to_str)
+    except ValueError:
+        return None, None, None, (jsonify(message="Invalid datetime format. Use ISO 8601 (e.g., 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SSZ')"), 400)
+    if range_end <= range_start:
+        return None, None, None, (jsonify(message="'to' must be after 'from'"), 400)
+    max_days = current_app.config.get('REPORT_MAX_DAYS', 366)
+    if range_end - range_start > timedelta(days=max_days):
+        return None, None, None, (jsonify(message=f"The date range can span at most {max_days} days"), 400)
+    instructor_ids = None
+    raw_ids = request.args.get('instructor_ids')
+    if raw_ids:
+        try:
+            instructor_ids = tuple(sorted({int(value) for value in raw_ids.split(',') if value != ''}))
+        except ValueError:
+            return None, None, None, (jsonify(message="instructor_ids must be a comma separated list of integers"), 400)
+    return range_start, range_end, instructor_ids, None
+
+# Supporting function: True when both ends of the range are midnights, i.e. the summary table can answer
+def is_whole_days(range_start, range_end):
+    return range_start.time() == time.min and range_end.time() == time.min
+
+# Supporting function: the aggregate query
+    # Bookings starting in [range_start, range_end) grouped by instructor, day and status
+    # Returns a list of (instructor_id, day (date), status, count, minutes)
+def daily_instructor_totals(range_start, range_end, instructor_ids=None):
+    if is_whole_days(range_start, range_end):
+        query = db.session.query(
+            BookingDailySummary.instructor_id, BookingDailySummary.day, BookingDailySummary.status,
+            db.func.sum(BookingDailySummary.booking_count), db.func.sum(BookingDailySummary.minutes)
+        ).filter(
+            BookingDailySummary.instructor_id != 0,
+            BookingDailySummary.day >= range_start.date(),
+            BookingDailySummary.day < range_end.date()
+        )
+        if instructor_ids is not None:
+            query = query.filter(BookingDailySummary.instructor_id.in_(instructor_ids))
+        rows = query.group_by(BookingDailySummary.instructor_id, BookingDailySummary.day, BookingDailySummary.status).all()
+        return [(instructor_id, day, status, count, minutes or 0) for instructor_id, day, status, count, minutes in rows]
+
+    # Archived bookings still count when the range starts before the archive horizon (app/archive.py)
+    models = [Booking, ArchivedBooking] if reaches_archive(range_start) else [Booking]
+    statements = []
+    for model in models:
+        statement = db.select(model.instructor_id, model.start_time, model.status, model.training_element_id).where(
+            model.instructor_id.isnot(None),
+            model.start_time >= range_start,
+            model.start_time < range_end
+        )
+        if instructor_ids is not None:
+            statement = statement.where(model.instructor_id.in_(instructor_ids))
+        statements.append(statement)
+    bookings = (statements[0] if len(statements) == 1 else db.union_all(*statements)).subquery()
+    day = db.func.date(bookings.c.start_time)
+    rows = db.session.query(
+        bookings.c.instructor_id, day, bookings.c.status,
+        db.func.count(), db.func.sum(TrainingElement.duration_minutes)
+    ).join(TrainingElement, bookings.c.training_element_id == TrainingElement.id).group_by(
+        bookings.c.instructor_id, day, bookings.c.status
+    ).all()
+    # SQLite returns date() as text, PostgreSQL as a date
+    return [
+        (instructor_id, value if isinstance(value, date) else date.fromisoformat(value), status, count, minutes or 0)
+        for instructor_id, value, status, count, minutes in rows
+    ]
+
+# Supporting function: empty counters of one report bucket
+def new_totals():
+    return {'counts': {status: 0 for status in BOOKING_STATUSES}, 'bookedMinutes': 0, 'completedMinutes': 0, 'cancelledMinutes': 0}
+
+# Supporting function: add one aggregate row to a bucket
+    # booked = every status but cancelled
+def add_to_totals(totals, status, count, minutes):
+    totals['counts'][status] += count
+    if status == 'cancelled':
+        totals['cancelledMinutes'] += minutes
+    else:
+        totals['bookedMinutes'] += minutes
+    if status == 'completed':
+        totals['completedMinutes'] += minutes
+
+# Supporting function: names of the instructors in a report, one IN query (not cached, names can change)
+def instructor_names(instructor_ids):
+    if not instructor_ids:
+        return {}
+    rows = db.session.query(User.id, User.first_name, User.last_name).filter(User.id.in_(instructor_ids)).all()
+    return {user_id: (first_name, last_name) for user_id, first_name, last_name in rows}
+
+# Instructor workload per week
+    # GET /api/reports/instructor-workload?from=2025-07-01&to=2025-10-01[&instructor_ids=2,5]
+    # Weeks start on Monday; hours taught = completed bookings, booked = every status but cancelled
+@reports_bp.route('/instructor-workload', methods=["GET"], strict_slashes=False)
+@login_required
+@roles_required('admin')
+def get_instructor_workload():
+    try:
+        range_start, range_end, instructor_ids, error = parse_report_range()
+        if error:
+            return error
+
+        def compute():
+            weeks_by_instructor = {}
+            for instructor_id, day, status, count, minutes in daily_instructor_totals(range_start, range_end, instructor_ids):
+                week_start = day - timedelta(days=day.weekday())
+                weeks = weeks_by_instructor.setdefault(instructor_id, {})
+                add_to_totals(weeks.setdefault(week_start, new_totals()), status, count, minutes)
+            return weeks_by_instructor
+
+        weeks_by_instructor = report_cache.get_or_compute('instructor-workload', range_start, range_end, (instructor_ids,), compute)
+        names = instructor_names(weeks_by_instructor.keys())
+        result = []
+        for instructor_id in sorted(weeks_by_instructor):
+            first_name, last_name = names.get(instructor_id, (None, None))
+            weeks = []
+            for week_start, totals in sorted(weeks_by_instructor[instructor_id].items()):
+                weeks.append({
+                    'weekStart': week_start,
+                    **totals,
+                    'hoursTaught': round(totals['completedMinutes'] / 60, 2),
+                    'hoursBooked': round(totals['bookedMinutes'] / 60, 2)
+                })
+            result.append({'instructorId': instructor_id, 'instructorFirstName': first_name, 'instructorLastName': last_name, 'weeks': weeks})
+        return jsonify({'from': range_start, 'to': range_end, 'instructors': result}), 200
+    except Exception as e:
+        print(f"Error computing instructor workload: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Instructor utilization against working hours
+    # GET /api/reports/instructor-utilization?from=2025-07-01&to=2025-08-01[&instructor_ids=2,5]
+    # Optional: work_start/work_end (HH:MM, default 08:00-17:00), weekdays (default 0,1,2,3,4) as in /api/availability
+    # utilization = booked minutes / working minutes in the range, completedUtilization the same for completed bookings
+@reports_bp.route('/instructor-utilization', methods=["GET"], strict_slashes=False)
+@login_required
+@roles_required('admin')
+def get_instructor_utilization():
+    try:
+        range_start, range_end, instructor_ids, error = parse_report_range()
+        if error:
+            return error
+        try:
+            work_start = time.fromisoformat(request.args.get('work_start', '08:00'))
+            work_end = time.fromisoformat(request.args.get('work_end', '17:00'))
+            weekdays = tuple(sorted(parse_weekdays(request.args.get('weekdays', '0,1,2,3,4'))))
+        except ValueError:
+            return jsonify(message="Invalid work_start/work_end (HH:MM) or weekdays (comma separated 0..6)"), 400
+        if work_end <= work_start:
+            return jsonify(message="work_end must be after work_start"), 400
+        windows = working_windows(range_start, range_end, work_start, work_end, set(weekdays))
+        working_minutes = int(sum((end - start for start, end in windows), timedelta()).total_seconds() // 60)
+
+        def compute():
+            totals_by_instructor = {}
+            for instructor_id, day, status, count, minutes in daily_instructor_totals(range_start, range_end, instructor_ids):
+                add_to_totals(totals_by_instructor.setdefault(instructor_id, new_totals()), status, count, minutes)
+            return totals_by_instructor
+
+        totals_by_instructor = report_cache.get_or_compute(
+            'instructor-utilization', range_start, range_end, (instructor_ids, work_start, work_end, weekdays), compute
+        )
+        # Every instructor is listed, an idle one at 0
+        instructor_query = db.session.query(User.id, User.first_name, User.last_name).filter(User.role == 'instructor')
+        if instructor_ids is not None:
+            instructor_query = instructor_query.filter(User.id.in_(instructor_ids))
+        result = []
+        for instructor_id, first_name, last_name in instructor_query.order_by(User.id).all():
+            totals = totals_by_instructor.get(instructor_id) or new_totals()
+            result.append({
+                'instructorId': instructor_id,
+                'instructorFirstName': first_name,
+                'instructorLastName': last_name,
+                **totals,
+                'utilization': round(totals['bookedMinutes'] / working_minutes, 4) if working_minutes else None,
+                'completedUtilization': round(totals['completedMinutes'] / working_minutes, 4) if working_minutes else None
+            })
+        return jsonify({'from': range_start, 'to': range_end, 'workingMinutes': working_minutes, 'instructors': result}), 200
+    except Exception as e:
+        print(f"Error computing instructor utilization: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Daily booking counts for dashboards
+    # GET /api/reports/daily-summary?from=2025-07-01&to=2025-08-01[&instructor_ids=2,5][&training_element_ids=1,3]
+    # Whole days [from, to) by start date, read from booking_daily_summary: cost grows with days, not bookings
+    # Instructors only see their own bookings
+@reports_bp.route('/daily-summary', methods=["GET"], strict_slashes=False)
+@login_required
+@roles_required('admin', 'instructor')
+def get_daily_summary():
+    try:
+        range_start, range_end, instructor_ids, error = parse_report_range()
+        if error:
+            return error
+        if not is_whole_days(range_start, range_end):
+            return jsonify(message="from and to must be dates (YYYY-MM-DD)"), 400
+        if current_user.role == 'instructor':
+            instructor_ids = (current_user.id,)
+        training_element_ids = None
+        raw_ids = request.args.get('training_element_ids')
+        if raw_ids:
+            try:
+                training_element_ids = {int(value) for value in raw_ids.split(',') if value != ''}
+            except ValueError:
+                return jsonify(message="training_element_ids must be a comma separated list of integers"), 400
+
+        query = db.session.query(
+            BookingDailySummary.day, BookingDailySummary.status,
+            db.func.sum(BookingDailySummary.booking_count), db.func.sum(BookingDailySummary.minutes)
+        ).filter(
+            BookingDailySummary.day >= range_start.date(),
+            BookingDailySummary.day < range_end.date()
+        )
+        if instructor_ids is not None:
+            query = query.filter(BookingDailySummary.instructor_id.in_(instructor_ids))
+        if training_element_ids is not None:
+            query = query.filter(BookingDailySummary.training_element_id.in_(training_element_ids))
+        rows = query.group_by(BookingDailySummary.day, BookingDailySummary.status).order_by(BookingDailySummary.day).all()
+
+        days = {}
+        totals = new_totals()
+        for day, status, count, minutes in rows:
+            add_to_totals(days.setdefault(day, new_totals()), status, count, minutes or 0)
+            add_to_totals(totals, status, count, minutes or 0)
+        return jsonify({
+            'from': range_start.date(),
+            'to': range_end.date(),
+            'days': [{'day': day, **day_totals} for day, day_totals in days.items()],
+            'totals': totals
+        }), 200
+    except Exception as e:
+        print(f"Error fetching daily summary: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
@@ -0,0 +1,155 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from datetime import time, timedelta
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Booking, TrainingElement, User
+from app.interval_index import booking_index, IntervalSet
+from app.booking_locks import booking_locks, is_booking_conflict
+from app.scheduler import build_slots, auto_schedule
+from itls.decorators import roles_required
+from routes.availability import parse_date_or_datetime, working_windows
+
+scheduler_bp = Blueprint("scheduler_bp", __name__)
+# ----Overall----
+# Batch auto-scheduler for admins: place a list of students with a pool of instructors for one training element
+# Loads everybody's busy time with one range query, runs the in-memory engine (app/scheduler.py)
+# and persists the whole plan with one bulk INSERT, or only returns it with "dry_run": true.
+
+# Auto-schedule students
+    # Body: {training_element_id, student_ids: [...], instructor_ids: [...], from, to,
+    #        work_start?: "08:00", work_end?: "17:00", weekdays?: [0..4], status?: "pending", dry_run?: false}
+    # Students that already have a (not cancelled) booking for the element are skipped
+    # from/to spans at most AVAILABILITY_MAX_DAYS, like the free-slot finder: every slot of the window is built in memory
+@scheduler_bp.route('/auto', methods=["POST"], strict_slashes=False)
+@login_required
+@roles_required('admin')
+def auto_schedule_students():
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify(message="No input data provided"), 400
+        missing_fields = [field for field in ('training_element_id', 'student_ids', 'instructor_ids', 'from', 'to') if not data.get(field)]
+        if missing_fields:
+            return jsonify(message=f"Missing required fields: {', '.join(missing_fields)}"), 400
+
+        try:
+            training_element_id = int(data['training_element_id'])
+            student_ids = list(dict.fromkeys(int(value) for value in data['student_ids'])) # dedupe, keep priority order
+            instructor_ids = sorted({int(value) for value in data['instructor_ids']})
+        except (ValueError, TypeError):
+            return jsonify(message="training_element_id, student_ids and instructor_ids must be integers"), 400
+        max_students = current_app.config.get('AUTO_SCHEDULE_MAX_STUDENTS', 5000)
+        if len(student_ids) > max_students:
+            return jsonify(message=f"At most {max_students} students can be scheduled in one run"), 400
+
+        try:
+            range_start = parse_date_or_datetime(data['from'])
+            range_end = parse_date_or_datetime(data['to'])
+            work_start = time.fromisoformat(data.get('work_start', '08:00'))
+            work_end = time.fromisoformat(data.get('work_end', '17:00'))
+        except (ValueError, TypeError, AttributeError):
+            return jsonify(message="Invalid from/to (ISO 8601) or work_start/work_end (HH:MM)"), 400
+        if range_end <= range_start or work_end <= work_start:
+            return jsonify(message="'to' must be after 'from' and work_end after work_start"), 400
+        max_days = current_app.config.get('AVAILABILITY_MAX_DAYS', 92)
+        if range_end - range_start > timedelta(days=max_days):
+            return jsonify(message=f"The date range can span at most {max_days} days"), 400
+        weekdays = data.get('weekdays', [0, 1, 2, 3, 4])
+        # type() rather than isinstance(): JSON true/false are bools, a subclass of int
+        if not isinstance(weekdays, list) or not all(type(day) is int and 0 <= day <= 6 for day in weekdays):
+            return jsonify(message="weekdays must be a list of integers 0 (Monday) to 6 (Sunday)"), 400
+        weekdays = set(weekdays)
+        status = data.get('status', 'pending')
+        allowed_status = ['pending', 'confirmed']
+        if status not in allowed_status:
+            return jsonify(message=f"invalid status, allowed status: {allowed_status}"), 400
+        dry_run = bool(data.get('dry_run', False))
+
+        training_element = TrainingElement.query.get(training_element_id)
+        if not training_element:
+            return jsonify(message=f"Training element with ID: {training_element_id} not found"), 400
+
+        # ---Resolve people with IN queries---
+        roles = dict(db.session.query(User.id, User.role).filter(User.id.in_(set(student_ids) | set(instructor_ids))).all())
+        invalid_instructors = [instructor_id for instructor_id in instructor_ids if roles.get(instructor_id) != 'instructor']
+        if invalid_instructors:
+            return jsonify(message=f"Not instructors: {invalid_instructors}"), 400
+        invalid_students = [student_id for student_id in student_ids if roles.get(student_id) != 'student']
+        if invalid_students:
+            return jsonify(message=f"Not students: {invalid_students}"), 400
+
+        # Only pending students: skip those already booked on this element
+        already_booked = {row.student_id for row in db.session.query(Booking.student_id).filter(
+            Booking.training_element_id == training_element_id,
+            Booking.student_id.in_(student_ids),
+            Booking.status != 'cancelled'
+        )}
+        pending_students = [student_id for student_id in student_ids if student_id not in already_booked]
+
+        # Everyone involved stays locked from reading their busy time to the commit (app/booking_locks.py),
+        # a dry run writes nothing and locks nobody
+        people = [] if dry_run else [('instructor', instructor_id) for instructor_id in instructor_ids] + [('student', student_id) for student_id in pending_students]
+        with booking_locks.hold(people):
+            # ---Busy time of everyone involved in one range query---
+            instructor_busy = {}
+            student_busy = {}
+            rows = db.session.query(Booking.instructor_id, Booking.student_id, Booking.start_time, Booking.end_time).filter(
+                db.or_(Booking.instructor_id.in_(instructor_ids), Booking.student_id.in_(pending_students)),
+                Booking.start_time < range_end,
+                Booking.end_time > range_start
+            ).all()
+            instructor_set = set(instructor_ids)
+            pending_set = set(pending_students)
+            for row in rows:
+                if row.instructor_id in instructor_set:
+                    instructor_busy.setdefault(row.instructor_id, []).append((row.start_time, row.end_time))
+                if row.student_id in pending_set:
+                    student_busy.setdefault(row.student_id, []).append((row.start_time, row.end_time))
+            instructor_busy = {key: IntervalSet(value) for key, value in instructor_busy.items()}
+            student_busy = {key: IntervalSet(value) for key, value in student_busy.items()}
+
+            slots = build_slots(working_windows(range_start, range_end, work_start, work_end, weekdays), training_element.duration_minutes)
+            assignments, unassigned = auto_schedule(pending_students, instructor_ids, slots, instructor_busy, student_busy)
+
+            if assignments and not dry_run:
+                # One bulk INSERT for the whole plan, it bypasses the ORM events so refresh the interval index by hand
+                db.session.execute(db.insert(Booking), [
+                    {
+                        'training_element_id': training_element_id,
+                        'instructor_id': instructor_id,
+                        'student_id': student_id,
+                        'start_time': start_time,
+                        'end_time': end_time,
+                        'status': status,
+                        'created_by_user_id': current_user.id,
+                    }
+                    for student_id, instructor_id, start_time, end_time in assignments
+                ])
+                db.session.commit()
+                for student_id, instructor_id, _, _ in assignments:
+                    booking_index.invalidate('student', student_id)
+                for instructor_id in instructor_ids:
+                    booking_index.invalidate('instructor', instructor_id)
+
+        return jsonify(
+            message=f"{len(assignments)} of {len(pending_students)} pending students scheduled" + (" (dry run, nothing saved)" if dry_run else ""),
+            dry_run=dry_run,
+            assignments=[
+                {'studentId': student_id, 'instructorId': instructor_id, 'startTime': start_time.isoformat(), 'endTime': end_time.isoformat()}
+                for student_id, instructor_id, start_time, end_time in assignments
+            ],
+            unassigned=unassigned,
+            already_booked=sorted(already_booked)
+        ), (200 if dry_run else 201)
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify(message="Some of these people were booked concurrently, nothing was scheduled. Please retry."), 409
+        print(f"Error auto-scheduling: {e}")
+        return jsonify(message="Internal server error", error=str(e)), 500
+    except Exception as e:
+        print(f"Error auto-scheduling: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
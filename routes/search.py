@@ -0,0 +1,42 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+
+from app.extensions import db
+from app.models import TrainingElement, User
+from app.search import matching_user_ids, matching_training_element_ids
+
+search_bp = Blueprint("search_bp", __name__)
+# ----Overall----
+# Typeahead search over training elements (any logged in user) and users (admin & instructor only,
+# same audience as GET /api/users), answered from the search index in app/search.py
+
+# GET /api/search?q=tpm&limit=10
+@search_bp.route('/', methods=["GET"], strict_slashes=False)
+@login_required
+def search():
+    try:
+        term = request.args.get('q', '').strip()
+        if not term:
+            return jsonify(message="Missing required parameter: q"), 400
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+
+        # Only the columns the dropdown needs, as row tuples
+        elements = db.session.query(TrainingElement.id, TrainingElement.name, TrainingElement.session_type).filter(
+            TrainingElement.id.in_(matching_training_element_ids(term, ('name', 'description')))
+        ).order_by(TrainingElement.name).limit(limit).all()
+        result = {
+            'trainingElements': [{'id': row.id, 'name': row.name, 'sessionType': row.session_type} for row in elements]
+        }
+        if current_user.role in ('admin', 'instructor'):
+            users = db.session.query(User.id, User.first_name, User.last_name, User.email, User.role).filter(
+                User.id.in_(matching_user_ids(term, ('first_name', 'last_name', 'email')))
+            ).order_by(User.last_name, User.first_name).limit(limit).all()
+            result['users'] = [
+                {'id': row.id, 'firstName': row.first_name, 'lastName': row.last_name, 'email': row.email, 'role': row.role}
+                for row in users
+            ]
+        return jsonify(result), 200
+    except Exception as e:
+        print(f"Error searching: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
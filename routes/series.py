@@ -0,0 +1,346 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Booking, BookingSeries, TrainingElement, User
+from app.interval_index import booking_index, IntervalSet, to_naive
+from app.booking_locks import booking_locks, is_booking_conflict
+from itls.decorators import roles_required
+from routes.bookings import BOOKING_LOAD_OPTIONS, serialize_booking, parse_bulk_booking_item
+
+series_bp = Blueprint("series_bp", __name__)
+# ----Overall----
+# Recurring booking series (e.g. weekly "Machine TPM" refresher sessions)
+# A series is an RRULE-like spec on top of a booking template:
+    #   freq: 'daily' | 'weekly', interval: every N days/weeks, and either count (N occurrences) or until (last date)
+# Occurrences are expanded in bulk and stored as ordinary bookings with 'series_id' set,
+# so the calendar, conflict checks and every other booking endpoint keep working unchanged.
+# Only 'admin' and 'instructor' can create/edit/cancel a series, same rules as single bookings
+
+FREQUENCY_STEPS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+def serialize_series(series):
+    return {
+        'id': series.id,
+        'trainingElementId': series.training_element_id,
+        'instructorId': series.instructor_id,
+        'studentId': series.student_id,
+        'freq': series.freq,
+        'interval': series.interval,
+        'count': series.count,
+        'until': series.until,
+        'createdById': series.created_by_user_id,
+        'createdAt': series.created_at,
+        'updatedAt': series.updated_at
+    }
+
+# Supporting function: expand a recurrence into (start_time, end_time) pairs
+    # Every occurrence is first + k * step, computed for all k at once (no per-occurrence queries or rule evaluation)
+    # 'until' is a datetime, or a date for "up to and including that day"
+    # Raises ValueError for an invalid spec
+def expand_occurrences(start_time, end_time, freq, interval, count=None, until=None):
+    if freq not in FREQUENCY_STEPS:
+        raise ValueError(f"Invalid freq, allowed values: {', '.join(FREQUENCY_STEPS)}")
+    # type() rather than isinstance(): JSON true/false are bools, a subclass of int
+    if type(interval) is not int or interval < 1:
+        raise ValueError("interval must be a positive integer")
+    if (count is None) == (until is None):
+        raise ValueError("Provide exactly one of count or until")
+    step = FREQUENCY_STEPS[freq] * interval
+    if count is None:
+        if not isinstance(until, datetime):
+            until = datetime.combine(until, time.max)
+        if until < start_time:
+            raise ValueError("until must not be before start_time")
+        count = (until - start_time) // step + 1
+    if type(count) is not int or count < 1:
+        raise ValueError("count must be a positive integer")
+    max_occurrences = current_app.config.get('SERIES_MAX_OCCURRENCES', 500)
+    if count > max_occurrences:
+        raise ValueError(f"A series can have at most {max_occurrences} occurrences")
+    if end_time - start_time > step:
+        raise ValueError("Occurrences of a series must not overlap each other")
+    return [(start_time + k * step, end_time + k * step) for k in range(count)]
+
+# Supporting function: find which occurrences collide with existing bookings of the instructor or student
+    # One range query covering the whole series, then an in-memory sweep over merged busy intervals
+def find_series_conflicts(occurrences, instructor_id, student_id, exclude_series_id=None):
+    window_start = occurrences[0][0]
+    window_end = occurrences[-1][1]
+    query = db.session.query(Booking.instructor_id, Booking.student_id, Booking.start_time, Booking.end_time).filter(
+        db.or_(Booking.instructor_id == instructor_id, Booking.student_id == student_id),
+        Booking.start_time < window_end,
+        Booking.end_time > window_start
+    )
+    if exclude_series_id is not None:
+        # When re-assigning a series, its own occurrences must not count as conflicts
+        query = query.filter(db.or_(Booking.series_id.is_(None), Booking.series_id != exclude_series_id))
+    instructor_busy = []
+    student_busy = []
+    for row in query:
+        if row.instructor_id == instructor_id:
+            instructor_busy.append((row.start_time, row.end_time))
+        if row.student_id == student_id:
+            student_busy.append((row.start_time, row.end_time))
+    instructor_busy = IntervalSet(instructor_busy)
+    student_busy = IntervalSet(student_busy)
+
+    conflicts = []
+    for start_time, end_time in occurrences:
+        if instructor_busy.overlaps(start_time, end_time):
+            conflicts.append({'startTime': start_time.isoformat(), 'endTime': end_time.isoformat(), 'reason': 'instructor'})
+        elif student_busy.overlaps(start_time, end_time):
+            conflicts.append({'startTime': start_time.isoformat(), 'endTime': end_time.isoformat(), 'reason': 'student'})
+    return conflicts
+
+# Supporting function: bookings of a series from one occurrence onwards ("this and following")
+    # ?from_booking_id= selects the first occurrence affected, without it the whole series is affected
+    # Returns (query, None) or (None, error response)
+def following_occurrences_query(series):
+    query = Booking.query.filter(Booking.series_id == series.id)
+    from_booking_id = request.args.get('from_booking_id', type=int)
+    if from_booking_id is None and request.is_json:
+        from_booking_id = (request.get_json(silent=True) or {}).get('from_booking_id')
+    if from_booking_id is not None:
+        from_booking = Booking.query.get(from_booking_id)
+        if not from_booking or from_booking.series_id != series.id:
+            return None, (jsonify(message=f"Booking with ID: {from_booking_id} is not part of series {series.id}"), 400)
+        query = query.filter(Booking.start_time >= from_booking.start_time)
+    return query, None
+
+def check_series_access(series):
+    # Instructors can only modify series they created OR series they are assigned as instructor (same as bookings)
+    if current_user.role == 'instructor':
+        if series.created_by_user_id != current_user.id and series.instructor_id != current_user.id:
+            return jsonify(message="Access denied: Instructors can only modify series they created or are assigned to."), 403
+    return None
+
+# Create a new recurring series
+@series_bp.route('/', methods=["POST"], strict_slashes=False)
+@login_required
+@roles_required('admin', 'instructor')
+def create_series():
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify(message="No input data provided"), 400
+        recurrence = data.get('recurrence')
+        if not isinstance(recurrence, dict):
+            return jsonify(message="Missing required field: recurrence"), 400
+
+        # Validate the booking template exactly like a single booking
+        fields, error = parse_bulk_booking_item(data)
+        if error:
+            return jsonify(message=error[1]), error[0]
+        if not TrainingElement.query.get(fields['training_element_id']):
+            return jsonify(message=f"Training element with ID: {fields['training_element_id']} not found"), 400
+        instructor = User.query.get(fields['instructor_id'])
+        if not instructor or instructor.role != 'instructor':
+            return jsonify(message=f"Instructor with ID: {fields['instructor_id']} not found or is not an instructor"), 400
+        student = User.query.get(fields['student_id'])
+        if not student or student.role != 'student':
+            return jsonify(message=f"Student with ID: {fields['student_id']} not found or is not a student"), 400
+
+        freq = recurrence.get('freq')
+        interval = recurrence.get('interval', 1)
+        count = recurrence.get('count')
+        until = None
+        if recurrence.get('until'):
+            try:
+                until_str = recurrence['until']
+                # A date alone ('2025-07-31') is the last date of the series, its occurrence included
+                if len(until_str) == 10:
+                    until = date.fromisoformat(until_str)
+                else:
+                    until = to_naive(datetime.fromisoformat(until_str.replace('Z', '+00:00')))
+            except (ValueError, TypeError, AttributeError):
+                return jsonify(message="Invalid until format. Use ISO 8601."), 400
+        try:
+            occurrences = expand_occurrences(fields['start_time'], fields['end_time'], freq, interval, count, until)
+        except ValueError as e:
+            return jsonify(message=str(e)), 400
+
+        # The instructor and student stay locked from the conflict check to the commit (app/booking_locks.py)
+        with booking_locks.hold([('instructor', fields['instructor_id']), ('student', fields['student_id'])]):
+            conflicts = find_series_conflicts(occurrences, fields['instructor_id'], fields['student_id'])
+            if conflicts:
+                return jsonify(message=f"{len(conflicts)} occurrence(s) conflict with existing bookings", conflicts=conflicts), 409
+
+            series = BookingSeries(
+                training_element_id=fields['training_element_id'],
+                instructor_id=fields['instructor_id'],
+                student_id=fields['student_id'],
+                freq=freq,
+                interval=interval,
+                count=count,
+                until=until if until is None or isinstance(until, datetime) else datetime.combine(until, time.min),
+                created_by_user_id=current_user.id
+            )
+            db.session.add(series)
+            db.session.add_all([
+                Booking(
+                    series=series,
+                    training_element_id=fields['training_element_id'],
+                    instructor_id=fields['instructor_id'],
+                    student_id=fields['student_id'],
+                    start_time=start_time,
+                    end_time=end_time,
+                    status=fields['status'],
+                    notes=fields['notes'],
+                    created_by_user_id=current_user.id
+                )
+                for start_time, end_time in occurrences
+            ])
+            db.session.commit()
+
+        bookings = Booking.query.options(*BOOKING_LOAD_OPTIONS).filter(Booking.series_id == series.id).order_by(Booking.start_time).all()
+        return jsonify(message=f"Series created with {len(bookings)} occurrences", series=serialize_series(series), bookings=[serialize_booking(booking) for booking in bookings]), 201
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify(message="An occurrence was booked concurrently, the series was not created. Please retry."), 409
+        print(f"Error creating booking series: {e}")
+        return jsonify(message="Internal server error", error=str(e)), 500
+    except Exception as e:
+        print(f"Error creating booking series: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Retrieve a series with its occurrences
+@series_bp.route('/<int:series_id>', methods=["GET"], strict_slashes=False)
+@login_required
+def get_series_by_id(series_id):
+    try:
+        series = BookingSeries.query.get(series_id)
+        if not series:
+            return jsonify(message="Series not found"), 404
+        bookings = Booking.query.options(*BOOKING_LOAD_OPTIONS).filter(Booking.series_id == series_id).order_by(Booking.start_time).all()
+        return jsonify(series=serialize_series(series), bookings=[serialize_booking(booking) for booking in bookings]), 200
+    except Exception as e:
+        print(f"Error fetching booking series {series_id}: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Edit "this and following" occurrences with a single UPDATE
+    # Editable fields: status, notes, training_element_id, instructor_id, student_id
+    # Times are not editable here, move individual occurrences with PUT /api/bookings/<id>
+@series_bp.route('/<int:series_id>', methods=["PUT"], strict_slashes=False)
+@login_required
+@roles_required('admin', 'instructor')
+def update_series_by_id(series_id):
+    try:
+        series = BookingSeries.query.get(series_id)
+        if not series:
+            return jsonify(message="Series not found"), 404
+        denied = check_series_access(series)
+        if denied:
+            return denied
+        data = request.get_json()
+        if not data:
+            return jsonify(message="No input data found"), 400
+        query, error = following_occurrences_query(series)
+        if error:
+            return error
+
+        values = {}
+        if 'status' in data:
+            allowed_status = ['pending', 'confirmed', 'completed', 'cancelled']
+            if data['status'] not in allowed_status:
+                return jsonify(message=f"Invalid status, allowed status: {allowed_status}"), 400
+            values['status'] = data['status']
+        if 'notes' in data:
+            values['notes'] = data['notes']
+        try:
+            if data.get('training_element_id') is not None:
+                values['training_element_id'] = int(data['training_element_id'])
+                if not TrainingElement.query.get(values['training_element_id']):
+                    return jsonify(message=f"Training element with ID: {values['training_element_id']} not found"), 400
+            if data.get('instructor_id') is not None:
+                values['instructor_id'] = int(data['instructor_id'])
+                instructor = User.query.get(values['instructor_id'])
+                if not instructor or instructor.role != 'instructor':
+                    return jsonify(message=f"Instructor with ID: {values['instructor_id']} not found or is not an instructor"), 400
+                if current_user.role == 'instructor' and values['instructor_id'] != current_user.id:
+                    return jsonify(message="Instructors cannot change the assigned instructor to someone else."), 403
+            if data.get('student_id') is not None:
+                values['student_id'] = int(data['student_id'])
+                student = User.query.get(values['student_id'])
+                if not student or student.role != 'student':
+                    return jsonify(message=f"Student with ID: {values['student_id']} not found or is not a student"), 400
+        except (ValueError, TypeError):
+            return jsonify(message="training_element_id, instructor_id and student_id must be valid integers"), 400
+        if not values:
+            return jsonify(message="No editable fields provided"), 400
+
+        reassigned = 'instructor_id' in values or 'student_id' in values
+        affected = []
+        # Re-assigned people stay locked from the conflict check to the commit (app/booking_locks.py)
+        people = [('instructor', values.get('instructor_id')), ('student', values.get('student_id'))] if reassigned else []
+        with booking_locks.hold(people):
+            if reassigned:
+                # Re-assigning people: check the affected occurrences against the new people's bookings in one pass
+                affected = query.with_entities(Booking.start_time, Booking.end_time, Booking.instructor_id, Booking.student_id).order_by(Booking.start_time).all()
+                if affected:
+                    conflicts = find_series_conflicts(
+                        [(row.start_time, row.end_time) for row in affected],
+                        values.get('instructor_id', series.instructor_id),
+                        values.get('student_id', series.student_id),
+                        exclude_series_id=series.id
+                    )
+                    if conflicts:
+                        return jsonify(message=f"{len(conflicts)} occurrence(s) conflict with existing bookings", conflicts=conflicts), 409
+
+            values['updated_at'] = db.func.now()
+            updated = query.update(values, synchronize_session=False)
+            for key in ('training_element_id', 'instructor_id', 'student_id'):
+                if key in values:
+                    setattr(series, key, values[key])
+            series.updated_at = db.func.now()
+            db.session.commit()
+
+            if reassigned:
+                # Bulk UPDATEs bypass the interval index events, drop everyone whose bookings moved
+                # (still under the locks, so the next writer of these people reloads them)
+                moved = {('instructor', row.instructor_id) for row in affected} | {('student', row.student_id) for row in affected}
+                for kind, person_id in moved | set(people):
+                    if person_id is not None:
+                        booking_index.invalidate(kind, person_id)
+        return jsonify(message=f"{updated} occurrence(s) updated", updated=updated, series=serialize_series(series)), 200
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify(message="An occurrence conflicts with a booking made concurrently, nothing was updated. Please retry."), 409
+        print(f"Error updating booking series {series_id}: {e}")
+        return jsonify(message="Internal server error", error=str(e)), 500
+    except Exception as e:
+        print(f"Error updating booking series {series_id}: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
+
+# Cancel "this and following" occurrences with a single UPDATE (status -> 'cancelled', rows are kept)
+@series_bp.route('/<int:series_id>', methods=["DELETE"], strict_slashes=False)
+@login_required
+@roles_required('admin', 'instructor')
+def cancel_series_by_id(series_id):
+    try:
+        series = BookingSeries.query.get(series_id)
+        if not series:
+            return jsonify(message="Series not found"), 404
+        denied = check_series_access(series)
+        if denied:
+            return denied
+        query, error = following_occurrences_query(series)
+        if error:
+            return error
+        cancelled = query.update({'status': 'cancelled', 'updated_at': db.func.now()}, synchronize_session=False)
+        db.session.commit()
+        return jsonify(message=f"{cancelled} occurrence(s) cancelled", cancelled=cancelled), 200
+    except Exception as e:
+        print(f"Error cancelling booking series {series_id}: {e}")
+        db.session.rollback()
+        return jsonify(message="Internal server error", error=str(e)), 500
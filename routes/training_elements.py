@@ -3,7 +3,8 @@ from flask_login import login_required
 from flask_cors import cross_origin
 
 from app.extensions import db
-from itls.decorators import roles_required
+from itls.decorators import roles_required, conditional_get
+from itls.pagination import paginate_by_keyset
 from app.models import TrainingElement
 
 training_elements_bp = Blueprint("training_elements_bp",__name__)
@@ -25,19 +26,25 @@ def serialize_training_elements(training_element):
         'duration_minutes': training_element.duration_minutes, 
         'session_type': training_element.session_type, 
         'material_link': training_element.material_link, 
-        'created_at': training_element.created_at.isoformat() if training_element.created_at else None, 
-        'updated_at': training_element.updated_at.isoformat() if training_element.updated_at else None 
+        'created_at': training_element.created_at, 
+        'updated_at': training_element.updated_at 
     }
 
 
 # View training elements for all user
 @training_elements_bp.route('/', methods=["GET"], strict_slashes=False)
+@conditional_get('training_elements')
 def get_training_element():
     try:
-        training_elements = TrainingElement.query.all()
-        if not training_elements:
+        # Paginated by id, pass 'next_cursor' back as ?cursor= for the following page
+        cursor = request.args.get('cursor')
+        try:
+            training_elements, next_cursor = paginate_by_keyset(TrainingElement.query, (TrainingElement.id,), cursor)
+        except ValueError:
+            return jsonify(message="Invalid cursor"), 400
+        if not training_elements and not cursor:
             return jsonify(message="Training element not found"), 404
-        return jsonify([serialize_training_elements(element_obj) for element_obj in training_elements]), 200
+        return jsonify(training_elements=[serialize_training_elements(element_obj) for element_obj in training_elements], next_cursor=next_cursor), 200
     except Exception as e:
         db.session.rollback()
         print(f"Error fetching training elements:  {e}")
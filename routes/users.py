@@ -1,7 +1,10 @@
 from flask import Blueprint, jsonify, request
 from flask_login import login_required, current_user
-from app.extensions import db, bcrypt
-from itls.decorators import roles_required
+from app.extensions import db
+from app.passwords import PasswordHasherBusy
+from app.access_tokens import access_tokens
+from itls.decorators import roles_required, conditional_get
+from itls.pagination import paginate_by_keyset
 from app.models import User
 
 users_bp = Blueprint("users_bp", __name__)
@@ -20,21 +23,25 @@ def serialize_user(user):
         'firstName': user.first_name,
         'lastName': user.last_name,
         'role': user.role,
-        'createdAt': user.created_at.isoformat() if user.created_at else None,
-        'updatedAt': user.updated_at.isoformat() if user.updated_at else None
+        'createdAt': user.created_at,
+        'updatedAt': user.updated_at
     }
 # List all of user's detail (GET)
 @users_bp.route('/')
 @login_required # Requires user to login
 @roles_required('admin', 'instructor') # Requires 'admin' & 'instructor' role to access this route
+@conditional_get('users')
 def get_all_users():
     """
-    GET /api/users
-    Retrive all users.  Granted to Admin & Instructor role
+    GET /api/users?limit=&cursor=
+    Retrive all users page by page (ordered by id).  Granted to Admin & Instructor role
     """
     try:
-        users = User.query.all()
-        return jsonify([serialize_user(user_obj) for user_obj in users]), 200
+        try:
+            users, next_cursor = paginate_by_keyset(User.query, (User.id,), request.args.get('cursor'))
+        except ValueError:
+            return jsonify(message="Invalid cursor"), 400
+        return jsonify(users=[serialize_user(user_obj) for user_obj in users], next_cursor=next_cursor), 200
     except Exception as e:
         # discards all the staged changes and reverts the database to the state it was in before the transaction began.
         db.session.rollback()  # Ensure rollback on error
@@ -61,7 +68,7 @@ def get_user_by_id(user_id): # get_userinfo_by_id function receive 'user_id' as
         if not user:
             return jsonify(message="User not found"), 404
         # current_user proxy available after login_required passed
-        # current_user object represents the actual User model instance of the person who logged in
+        # current_user is a cached snapshot of the person who logged in (id, email, names, role), see app/user_cache.py
         if current_user.role != 'admin' and current_user.id != user_id:
             return jsonify(message="You can only view your own profile unless you are a admin"), 403
         
@@ -97,7 +104,9 @@ def update_user_by_id(user_id):
         if 'last_name' in data:
             user.last_name = data['last_name']
         if 'password' in data and data['password']:
-            user.password_hash = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+            user.set_password(data['password'])
+            # A new password also signs out every access token of the user (a role change does so by itself)
+            access_tokens.revoke_user(user)
         # Update user's info with 'admin' access
         if 'role' in data:
             if current_user.role != 'admin':
@@ -117,6 +126,10 @@ def update_user_by_id(user_id):
         db.session.commit()
         # Inform change status and visualize the latest info
         return jsonify(message="Updated successfully", user=serialize_user(user)), 200
+    except PasswordHasherBusy:
+        # Answered with a 503 + Retry-After by the error handler in app/__init__.py
+        db.session.rollback()
+        raise
     except Exception as e:
         # discards all the staged changes and reverts the database to the state it was in before the transaction began.
         db.session.rollback()
@@ -0,0 +1,102 @@
+# Finalproject/tests/conftest.py
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models import TrainingElement, User
+from app.interval_index import booking_index
+from app.report_cache import report_cache
+from app.user_cache import user_cache
+
+# Shared fixtures: an app on TestingConfig (in-memory SQLite, bcrypt cost 4) with a few users and one training
+# element, logged-in test clients, and a statement counter.
+#
+# The caches and the interval index are process-wide singletons keyed by row ids: they are emptied after each
+# test, otherwise the next test's fresh database would be answered from the previous one's rows.
+
+PASSWORD = 'password123'
+
+SEED_USERS = [
+    ('admin@example.com', 'admin'),
+    ('instructor@example.com', 'instructor'),
+    ('instructor2@example.com', 'instructor'),
+    ('student@example.com', 'student'),
+    ('student2@example.com', 'student'),
+]
+
+
+def build_app(config_object='config.TestingConfig'):
+    app = create_app(config_object)
+    with app.app_context():
+        db.create_all()
+        for email, role in SEED_USERS:
+            user = User(email=email, first_name=role.capitalize(), last_name=email.split('@')[0], role=role)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.add(TrainingElement(name='Machine TPM', description='Hands-on', duration_minutes=60, session_type='hands_on'))
+        db.session.commit()
+    return app
+
+
+def reset_caches():
+    booking_index.invalidate()
+    report_cache.invalidate()
+    user_cache.invalidate()
+
+
+@pytest.fixture
+def app():
+    app = build_app()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    reset_caches()
+
+
+@pytest.fixture
+def ids(app):
+    # {email: user id, ..., 'training_element': id}
+    with app.app_context():
+        ids = {user.email: user.id for user in User.query.all()}
+        ids['training_element'] = TrainingElement.query.first().id
+    return ids
+
+
+@pytest.fixture
+def login(app):
+    def login(email, password=PASSWORD):
+        client = app.test_client()
+        response = client.post('/api/auth/login', json={'email': email, 'password': password})
+        assert response.status_code == 200, response.get_json()
+        return client
+    return login
+
+
+class StatementCounter:
+    # Records every statement sent to the database while active: 'with StatementCounter(engine) as counter'
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_statements(app):
+    with app.app_context():
+        engine = db.engine
+    return lambda: StatementCounter(engine)
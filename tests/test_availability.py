@@ -0,0 +1,27 @@
+# Finalproject/tests/test_availability.py
+import pytest
+
+# GET /api/availability (routes/availability.py): request validation
+
+
+@pytest.mark.parametrize('weekdays', ['9', '-1', '0,7', 'mon'])
+def test_availability_rejects_weekdays_outside_0_to_6(login, weekdays):
+    client = login('admin@example.com')
+    response = client.get(f'/api/availability?from=2031-01-06&to=2031-01-13&duration_minutes=60&weekdays={weekdays}')
+    assert response.status_code == 400
+    assert 'weekdays' in response.get_json()['message']
+
+
+def test_availability_working_days_only(login):
+    client = login('admin@example.com')
+    response = client.get('/api/availability?from=2031-01-06&to=2031-01-13&duration_minutes=60&weekdays=0,6')
+    assert response.status_code == 200
+    for instructor in response.get_json()['instructors']:
+        # Monday 2031-01-06 and Sunday 2031-01-12, 08:00-17:00 free
+        assert [slot['startTime'][:10] for slot in instructor['freeSlots']] == ['2031-01-06', '2031-01-12']
+
+
+def test_utilization_report_rejects_weekdays_outside_0_to_6(login):
+    client = login('admin@example.com')
+    response = client.get('/api/reports/instructor-utilization?from=2031-01-06&to=2031-01-13&weekdays=9')
+    assert response.status_code == 400
@@ -0,0 +1,151 @@
+# Finalproject/tests/test_booking_changes.py
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import BookingChange
+from itls.pagination import encode_cursor
+
+# GET /api/bookings/changes (routes/bookings.py): delta sync from the booking_changes log (app/change_log.py)
+
+
+def booking_body(ids, day):
+    return {
+        'training_element_id': ids['training_element'],
+        'instructor_id': ids['instructor@example.com'],
+        'student_id': ids['student@example.com'],
+        'start_time': f'2031-01-{day:02d}T08:00:00Z',
+        'end_time': f'2031-01-{day:02d}T09:00:00Z',
+    }
+
+
+def create_booking(client, ids, day):
+    response = client.post('/api/bookings', json=booking_body(ids, day))
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['booking']['id']
+
+
+def test_changes_after_the_token(ids, login):
+    client = login('admin@example.com')
+    first_id = create_booking(client, ids, 6)
+    token = client.get('/api/bookings/changes').get_json()['next_token']
+
+    # Nothing happened since the token
+    response = client.get(f'/api/bookings/changes?since={token}').get_json()
+    assert response == {'bookings': [], 'deleted': [], 'next_token': token, 'has_more': False}
+
+    second_id = create_booking(client, ids, 7)
+    response = client.get(f'/api/bookings/changes?since={token}').get_json()
+    assert [booking['id'] for booking in response['bookings']] == [second_id]
+    assert response['deleted'] == []
+    assert response['next_token'] != token
+    assert first_id != second_id
+
+    # The new token has seen it all
+    response = client.get(f"/api/bookings/changes?since={response['next_token']}").get_json()
+    assert response['bookings'] == [] and response['deleted'] == []
+
+
+def test_deleted_booking_is_a_tombstone(ids, login):
+    client = login('admin@example.com')
+    kept_id = create_booking(client, ids, 6)
+    token = client.get('/api/bookings/changes').get_json()['next_token']
+    deleted_id = create_booking(client, ids, 7)
+    assert client.put(f'/api/bookings/{kept_id}', json={'notes': 'Bring gloves'}).status_code == 200
+    assert client.delete(f'/api/bookings/{deleted_id}').status_code == 204
+
+    response = client.get(f'/api/bookings/changes?since={token}').get_json()
+    # Created then deleted after the token: only its tombstone
+    assert [booking['id'] for booking in response['bookings']] == [kept_id]
+    assert response['deleted'] == [deleted_id]
+
+
+def test_has_more_pages_through_the_log(ids, login):
+    client = login('admin@example.com')
+    token = client.get('/api/bookings/changes').get_json()['next_token']
+    created = [create_booking(client, ids, day) for day in (6, 7, 8)]
+
+    seen = []
+    pages = 0
+    while True:
+        response = client.get(f'/api/bookings/changes?since={token}&limit=2').get_json()
+        seen += [booking['id'] for booking in response['bookings']]
+        token = response['next_token']
+        pages += 1
+        if not response['has_more']:
+            break
+    assert seen == created
+    assert pages == 2
+
+
+def test_invalid_token_is_rejected(login):
+    client = login('admin@example.com')
+    assert client.get('/api/bookings/changes?since=not-a-token').status_code == 400
+
+
+def test_token_older_than_the_retained_log_gets_410(app, ids, login):
+    client = login('admin@example.com')
+    token = client.get('/api/bookings/changes').get_json()['next_token']
+    for day in (6, 7, 8):
+        create_booking(client, ids, day)
+    with app.app_context():
+        # The first two changes fall out of retention
+        oldest = BookingChange.query.order_by(BookingChange.seq).limit(2).all()
+        for change in oldest:
+            change.changed_at = datetime.utcnow() - timedelta(days=40)
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['prune-booking-changes', '--older-than-days', '30', '--batch-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith('2 booking changes')
+    assert client.get(f'/api/bookings/changes?since={token}').status_code == 410
+
+    # A fresh token syncs again
+    token = client.get('/api/bookings/changes').get_json()['next_token']
+    assert client.get(f'/api/bookings/changes?since={token}').status_code == 200
+
+
+def test_pruning_keeps_the_newest_change(app, ids, login):
+    client = login('admin@example.com')
+    create_booking(client, ids, 6)
+    token = client.get('/api/bookings/changes').get_json()['next_token']
+    with app.app_context():
+        BookingChange.query.update({'changed_at': datetime.utcnow() - timedelta(days=40)})
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['prune-booking-changes', '--older-than-days', '30'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert BookingChange.query.count() == 1
+    # A client that was up to date keeps syncing after an idle period
+    response = client.get(f'/api/bookings/changes?since={token}')
+    assert response.status_code == 200
+    assert response.get_json()['bookings'] == []
+
+
+def test_changes_of_running_transactions_are_held_back(app, ids, login, monkeypatch):
+    # The PostgreSQL read path on the SQLite test database: log order (txid, seq), horizon set by hand.
+    # Transaction 102 took seq 3 but is still running when transaction 101 commits seq 4.
+    client = login('admin@example.com')
+    created = [create_booking(client, ids, day) for day in (5, 6, 7, 8)]
+    with app.app_context():
+        for change, txid in zip(BookingChange.query.order_by(BookingChange.seq), (99, 100, 102, 101)):
+            change.txid = txid
+        db.session.commit()
+    monkeypatch.setattr('routes.bookings.change_log_keys', lambda: (BookingChange.txid, BookingChange.seq))
+    horizon = {'txid': 100}
+    monkeypatch.setattr('routes.bookings.committed_horizon', lambda: horizon['txid'])
+
+    # Taken while 100 was the oldest transaction running: only 99 is behind the token
+    token = client.get('/api/bookings/changes').get_json()['next_token']
+    assert token == encode_cursor([99, 1])
+
+    # 100 and 101 have committed, 102 is running: its change is held back, not skipped
+    horizon['txid'] = 102
+    response = client.get(f'/api/bookings/changes?since={token}').get_json()
+    assert [booking['id'] for booking in response['bookings']] == [created[1], created[3]]
+    assert response['next_token'] == encode_cursor([101, 4])
+
+    horizon['txid'] = 103
+    response = client.get(f"/api/bookings/changes?since={response['next_token']}").get_json()
+    assert [booking['id'] for booking in response['bookings']] == [created[2]]
+    assert response['next_token'] == encode_cursor([102, 3])
@@ -0,0 +1,142 @@
+# Finalproject/tests/test_booking_concurrency.py
+import contextlib
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.booking_locks import booking_locks
+from app.extensions import db
+from app.models import Booking, User
+from config import TestingConfig
+from tests.conftest import PASSWORD, build_app, reset_caches
+
+# Concurrent writers racing for the same instructor and time slot (app/booking_locks.py).
+#
+# Each thread has its own test client and the requests really run in parallel against a file-backed SQLite
+# database (an in-memory one is a single shared connection).  Whatever the path (create, update, bulk), exactly
+# one request wins the slot and every other one gets a 409, and no two stored bookings of a person overlap.
+# 'without_locks' replaces the per-person locks with no-ops, as for writers in another process: the database
+# overlap guard alone must then keep the same promise.
+
+THREADS = 8
+SLOT_START = datetime(2031, 1, 6, 8)
+SLOT_END = SLOT_START + timedelta(minutes=50)
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'bookings.db'}"
+
+    app = build_app(FileConfig)
+    with app.app_context():
+        db.session.add_all(User(email=f'racer{n}@example.com', first_name='Racer', last_name=str(n), role='student',
+                                password_hash='x') for n in range(THREADS))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    reset_caches()
+
+
+@pytest.fixture(params=['with_locks', 'without_locks'])
+def lock_mode(request, monkeypatch):
+    if request.param == 'without_locks':
+        monkeypatch.setattr(booking_locks, 'hold', lambda people: contextlib.nullcontext())
+    return request.param
+
+
+def user_ids(app):
+    with app.app_context():
+        ids = {user.email: user.id for user in User.query.all()}
+    ids['training_element'] = 1
+    return ids
+
+
+def booking_fields(ids, student, start=SLOT_START, end=SLOT_END):
+    return {
+        'training_element_id': ids['training_element'],
+        'instructor_id': ids['instructor@example.com'],
+        'student_id': ids[student],
+        'start_time': start.isoformat() + 'Z',
+        'end_time': end.isoformat() + 'Z',
+    }
+
+
+def race(app, send):
+    # Runs send(client, n) in THREADS threads released together, returns [(status code, json), ...]
+    clients = []
+    for _ in range(THREADS):
+        client = app.test_client()
+        assert client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': PASSWORD}).status_code == 200
+        clients.append(client)
+    barrier = threading.Barrier(THREADS)
+    responses = [None] * THREADS
+
+    def run(n):
+        barrier.wait()
+        response = send(clients[n], n)
+        responses[n] = (response.status_code, response.get_json())
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+def overlapping_pairs(app):
+    with app.app_context():
+        return db.session.execute(text(
+            "SELECT count(*) FROM bookings a JOIN bookings b ON a.id < b.id "
+            "AND (a.instructor_id = b.instructor_id OR a.student_id = b.student_id) "
+            "AND a.start_time < b.end_time AND a.end_time > b.start_time"
+        )).scalar()
+
+
+def bookings_in_slot(app):
+    with app.app_context():
+        return Booking.query.filter(Booking.start_time < SLOT_END, Booking.end_time > SLOT_START).count()
+
+
+def assert_one_winner(app, responses, success_code):
+    codes = sorted(code for code, _ in responses)
+    assert codes == sorted([success_code] + [409] * (THREADS - 1)), responses
+    assert bookings_in_slot(app) == 1
+    assert overlapping_pairs(app) == 0
+
+
+def test_parallel_creates_of_one_slot(file_app, lock_mode):
+    ids = user_ids(file_app)
+    responses = race(file_app, lambda client, n: client.post('/api/bookings', json=booking_fields(ids, f'racer{n}@example.com')))
+    assert_one_winner(file_app, responses, 201)
+
+
+def test_parallel_bulk_creates_of_one_slot(file_app, lock_mode):
+    ids = user_ids(file_app)
+    responses = race(file_app, lambda client, n: client.post('/api/bookings/bulk', json=[booking_fields(ids, f'racer{n}@example.com')]))
+    assert_one_winner(file_app, responses, 201)
+
+
+def test_parallel_updates_into_one_slot(file_app, lock_mode):
+    ids = user_ids(file_app)
+    # One booking per thread on the same day, a slot apart, all moved to the same slot at once
+    booking_ids = []
+    with file_app.app_context():
+        for n in range(THREADS):
+            start = SLOT_START + timedelta(hours=n + 1)
+            booking = Booking(created_by_user_id=ids['admin@example.com'], **{
+                **booking_fields(ids, f'racer{n}@example.com'), 'start_time': start, 'end_time': start + timedelta(minutes=50)
+            })
+            db.session.add(booking)
+            db.session.flush()
+            booking_ids.append(booking.id)
+        db.session.commit()
+    responses = race(file_app, lambda client, n: client.put(f'/api/bookings/{booking_ids[n]}', json={
+        'start_time': SLOT_START.isoformat() + 'Z', 'end_time': SLOT_END.isoformat() + 'Z'
+    }))
+    assert_one_winner(file_app, responses, 200)
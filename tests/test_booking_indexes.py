@@ -0,0 +1,74 @@
+# Finalproject/tests/test_booking_indexes.py
+import pytest
+
+from app.extensions import db
+
+# The list filters and the conflict checks of routes/bookings.py must be answered by the composite indexes of
+# Booking.__table_args__ (ix_bookings_*), never by a full scan of the bookings table followed by a sort.
+# The statements checked are the ones the endpoints really send, captured while they run, then fed to
+# EXPLAIN QUERY PLAN with the same parameters.
+
+
+def explain(statement, parameters):
+    # SQLite query plan details, e.g. ['SEARCH bookings USING INDEX ix_bookings_status_start_time (status=?)', ...]
+    connection = db.session.connection().connection.driver_connection
+    return [row[3] for row in connection.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()]
+
+
+def bookings_plans(app, counter, *conditions):
+    # Query plans of the SELECTs on the bookings table whose SQL contains every one of 'conditions'
+    with app.app_context():
+        return [
+            explain(statement, parameters) for statement, parameters in counter.statements
+            if statement.lstrip().startswith('SELECT') and 'FROM bookings ' in statement and all(condition in statement for condition in conditions)
+        ]
+
+
+def assert_uses_index(plans, index_name):
+    assert plans, "the statement was not sent"
+    for plan in plans:
+        bookings_steps = [step for step in plan if ' bookings ' in f'{step} ']
+        assert any(index_name in step for step in bookings_steps), plan
+        assert 'SCAN bookings' not in plan, plan
+        assert not any('TEMP B-TREE' in step for step in plan), plan
+
+
+def booking_body(ids, instructor, student, start='2031-01-06T08:00:00Z', end='2031-01-06T09:00:00Z'):
+    return {
+        'training_element_id': ids['training_element'],
+        'instructor_id': ids[instructor],
+        'student_id': ids[student],
+        'start_time': start,
+        'end_time': end,
+    }
+
+
+@pytest.mark.parametrize('query_string, condition, index_name', [
+    ('', 'ORDER BY bookings.start_time', 'ix_bookings_start_time_id'),
+    ('?status=pending', 'bookings.status = ?', 'ix_bookings_status_start_time'),
+    ('?created_by_user_id={admin}', 'bookings.created_by_user_id = ?', 'ix_bookings_created_by_user_id_start_time'),
+])
+def test_booking_list_uses_an_index(app, ids, login, count_statements, query_string, condition, index_name):
+    client = login('admin@example.com')
+    url = '/api/bookings' + query_string.format(admin=ids['admin@example.com'])
+    with count_statements() as counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert_uses_index(bookings_plans(app, counter, condition), index_name)
+
+
+@pytest.mark.parametrize('other_instructor, other_student, person_column, index_name', [
+    ('instructor@example.com', 'student2@example.com', 'bookings.instructor_id', 'ix_bookings_instructor_id_start_time'),
+    ('instructor2@example.com', 'student@example.com', 'bookings.student_id', 'ix_bookings_student_id_start_time'),
+])
+def test_booking_conflict_check_uses_an_index(app, ids, login, count_statements, other_instructor, other_student,
+                                              person_column, index_name):
+    client = login('admin@example.com')
+    response = client.post('/api/bookings', json=booking_body(ids, 'instructor@example.com', 'student@example.com'))
+    assert response.status_code == 201
+    # Overlaps the booking above through one person only: the interval index sends that check to SQL
+    with count_statements() as counter:
+        response = client.post('/api/bookings', json=booking_body(
+            ids, other_instructor, other_student, '2031-01-06T08:30:00Z', '2031-01-06T09:30:00Z'))
+    assert response.status_code == 409
+    assert_uses_index(bookings_plans(app, counter, f'{person_column} = ?', 'bookings.end_time'), index_name)
@@ -0,0 +1,66 @@
+# Finalproject/tests/test_booking_list_queries.py
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Booking, User
+
+# GET /api/bookings eager-loads the training element, instructor, student and creator of every booking
+# (BOOKING_LOAD_OPTIONS in routes/bookings.py): the number of statements of a page must not grow with its size.
+
+
+def add_bookings(app, ids, count, first_day):
+    # 'count' bookings, each with its own student so that no relationship is already in the identity map
+    with app.app_context():
+        students = [User(email=f'bulk{first_day:%m%d}-{n}@example.com', first_name='Bulk', last_name=str(n), role='student',
+                         password_hash='x') for n in range(count)]
+        db.session.add_all(students)
+        db.session.flush()
+        start = datetime.combine(first_day, datetime.min.time()).replace(hour=8)
+        for n, student in enumerate(students):
+            db.session.add(Booking(
+                training_element_id=ids['training_element'],
+                instructor_id=ids['instructor@example.com' if n % 2 else 'instructor2@example.com'],
+                student_id=student.id,
+                start_time=start + timedelta(hours=n),
+                end_time=start + timedelta(hours=n, minutes=50),
+                created_by_user_id=ids['admin@example.com'],
+            ))
+        db.session.commit()
+
+
+def list_bookings(client, count_statements):
+    with count_statements() as counter:
+        response = client.get('/api/bookings?limit=500')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['bookings'], counter.count
+
+
+def logged_in_client(login):
+    # The first request after login loads the user into the user cache (app/user_cache.py), keep it out of the counts
+    client = login('admin@example.com')
+    assert client.get('/api/bookings').status_code == 200
+    return client
+
+
+def test_booking_list_query_count_does_not_grow_with_the_page(app, ids, login, count_statements):
+    client = logged_in_client(login)
+    add_bookings(app, ids, 10, datetime(2031, 1, 6))
+    bookings, small_page_statements = list_bookings(client, count_statements)
+    assert len(bookings) == 10
+
+    add_bookings(app, ids, 30, datetime(2031, 2, 3))
+    bookings, large_page_statements = list_bookings(client, count_statements)
+    assert len(bookings) == 40
+    assert large_page_statements == small_page_statements
+    assert all(booking['studentFirstName'] == 'Bulk' and booking['instructorFirstName'] == 'Instructor' for booking in bookings)
+
+
+def test_booking_list_with_filters_loads_in_the_same_number_of_queries(app, ids, login, count_statements):
+    client = logged_in_client(login)
+    add_bookings(app, ids, 10, datetime(2031, 1, 6))
+    _, unfiltered_statements = list_bookings(client, count_statements)
+    with count_statements() as counter:
+        response = client.get(f"/api/bookings?status=pending&instructor_id={ids['instructor@example.com']}")
+    assert response.status_code == 200
+    assert len(response.get_json()['bookings']) == 5
+    assert counter.count == unfiltered_statements
@@ -0,0 +1,40 @@
+# Finalproject/tests/test_booking_series.py
+import pytest
+
+# POST /api/bookings/series (routes/series.py): expansion of the recurrence
+
+
+def series_body(ids, **recurrence):
+    return {
+        'training_element_id': ids['training_element'],
+        'instructor_id': ids['instructor@example.com'],
+        'student_id': ids['student@example.com'],
+        'start_time': '2031-01-06T08:00:00Z',
+        'end_time': '2031-01-06T09:00:00Z',
+        'recurrence': {'freq': 'daily', **recurrence},
+    }
+
+
+@pytest.mark.parametrize('until, days', [
+    ('2031-01-08', ['2031-01-06', '2031-01-07', '2031-01-08']), # a date alone includes its own session
+    ('2031-01-06', ['2031-01-06']),
+    ('2031-01-08T07:59:00Z', ['2031-01-06', '2031-01-07']),    # a datetime is an exact bound
+    ('2031-01-08T08:00:00Z', ['2031-01-06', '2031-01-07', '2031-01-08']),
+])
+def test_series_until_is_inclusive(ids, login, until, days):
+    client = login('admin@example.com')
+    response = client.post('/api/bookings/series', json=series_body(ids, until=until))
+    assert response.status_code == 201, response.get_json()
+    assert [booking['startTime'][:10] for booking in response.get_json()['bookings']] == days
+
+
+@pytest.mark.parametrize('recurrence', [
+    {'until': '2031-01-05'},
+    {'until': 20310108},
+    {'count': True},
+    {'interval': True, 'count': 2},
+    {'count': 2, 'until': '2031-01-08'},
+])
+def test_series_rejects_invalid_recurrence(ids, login, recurrence):
+    client = login('admin@example.com')
+    assert client.post('/api/bookings/series', json=series_body(ids, **recurrence)).status_code == 400
@@ -0,0 +1,114 @@
+# Finalproject/tests/test_booking_stream.py
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.serving import BaseWSGIServer
+
+from app.extensions import db
+from config import TestingConfig
+from tests.conftest import PASSWORD, build_app, reset_caches
+
+# GET /api/bookings/stream (routes/bookings.py): open streams are capped (app/booking_events.py), so they can
+# never take every thread of a worker
+
+WORKER_THREADS = 4
+
+
+class StreamTestingConfig(TestingConfig):
+    BOOKING_STREAM_MAX_CLIENTS = WORKER_THREADS - 1
+    BOOKING_STREAM_RETRY_AFTER_SECONDS = 7
+    BOOKING_STREAM_KEEPALIVE_SECONDS = 1 # a closed client is noticed on the next keep-alive
+    BOOKING_STREAM_MAX_SECONDS = 10     # streams left behind by a failed test end soon
+
+
+class PooledServer(BaseWSGIServer):
+    # A worker with a fixed number of request threads, like gunicorn --threads
+    def __init__(self, app, threads):
+        super().__init__('127.0.0.1', 0, app)
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+@pytest.fixture
+def server():
+    app = build_app(StreamTestingConfig)
+    server = PooledServer(app, WORKER_THREADS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.pool.shutdown(wait=False, cancel_futures=True)
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    reset_caches()
+
+
+def get(server, path, cookie=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+    connection.request('GET', path, headers={'Cookie': cookie} if cookie else {})
+    return connection, connection.getresponse()
+
+
+def login_cookie(server, email):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+    connection.request('POST', '/api/auth/login', body=json.dumps({'email': email, 'password': PASSWORD}),
+                       headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    assert response.status == 200
+    return '; '.join(header.split(';', 1)[0] for header in response.headers.get_all('Set-Cookie'))
+
+
+def open_stream(server, cookie):
+    connection, response = get(server, '/api/bookings/stream', cookie)
+    assert response.status == 200
+    assert response.fp.readline() == b'retry: 3000\n' # the stream is running and holds its thread
+    return connection
+
+
+def test_open_streams_leave_threads_for_the_api(server):
+    cookie = login_cookie(server, 'student@example.com')
+    streams = [open_stream(server, cookie) for _ in range(StreamTestingConfig.BOOKING_STREAM_MAX_CLIENTS)]
+    try:
+        # One stream too many: refused at once, its thread is free again
+        connection, response = get(server, '/api/bookings/stream', cookie)
+        assert response.status == 503
+        assert response.getheader('Retry-After') == '7'
+        connection.close()
+
+        started = time.monotonic()
+        connection, response = get(server, '/ping')
+        assert response.status == 200
+        assert json.loads(response.read()) == {'message': 'pong'}
+        assert time.monotonic() - started < 2
+        connection.close()
+
+        # A client leaves: its slot is given back once the server notices
+        streams.pop().close()
+        deadline = time.monotonic() + 5
+        while True:
+            connection, response = get(server, '/api/bookings/stream', cookie)
+            if response.status == 200 or time.monotonic() > deadline:
+                break
+            connection.close()
+            time.sleep(0.2)
+        assert response.status == 200
+        streams.append(connection)
+    finally:
+        for connection in streams:
+            connection.close()
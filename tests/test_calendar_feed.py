@@ -0,0 +1,34 @@
+# Finalproject/tests/test_calendar_feed.py
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Booking
+
+# GET /api/calendar/<token>.ics (routes/calendar_feed.py): conditional GET of the feed
+
+
+def test_feed_etag_changes_when_a_booking_leaves_the_past_window(app, ids, login):
+    client = login('student@example.com')
+    feed_path = client.get('/api/calendar/feed-url').get_json()['url'].split('localhost', 1)[1]
+    start = datetime.combine(datetime.utcnow().date() - timedelta(days=2), datetime.min.time()).replace(hour=8)
+    with app.app_context():
+        db.session.add(Booking(
+            training_element_id=ids['training_element'], instructor_id=ids['instructor@example.com'],
+            student_id=ids['student@example.com'], start_time=start, end_time=start + timedelta(hours=1),
+            created_by_user_id=ids['admin@example.com'],
+        ))
+        db.session.commit()
+
+    app.config['ICS_FEED_PAST_DAYS'] = 3
+    response = client.get(feed_path)
+    assert response.status_code == 200
+    assert b'BEGIN:VEVENT' in response.get_data()
+    etag = response.headers['ETag']
+    assert client.get(feed_path, headers={'If-None-Match': etag}).status_code == 304
+
+    # The window moves on (here: shorter), no booking was written: the booking is out and the old body is stale
+    app.config['ICS_FEED_PAST_DAYS'] = 1
+    response = client.get(feed_path, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert b'BEGIN:VEVENT' not in response.get_data()
+    assert response.headers['ETag'] != etag
@@ -0,0 +1,74 @@
+# Finalproject/tests/test_conditional_get.py
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import TrainingElement
+from app.table_versions import get_table_versions
+
+# ETags of the list endpoints (itls/decorators.py conditional_get, app/table_versions.py)
+
+
+def booking_body(ids):
+    return {
+        'training_element_id': ids['training_element'],
+        'instructor_id': ids['instructor@example.com'],
+        'student_id': ids['student@example.com'],
+        'start_time': '2031-01-06T08:00:00Z',
+        'end_time': '2031-01-06T09:00:00Z',
+    }
+
+
+def test_unchanged_list_is_answered_with_304(login):
+    client = login('admin@example.com')
+    etag = client.get('/api/bookings').headers['ETag']
+    assert client.get('/api/bookings', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_booking_write_changes_the_etag(ids, login):
+    client = login('admin@example.com')
+    etag = client.get('/api/bookings').headers['ETag']
+    assert client.post('/api/bookings', json=booking_body(ids)).status_code == 201
+    response = client.get('/api/bookings', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.get_json()['bookings']) == 1
+
+
+def test_rolled_back_write_keeps_the_versions(app):
+    with app.app_context():
+        before = get_table_versions(['training_elements'])
+        db.session.add(TrainingElement(name='Never saved', duration_minutes=30, session_type='classroom'))
+        db.session.flush()
+        db.session.rollback()
+        assert get_table_versions(['training_elements']) == before
+        db.session.add(TrainingElement(name='Saved', duration_minutes=30, session_type='classroom'))
+        db.session.commit()
+        assert get_table_versions(['training_elements'])['training_elements'] == before['training_elements'] + 1
+
+
+def test_counter_is_bumped_outside_the_write_transaction(app, ids, login):
+    # The booking INSERT commits first, the counter UPDATE runs afterwards in a transaction of its own:
+    # no booking writer holds the table_versions row while it checks conflicts and writes
+    client = login('admin@example.com')
+    with app.app_context():
+        engine = db.engine
+    log = []
+
+    def record_statement(conn, cursor, statement, *args):
+        # 'INSERT INTO bookings ...' -> 'INSERT bookings', 'UPDATE table_versions SET ...' -> 'UPDATE table_versions'
+        words = statement.split()
+        log.append(f"{words[0]} {words[1] if words[0] == 'UPDATE' else words[2]}")
+
+    def record_commit(conn):
+        log.append('COMMIT')
+
+    event.listen(engine, 'before_cursor_execute', record_statement)
+    event.listen(engine, 'commit', record_commit)
+    try:
+        assert client.post('/api/bookings', json=booking_body(ids)).status_code == 201
+    finally:
+        event.remove(engine, 'before_cursor_execute', record_statement)
+        event.remove(engine, 'commit', record_commit)
+    insert = log.index('INSERT bookings')
+    bump = log.index('UPDATE table_versions')
+    assert 'COMMIT' in log[insert:bump]
+    assert log[bump + 1] == 'COMMIT'
@@ -0,0 +1,68 @@
+# Finalproject/tests/test_interval_index.py
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.interval_index import booking_index
+from app.models import Booking
+
+# In-memory interval index (app/interval_index.py): what a cold person loads and which checks it answers
+
+
+def add_booking(ids, start, hours=1, instructor='instructor@example.com'):
+    booking = Booking(
+        training_element_id=ids['training_element'], instructor_id=ids[instructor], student_id=ids['student@example.com'],
+        start_time=start, end_time=start + timedelta(hours=hours), created_by_user_id=ids['admin@example.com'],
+    )
+    db.session.add(booking)
+    db.session.commit()
+    return booking.id
+
+
+def test_cold_load_reads_from_now_on_only(app, ids):
+    now = datetime.utcnow()
+    with app.app_context():
+        old_id = add_booking(ids, now - timedelta(days=700))
+        running_id = add_booking(ids, now - timedelta(hours=10), hours=20) # started before now, still running
+        future_id = add_booking(ids, now + timedelta(days=30))
+        booking_index.invalidate()
+        assert booking_index.may_overlap('instructor', ids['instructor@example.com'], now + timedelta(days=60), now + timedelta(days=60, hours=1)) is False
+        loaded = {entry[2] for entry in booking_index._people[('instructor', ids['instructor@example.com'])].entries}
+    assert loaded == {running_id, future_id}
+    assert old_id not in loaded
+
+
+def test_checks_inside_the_window_are_answered(app, ids):
+    now = datetime.utcnow()
+    with app.app_context():
+        add_booking(ids, now - timedelta(hours=10), hours=20)
+        future = now + timedelta(days=30)
+        add_booking(ids, future)
+        booking_index.invalidate()
+        person = ids['instructor@example.com']
+        # Hits (confirmed with SQL by the caller)
+        assert booking_index.may_overlap('instructor', person, now + timedelta(hours=1), now + timedelta(hours=2)) is True
+        assert booking_index.may_overlap('instructor', person, future, future + timedelta(minutes=30)) is True
+        # Proven free without SQL
+        assert booking_index.may_overlap('instructor', person, future + timedelta(hours=1), future + timedelta(hours=2)) is False
+
+
+def test_checks_before_the_window_go_to_sql(app, ids):
+    now = datetime.utcnow()
+    with app.app_context():
+        booking_index.invalidate()
+        # Nothing is booked, but the past is not loaded: the index cannot prove it free
+        assert booking_index.may_overlap('instructor', ids['instructor@example.com'], now - timedelta(days=400), now - timedelta(days=400, hours=-1)) is True
+
+
+def test_conflict_in_the_past_is_still_detected(app, ids, login):
+    past = datetime.utcnow().replace(microsecond=0) - timedelta(days=400)
+    with app.app_context():
+        add_booking(ids, past)
+        booking_index.invalidate()
+    client = login('admin@example.com')
+    response = client.post('/api/bookings', json={
+        'training_element_id': ids['training_element'], 'instructor_id': ids['instructor@example.com'],
+        'student_id': ids['student2@example.com'], 'start_time': (past + timedelta(minutes=30)).isoformat() + 'Z',
+        'end_time': (past + timedelta(minutes=90)).isoformat() + 'Z',
+    })
+    assert response.status_code == 409